@@ -14,20 +14,122 @@ class Settings(BaseSettings):
     # Google Cloud Vision
     google_cloud_project_id: Optional[str] = None
     google_application_credentials: Optional[str] = None
+    google_vision_endpoint: str = "https://vision.googleapis.com/v1/images:annotate"
+    
+    # Document OCR (PDF: PyMuPDF, 다중 페이지 TIFF: Pillow - 선택 설치)
+    ocr_document_max_mb: int = 50
+    ocr_document_max_pages: int = 200
+    ocr_document_dpi: int = 200
+    ocr_page_concurrency: int = 8  # 동시에 래스터화/OCR 중인 페이지 수 (메모리 상한)
+    ocr_rasterize_workers: int = 2  # 래스터화 프로세스 수
+    
+    ocr_timeout_seconds: float = 30.0  # Vision 호출 1회 (요청 예산이 더 적게 남았으면 그만큼)
     
     # OpenAI
     openai_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None  # 프록시/벤치마크용 호환 서버
     
     # Google Gemini
     google_api_key: Optional[str] = None
     
+    # Startup (서비스는 기본적으로 첫 요청 시 로드)
+    warmup_services: str = ""  # 시작 시 미리 로드할 서비스 (쉼표 구분, "all" 가능)
+    startup_budget_seconds: float = 3.0  # benchmarks/startup.py 콜드 스타트 한도
+    
     # LLM Configuration
     llm_provider: str = "openai"  # openai or gemini
     llm_model: str = "gpt-4o-mini"
+    llm_structured_output: bool = True  # OpenAI strict json_schema (미지원 모델/프록시면 false → json_object)
+    llm_timeout_seconds: float = 60.0  # LLM 호출 1회 (요청 예산이 더 적게 남았으면 그만큼)
+    
+    # Model Cascade (OpenAI - 단순한 입력은 작은 모델, 복잡한 입력과 작은 모델 출력 검증 실패는 llm_model)
+    llm_small_model: Optional[str] = None  # 비우면 cascade 없이 모든 호출이 llm_model (예: gpt-4o-mini + LLM_MODEL=gpt-4o)
+    cascade_max_words: int = 60  # 이보다 긴 입력은 큰 모델
+    cascade_max_sentence_words: float = 30.0  # 문장당 평균 단어 수가 이보다 많으면 큰 모델
+    cascade_max_clauses: float = 1.5  # 문장당 종속절 수가 이보다 많으면 큰 모델
+    
+    # LLM Rate Limits (프로바이더 계정 쿼터 기준)
+    llm_requests_per_minute: int = 500
+    llm_tokens_per_minute: int = 200000
+    llm_max_concurrency: int = 16
+    llm_bulk_reserve_ratio: float = 0.2  # bulk 요청이 사용할 수 없는 interactive 전용 용량 비율
+    llm_model_limits: str = ""  # 모델별 전용 한도 "모델=RPM/TPM/동시성" (쉼표 구분) - 없는 모델은 위 한도 공유
+    
+    # Long Text (긴 지문은 조각으로 나눠 동시에 분석 후 병합)
+    max_text_length: int = 20000
+    analysis_chunk_chars: int = 1500  # 이보다 긴 텍스트는 문단/문장 경계에서 분할
+    
+    # Analysis Store (analysis_id로 분석 결과 재사용 - 워커별 메모리)
+    analysis_store_ttl_seconds: int = 1800
+    analysis_store_max_entries: int = 1000
+    
+    # Explanation Store (lazy_explanation 문제의 근거와 생성된 해설 - 워커별 메모리)
+    explanation_store_ttl_seconds: int = 3600
+    explanation_store_max_entries: int = 5000
+    
+    # Semantic Cache (공백/OCR 잡음/이름·숫자만 다른 텍스트는 저장된 문제 재사용 - 워커별 메모리)
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.9  # 정규화 텍스트 문자 3-gram 벡터 코사인 유사도
+    semantic_cache_ttl_seconds: int = 21600  # 저장 후 이 시간이 지나면 새로 생성
+    semantic_cache_max_hits: int = 50  # 한 항목을 이만큼 재사용하면 새로 생성 (0 = 제한 없음)
+    semantic_cache_max_entries: int = 2000
+    
+    # Problem Generation
+    passage_set_min_words: int = 60  # Part 7 세트: 원문이 이 단어 수 이상이면 새 지문 대신 원문을 정리해 사용
+    local_generation_queue_depth: int = 16  # LLM 대기 호출이 이 이상이면 로컬 엔진으로 (bulk는 절반, 0이면 사용 안 함)
+    local_batch_max_texts: int = 1000  # /api/generate/batch 최대 텍스트 수
+    difficulty_check: bool = True  # 생성 문제 난이도를 어휘 사전으로 측정해 요청한 난이도와 다르면 재생성 (미지정이면 측정만)
+    difficulty_tolerance: float = 0.05  # 난이도 구간 경계 허용 오차 (점수 0~1)
     
     # RAG Configuration
     use_rag: bool = True
     chroma_persist_directory: str = "./data/chroma_db"
+    # 파티션(파트 × 패턴 타입) 컬렉션 HNSW 인덱스 - 새 파티션 생성 시 적용 (benchmarks/rag_ann.py로 측정)
+    rag_hnsw_space: str = "l2"
+    rag_hnsw_construction_ef: int = 200
+    rag_hnsw_search_ef: int = 32  # 100k 합성 패턴에서 recall@3 0.99, p50 0.18ms
+    rag_hnsw_m: int = 16
+    
+    # Multi-worker Server (python -m app.server - gunicorn + uvicorn 워커, 앱은 fork 전에 로드)
+    server_bind: str = "0.0.0.0:8000"
+    server_workers: int = 1  # 1이면 uvicorn 단일 프로세스
+    server_max_requests: int = 0  # 워커 재시작 주기 (0 = 비활성) - 다른 워커가 쓴 RAG 패턴도 재시작 시 반영
+    server_max_requests_jitter: int = 0
+    server_timeout: int = 120
+    server_graceful_timeout: int = 30
+    server_keepalive: int = 5
+    rag_owner_socket: str = "./data/rag_owner.sock"  # RAG 쓰기 전담 프로세스 소켓
+    
+    # Record/Replay Transport (live | record | replay) - OpenAI, Vision HTTP 호출 대상
+    transport_mode: str = "live"
+    cassette_dir: str = "./data/cassettes"
+    cassette_latency_scale: float = 1.0  # replay 시 녹화된 지연시간 배율 (0이면 즉시 응답)
+    
+    # Admission Control (워커별 인메모리, sqlite 선택 시 같은 노드의 워커 간 공유)
+    admission_enabled: bool = True
+    admission_client_rate_per_minute: int = 60
+    admission_client_burst: int = 20
+    admission_max_in_flight: int = 32  # admission_endpoint_limits에 없는 경로들이 공유하는 동시 처리 상한
+    admission_endpoint_limits: str = "/api/generate/problem=8,/api/ocr/upload=16"
+    admission_max_queue: int = 64
+    admission_max_queue_wait: float = 5.0  # 예상 대기시간이 이를 넘으면 503
+    admission_backend: str = "memory"  # memory or sqlite
+    admission_sqlite_path: str = "./data/admission.sqlite3"
+    admission_trusted_proxies: str = ""  # X-Forwarded-For를 믿을 프록시 IP/CIDR (쉼표 구분, 비우면 소켓 주소만)
+    
+    # Request Deadline (엔드포인트별 전체 시간 예산 - 하위 호출 타임아웃은 남은 예산에서, 연결이 끊기면 취소)
+    request_timeouts: str = "/api/generate/problem=60,/api/generate/explanation=30,/api/analysis/analyze=30,/api/ocr/upload=30"
+    request_timeout_max_seconds: float = 300.0  # X-Request-Timeout 헤더 상한
+    
+    # Tracing (Server-Timing 헤더는 항상, JSONL 내보내기는 경로 설정 시 샘플링)
+    tracing_enabled: bool = True
+    trace_export_path: Optional[str] = None
+    trace_sample_rate: float = 0.01
+    trace_force_token: Optional[str] = None  # X-Trace 헤더 값이 이와 같을 때만 샘플링과 무관하게 내보냄 (비우면 헤더 무시)
+    
+    # Response Compression (none | gzip | br - br은 brotli-asgi 필요, 없으면 gzip)
+    response_compression: str = "gzip"
+    response_compression_min_size: int = 1024
     
     # CORS
     cors_origins: str = "http://localhost:5173,http://localhost:3000"
@@ -36,6 +138,42 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> list[str]:
         return [origin.strip() for origin in self.cors_origins.split(",")]
     
+    @property
+    def warmup_services_list(self) -> Optional[list[str]]:
+        """None이면 전체"""
+        if self.warmup_services.strip() == "all":
+            return None
+        return [name.strip() for name in self.warmup_services.split(",") if name.strip()]
+    
+    @property
+    def request_timeouts_map(self) -> dict[str, float]:
+        timeouts = {}
+        for item in self.request_timeouts.split(","):
+            if "=" in item:
+                path, timeout = item.split("=", 1)
+                timeouts[path.strip()] = float(timeout)
+        return timeouts
+    
+    @property
+    def llm_model_limits_map(self) -> dict[str, tuple[int, int, int]]:
+        """모델 → (RPM, TPM, 동시성)"""
+        limits = {}
+        for item in self.llm_model_limits.split(","):
+            if "=" in item:
+                model, values = item.split("=", 1)
+                rpm, tpm, concurrency = (int(v) for v in values.split("/"))
+                limits[model.strip()] = (rpm, tpm, concurrency)
+        return limits
+    
+    @property
+    def admission_endpoint_limits_map(self) -> dict[str, int]:
+        limits = {}
+        for item in self.admission_endpoint_limits.split(","):
+            if "=" in item:
+                path, limit = item.split("=", 1)
+                limits[path.strip()] = int(limit)
+        return limits
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
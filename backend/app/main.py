@@ -1,9 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 
 from .config import get_settings
-from .routers import ocr_router, analysis_router, generate_router
+from .responses import FastJSONResponse
+from .routers import ocr_router, analysis_router, generate_router, metrics_router
+from .services import llm_scheduler, service_registry
+from .services.llm_scheduler import request_priority, normalize_priority, model_schedulers
+from .services.model_router import model_router
+from .middleware import (
+    AdmissionControlMiddleware,
+    TracingMiddleware,
+    DeadlineMiddleware,
+    CompressionMiddleware,
+    admission_controller
+)
 
 settings = get_settings()
 
@@ -15,6 +27,10 @@ async def lifespan(app: FastAPI):
     print(f"🚀 Starting {settings.project_name}")
     print(f"📝 LLM Provider: {settings.llm_provider}")
     print(f"🔧 RAG Enabled: {settings.use_rag}")
+    warmup = settings.warmup_services_list
+    if warmup is None or warmup:
+        timings = await service_registry.warmup(warmup)
+        print(f"🔥 Warmed up: {timings}")
     yield
     # Shutdown
     print("👋 Shutting down...")
@@ -24,9 +40,43 @@ app = FastAPI(
     title="Parsey API",
     description="TOEIC 문제 생성 서비스 - OCR, 문장 분석, RAG 기반 문제 생성",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# Admission control (나중에 추가되는 CORS 미들웨어 안쪽에 위치해 거절 응답에도 CORS 헤더가 붙도록)
+if settings.admission_enabled:
+    app.add_middleware(AdmissionControlMiddleware)
+
+# Request deadline / client disconnect (어드미션 대기 시간도 예산에 포함, 연결이 끊기면 대기 중에도 취소)
+app.add_middleware(DeadlineMiddleware)
+
+# Tracing (어드미션 대기 시간까지 포함하도록 바깥쪽에 위치)
+if settings.tracing_enabled:
+    app.add_middleware(TracingMiddleware)
+
+# Response compression (큰 Part 7 응답 / 품사 태그가 많은 분석 결과)
+# NDJSON 스트림(문서 OCR)은 페이지가 바로 전달되도록 압축기를 거치지 않음 (gzip/br 모두 버퍼링함)
+STREAMING_PATHS = (f"{ocr_router.prefix}/upload-document",)
+
+compressor = None
+if settings.response_compression == "br":
+    try:
+        from brotli_asgi import BrotliMiddleware
+        compressor = BrotliMiddleware
+    except ImportError:
+        print("brotli-asgi not installed. Falling back to gzip.")
+        compressor = GZipMiddleware
+elif settings.response_compression == "gzip":
+    compressor = GZipMiddleware
+if compressor is not None:
+    app.add_middleware(
+        CompressionMiddleware,
+        compressor=compressor,
+        skip_paths=STREAMING_PATHS,
+        minimum_size=settings.response_compression_min_size
+    )
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -34,12 +84,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Trace-Id", "Retry-After"],
 )
 
+
+@app.middleware("http")
+async def bind_request_priority(request: Request, call_next):
+    """X-Request-Priority 헤더(interactive/bulk)를 LLM 스케줄러 우선순위로 전달"""
+    token = request_priority.set(normalize_priority(request.headers.get("x-request-priority")))
+    try:
+        return await call_next(request)
+    finally:
+        request_priority.reset(token)
+
 # Register routers
 app.include_router(ocr_router)
 app.include_router(analysis_router)
 app.include_router(generate_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -56,6 +118,11 @@ async def health_check():
     return {
         "status": "healthy",
         "llm_provider": settings.llm_provider,
-        "rag_enabled": settings.use_rag
+        "rag_enabled": settings.use_rag,
+        "llm_scheduler": llm_scheduler.stats(),
+        "llm_model_schedulers": {model: scheduler.stats() for model, scheduler in model_schedulers.items()},
+        "model_router": model_router.stats(),
+        "admission": admission_controller.stats(),
+        "services": service_registry.stats()
     }
 
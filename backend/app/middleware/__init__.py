@@ -0,0 +1,13 @@
+"""Middleware Package"""
+from .admission import AdmissionControlMiddleware, admission_controller
+from .tracing import TracingMiddleware
+from .deadline import DeadlineMiddleware
+from .compression import CompressionMiddleware
+
+__all__ = [
+    "AdmissionControlMiddleware",
+    "admission_controller",
+    "TracingMiddleware",
+    "DeadlineMiddleware",
+    "CompressionMiddleware",
+]
@@ -0,0 +1,327 @@
+"""Admission Control - Per-client rate limiting and per-endpoint load shedding"""
+from typing import Optional, Dict, List, Union
+from collections import deque
+import asyncio
+import ipaddress
+import math
+import os
+import sqlite3
+import threading
+import time
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from ..config import get_settings
+from ..services.rate_limit import TokenBucket
+from ..services.metrics import metrics
+from ..services.tracing import span
+
+settings = get_settings()
+
+
+class Shed(Exception):
+    """요청을 큐에 넣지 않고 거절"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class MemoryRateLimitBackend:
+    """워커 프로세스 내 클라이언트별 토큰 버킷"""
+
+    blocking = False  # 이벤트 루프에서 바로 호출
+
+    def __init__(self, max_clients: int = 10000):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._max_clients = max_clients
+
+    def take(self, key: str, rate_per_minute: int, burst: int) -> float:
+        """토큰 1개 소비. 허용되면 0, 아니면 재시도까지 남은 초"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self._max_clients:
+                self._prune()
+            bucket = self._buckets[key] = TokenBucket(rate_per_minute, burst=burst)
+
+        wait = bucket.time_until(1)
+        if wait > 0:
+            return wait
+        bucket.consume(1)
+        return 0.0
+
+    def _prune(self) -> None:
+        """가득 찬(오래 쉬고 있는) 버킷 정리"""
+        idle = [k for k, b in self._buckets.items() if b.available() >= b.capacity]
+        for key in idle or list(self._buckets)[: len(self._buckets) // 2]:
+            del self._buckets[key]
+
+
+class SQLiteRateLimitBackend:
+    """
+    같은 노드의 워커들이 공유하는 SQLite 기반 토큰 버킷
+    잠금 경합 시에는 요청을 허용 (fail-open)
+    다 찬 버킷은 행이 없는 것과 같으므로 주기적으로 삭제 (클라이언트 키 수만큼 늘어나지 않음)
+    """
+
+    blocking = True  # 파일 I/O - 이벤트 루프 밖(to_thread)에서 호출
+    PRUNE_INTERVAL = 60.0
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=0.05, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_updated ON buckets (updated)")
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+
+    def _prune(self, now: float, rate: float, burst: int) -> None:
+        """마지막 사용 후 다시 가득 찰 만큼 지난 버킷 삭제"""
+        self._pruned_at = now
+        refill = burst / rate if rate > 0 else self.PRUNE_INTERVAL
+        self._conn.execute("DELETE FROM buckets WHERE updated < ?", (now - refill,))
+
+    def take(self, key: str, rate_per_minute: int, burst: int) -> float:
+        rate = rate_per_minute / 60.0
+        now = time.time()
+        with self._lock:
+            try:
+                if now - self._pruned_at > self.PRUNE_INTERVAL:
+                    self._prune(now, rate, burst)
+                self._conn.execute("BEGIN IMMEDIATE")
+                row = self._conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens = float(burst) if row is None else min(burst, row[0] + (now - row[1]) * rate)
+
+                if tokens < 1:
+                    self._conn.execute("ROLLBACK")
+                    return (1 - tokens) / rate if rate > 0 else 60.0
+
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens - 1, now),
+                )
+                self._conn.execute("COMMIT")
+                return 0.0
+            except sqlite3.OperationalError as e:
+                print(f"Admission backend error: {e}")
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                return 0.0
+
+
+class EndpointGate:
+    """
+    엔드포인트별 동시 처리 상한과 제한된 대기열
+    예상 대기시간이 임계값을 넘으면 큐에 넣지 않고 즉시 거절
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, max_wait: float, name: str = "default"):
+        self.name = name  # 메트릭 path 라벨
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._queue: deque = deque()
+        self._avg_service = 0.5  # EWMA (초)
+        self.shed = 0
+
+    def expected_wait(self) -> float:
+        """현재 대기열 길이 기준 예상 대기시간"""
+        ahead = len(self._queue) + max(0, self.in_flight - self.max_in_flight + 1)
+        return ahead * self._avg_service / self.max_in_flight
+
+    async def enter(self) -> float:
+        """슬롯 획득 후 시작 시각 반환"""
+        if self.in_flight < self.max_in_flight and not self._queue:
+            self.in_flight += 1
+            return time.monotonic()
+
+        expected = self.expected_wait()
+        if len(self._queue) >= self.max_queue or expected > self.max_wait:
+            self._shed()
+            raise Shed(max(1.0, expected))
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append(future)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            if not future.done():
+                future.cancel()
+                self._shed()
+                raise Shed(max(1.0, self.expected_wait()))
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.leave(time.monotonic())
+            else:
+                future.cancel()
+            raise
+        return time.monotonic()
+
+    def _shed(self) -> None:
+        self.shed += 1
+        metrics.admission_shed.inc(path=self.name)
+
+    def leave(self, started: float) -> None:
+        """슬롯 반환 - 대기 중인 다음 요청에 슬롯을 넘김"""
+        self._avg_service = 0.8 * self._avg_service + 0.2 * (time.monotonic() - started)
+        self.in_flight -= 1
+        while self._queue:
+            future = self._queue.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+                break
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self._queue),
+            "max_in_flight": self.max_in_flight,
+            "avg_service_seconds": round(self._avg_service, 3),
+            "shed": self.shed,
+        }
+
+
+DEFAULT_GATE = "default"  # admission_endpoint_limits에 없는 경로가 공유하는 게이트 (메트릭 path 라벨)
+
+
+class AdmissionController:
+    """클라이언트별 레이트 리밋 + 엔드포인트별 게이트"""
+
+    def __init__(self):
+        if settings.admission_backend == "sqlite":
+            self.backend = SQLiteRateLimitBackend(settings.admission_sqlite_path)
+        else:
+            self.backend = MemoryRateLimitBackend()
+        # 설정된 엔드포인트만 전용 게이트, 나머지 경로(404 포함)는 공용 게이트 하나 - 경로 수만큼 늘어나지 않음
+        self._gates: Dict[str, EndpointGate] = {
+            path: self._new_gate(path, limit) for path, limit in settings.admission_endpoint_limits_map.items()
+        }
+        self._default_gate = self._gates[DEFAULT_GATE] = self._new_gate(DEFAULT_GATE, settings.admission_max_in_flight)
+        self.rate_limited = 0
+
+    @staticmethod
+    def _new_gate(name: str, max_in_flight: int) -> EndpointGate:
+        return EndpointGate(
+            max_in_flight=max_in_flight,
+            max_queue=settings.admission_max_queue,
+            max_wait=settings.admission_max_queue_wait,
+            name=name,
+        )
+
+    def gate_for(self, path: str) -> EndpointGate:
+        return self._gates.get(path, self._default_gate)
+
+    async def check_client(self, client_key: str) -> float:
+        """토큰 1개 소비 - 허용되면 0, 아니면 재시도까지 남은 초 (SQLite 백엔드는 스레드에서)"""
+        args = (client_key, settings.admission_client_rate_per_minute, settings.admission_client_burst)
+        if self.backend.blocking:
+            retry_after = await asyncio.to_thread(self.backend.take, *args)
+        else:
+            retry_after = self.backend.take(*args)
+        if retry_after > 0:
+            self.rate_limited += 1
+            metrics.admission_rate_limited.inc()
+        return retry_after
+
+    def stats(self) -> dict:
+        return {
+            "rate_limited": self.rate_limited,
+            "endpoints": {path: gate.stats() for path, gate in self._gates.items()},
+        }
+
+
+def _parse_networks(value: str) -> List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    """쉼표 구분 IP/CIDR 목록"""
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip()]
+
+
+_TRUSTED_PROXIES = _parse_networks(settings.admission_trusted_proxies)
+
+
+def _trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _TRUSTED_PROXIES)
+
+
+def _client_key(scope: Scope) -> str:
+    """
+    소켓 주소 - 신뢰하는 프록시(admission_trusted_proxies)에서 온 요청만 X-Forwarded-For 사용
+    오른쪽(가까운 프록시)부터 신뢰하는 프록시를 건너뛴 첫 주소 (클라이언트가 붙인 앞쪽 항목은 무시)
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if not _trusted(peer):
+        return peer
+    for name, value in scope.get("headers", []):
+        if name == b"x-forwarded-for":
+            hops = [hop.strip() for hop in value.decode("latin-1").split(",") if hop.strip()]
+            for hop in reversed(hops):
+                if not _trusted(hop):
+                    return hop
+            return hops[0] if hops else peer
+    return peer
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(math.ceil(retry_after))},
+    )
+
+
+class AdmissionControlMiddleware:
+    """/api/ 경로에 대한 어드미션 컨트롤 (ASGI 미들웨어)"""
+
+    def __init__(self, app: ASGIApp, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = await self.controller.check_client(_client_key(scope))
+        if retry_after > 0:
+            await _reject(429, "Too many requests", retry_after)(scope, receive, send)
+            return
+
+        gate = self.controller.gate_for(scope["path"])
+        try:
+            with span("admission_wait"):
+                started = await gate.enter()
+        except Shed as e:
+            await _reject(503, "Server is overloaded, please retry later", e.retry_after)(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.leave(started)
+
+
+# 싱글톤 인스턴스
+admission_controller = AdmissionController()
+
+metrics.gauge(
+    "parsey_admission_in_flight",
+    "Requests currently admitted per endpoint",
+    lambda: [({"path": p}, g.in_flight) for p, g in admission_controller._gates.items()],
+    labelnames=("path",),
+)
+metrics.gauge(
+    "parsey_admission_queued",
+    "Requests waiting for admission per endpoint",
+    lambda: [({"path": p}, len(g._queue)) for p, g in admission_controller._gates.items()],
+    labelnames=("path",),
+)
@@ -0,0 +1,23 @@
+"""Compression Middleware - gzip/brotli response compression that bypasses streaming routes"""
+from typing import Callable, Iterable
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class CompressionMiddleware:
+    """
+    응답 압축 (GZipMiddleware 또는 BrotliMiddleware를 감쌈)
+    - skip_paths 경로는 압축기를 거치지 않음: 압축기는 본문을 모아 압축하므로
+      NDJSON 스트림(문서 OCR)의 페이지가 바로 전달되지 않음
+    - 압축기마다 제외 옵션이 달라(gzip은 content type, brotli-asgi는 핸들러) 경로 기준으로 통일
+    """
+
+    def __init__(self, app: ASGIApp, compressor: Callable[..., ASGIApp], skip_paths: Iterable[str] = (), **options):
+        self.app = app
+        self.compressed = compressor(app, **options)
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        await self.compressed(scope, receive, send)
@@ -0,0 +1,105 @@
+"""Deadline Middleware - Per-request time budget and cancellation on client disconnect"""
+from typing import Optional, Dict
+import asyncio
+import time
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..config import get_settings
+from ..services.deadline import Deadline, request_deadline
+from ..services.metrics import metrics
+
+settings = get_settings()
+
+_GRACE = 1.0  # 하위 호출이 예산 안에서 정리할 시간 - 이후에는 요청 자체를 취소
+
+
+def _request_timeout(scope: Scope, defaults: Dict[str, float]) -> Optional[float]:
+    """X-Request-Timeout 헤더(초, 상한 있음) 또는 엔드포인트 기본 예산"""
+    for name, value in scope.get("headers", []):
+        if name == b"x-request-timeout":
+            try:
+                timeout = float(value)
+            except ValueError:
+                break
+            if timeout > 0:
+                return min(timeout, settings.request_timeout_max_seconds)
+            break
+    return defaults.get(scope["path"])
+
+
+class DeadlineMiddleware:
+    """
+    요청별 시간 예산과 클라이언트 연결 종료 처리 (ASGI 미들웨어)
+    - 예산은 services/deadline.py의 request_deadline으로 전달 → OCR/LLM 호출 타임아웃을 남은 예산에서 계산
+    - 요청 본문을 다 읽은 뒤 클라이언트가 연결을 끊으면 처리 중인 작업 취소 (진행 중인 LLM 호출 포함)
+    - 예산 + 유예 시간이 지나도 끝나지 않으면 취소, 응답 시작 전이면 504
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.timeouts = settings.request_timeouts_map
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        disconnect = loop.create_future()
+        state = {"reason": None, "started": False, "finished": False}
+        watcher = None
+
+        def cancel(reason: str) -> None:
+            if state["reason"] is None and not state["finished"]:
+                state["reason"] = reason
+                task.cancel()
+
+        async def watch_disconnect() -> None:
+            # 본문을 다 읽은 뒤 서버가 보내는 메시지는 http.disconnect뿐
+            message = await receive()
+            if not disconnect.done():
+                disconnect.set_result(message)
+            if message["type"] == "http.disconnect":
+                cancel("disconnect")
+
+        async def receive_wrapper() -> Message:
+            nonlocal watcher
+            if watcher is not None:
+                # 앱(StreamingResponse 등)도 연결 종료를 기다릴 수 있도록 같은 메시지 전달
+                return await asyncio.shield(disconnect)
+            message = await receive()
+            if message["type"] == "http.request" and not message.get("more_body", False):
+                watcher = asyncio.create_task(watch_disconnect())
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                state["started"] = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                state["finished"] = True
+            await send(message)
+
+        timeout = _request_timeout(scope, self.timeouts)
+        token = request_deadline.set(Deadline(time.monotonic() + timeout) if timeout else None)
+        timer = loop.call_later(timeout + _GRACE, cancel, "deadline") if timeout else None
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except asyncio.CancelledError:
+            if state["reason"] is None:
+                raise  # 서버 종료 등 외부 취소
+            task.uncancel()
+            metrics.requests_cancelled.inc(path=scope["path"], reason=state["reason"])
+            if not state["started"]:
+                # 연결이 끊긴 경우에도 응답을 보내 바깥 미들웨어가 정상 종료되도록 (499: 클라이언트가 닫음)
+                if state["reason"] == "deadline":
+                    response = JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+                else:
+                    response = JSONResponse(status_code=499, content={"detail": "Client closed request"})
+                await response(scope, receive, send)
+        finally:
+            request_deadline.reset(token)
+            if timer is not None:
+                timer.cancel()
+            if watcher is not None:
+                watcher.cancel()
@@ -0,0 +1,58 @@
+"""Tracing Middleware - Server-Timing response headers and span export"""
+import asyncio
+import hmac
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..config import get_settings
+from ..services.tracing import start_trace, span_exporter
+
+settings = get_settings()
+
+
+def _force_requested(scope: Scope, token: Optional[str]) -> bool:
+    """X-Trace 헤더가 설정된 토큰과 일치하는지 (토큰이 없으면 항상 False)"""
+    if not token:
+        return False
+    for name, value in scope.get("headers", []):
+        if name == b"x-trace":
+            return hmac.compare_digest(value, token.encode())
+    return False
+
+
+class TracingMiddleware:
+    """
+    요청마다 트레이스를 시작하고 응답 헤더에 단계별 소요시간을 붙임
+    - Server-Timing: 단계별 합산 시간
+    - X-Trace-Id: 내보낸 JSONL에서 요청을 찾기 위한 ID
+    X-Trace 헤더 값이 trace_force_token과 같으면 샘플링 비율과 관계없이 내보냄
+    JSONL 쓰기는 이벤트 루프를 막지 않도록 스레드에서
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.force_token = settings.trace_force_token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        force = _force_requested(scope, self.force_token)
+        with start_trace(f"{scope['method']} {scope['path']}", force_sample=force) as trace:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    timing = trace.server_timing()
+                    if timing:
+                        headers.append("Server-Timing", timing)
+                        headers.append("Timing-Allow-Origin", "*")
+                    headers.append("X-Trace-Id", trace.trace_id)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if trace.sampled:
+                    await asyncio.to_thread(span_exporter.export, trace)
@@ -0,0 +1,49 @@
+"""Response Classes - Fast JSON rendering and temp-file streaming"""
+from typing import Any
+import os
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.types import Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON 응답
+    - pydantic 모델: pydantic-core가 바로 JSON bytes로 직렬화 (중간 dict 없음)
+    - 그 외: orjson (설치되지 않았으면 표준 json)
+    
+    라우터에서 모델을 이 클래스로 감싸 반환하면 FastAPI의 재검증/재직렬화를 건너뜀
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+
+class TempFileStreamingResponse(StreamingResponse):
+    """
+    임시 파일을 읽어 만드는 스트리밍 응답 - 응답이 끝나면 파일 삭제
+    스트림 제너레이터의 finally는 제너레이터가 시작되지 않으면 (스트리밍 전 연결 종료 등) 실행되지 않으므로
+    응답 전송을 감싸서 삭제
+    """
+
+    def __init__(self, content: Any, path: str, **kwargs):
+        super().__init__(content, **kwargs)
+        self.path = path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
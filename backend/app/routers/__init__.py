@@ -2,5 +2,6 @@
 from .ocr import router as ocr_router
 from .analysis import router as analysis_router
 from .generate import router as generate_router
+from .metrics import router as metrics_router
 
-__all__ = ["ocr_router", "analysis_router", "generate_router"]
+__all__ = ["ocr_router", "analysis_router", "generate_router", "metrics_router"]
@@ -1,7 +1,12 @@
 """Analysis Router - Text Analysis Endpoints"""
 from fastapi import APIRouter, HTTPException
 from ..schemas import AnalysisRequest, AnalysisResponse
-from ..services import llm_service
+from ..services import get_llm_service
+from ..services.analysis_store import analysis_store
+from ..responses import FastJSONResponse
+from ..config import get_settings
+
+settings = get_settings()
 
 router = APIRouter(prefix="/api/analysis", tags=["Analysis"])
 
@@ -18,21 +23,29 @@ async def analyze_text(request: AnalysisRequest):
     
     Returns:
         분석 결과 (품사, 문법, 구조, TOEIC 파트)
+        analysis_id - 문제 생성 요청에 넘기면 같은 텍스트를 다시 분석하지 않음
     """
     if not request.text or not request.text.strip():
         raise HTTPException(status_code=400, detail="Text cannot be empty")
     
-    if len(request.text) > 5000:
-        raise HTTPException(status_code=400, detail="Text exceeds maximum length of 5000 characters")
+    if len(request.text) > settings.max_text_length:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Text exceeds maximum length of {settings.max_text_length} characters"
+        )
+    
+    result = await get_llm_service().analyze_text(request.text)
+    
+    # 전체 결과를 저장 (include 옵션과 무관하게 문제 생성에서 재사용)
+    update = {"analysis_id": analysis_store.put(result)}
     
-    result = await llm_service.analyze_text(request.text)
+    # 요청하지 않은 항목만 비움 (모델을 새로 만들지 않고 얕은 복사)
+    if not request.include_pos:
+        update["pos_tags"] = None
+    if not request.include_grammar:
+        update["grammar_elements"] = None
+    if not request.include_structure:
+        update["sentence_structure"] = None
+    result = result.model_copy(update=update)
     
-    return AnalysisResponse(
-        original_text=result.get("original_text", request.text),
-        pos_tags=result.get("pos_tags") if request.include_pos else None,
-        grammar_elements=result.get("grammar_elements") if request.include_grammar else None,
-        sentence_structure=result.get("sentence_structure") if request.include_structure else None,
-        toeic_part=result.get("toeic_part"),
-        toeic_part_reason=result.get("toeic_part_reason"),
-        summary=result.get("summary")
-    )
+    return FastJSONResponse(result)
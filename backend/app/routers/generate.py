@@ -1,11 +1,33 @@
 """Generate Router - TOEIC Problem Generation Endpoints"""
 from fastapi import APIRouter, HTTPException
-from ..schemas import ProblemGenerateRequest, ProblemGenerateResponse
-from ..services import problem_generator
+from ..schemas import (
+    ProblemGenerateRequest,
+    ProblemGenerateResponse,
+    ProblemBatchRequest,
+    ProblemBatchResponse,
+    ExplanationRequest,
+    ExplanationResponse
+)
+from ..services import get_problem_generator
+from ..responses import FastJSONResponse
+from ..config import get_settings
+
+settings = get_settings()
 
 router = APIRouter(prefix="/api/generate", tags=["Generation"])
 
 
+def _validate_options(part, difficulty, count: int) -> None:
+    if count > 5:
+        raise HTTPException(status_code=400, detail="Cannot generate more than 5 problems at once")
+    
+    if part and part not in [5, 6, 7]:
+        raise HTTPException(status_code=400, detail="Part must be 5, 6, or 7")
+    
+    if difficulty and difficulty not in ["easy", "medium", "hard"]:
+        raise HTTPException(status_code=400, detail="Difficulty must be easy, medium, or hard")
+
+
 @router.post("/problem", response_model=ProblemGenerateResponse)
 async def generate_problem(request: ProblemGenerateRequest):
     """
@@ -16,6 +38,9 @@ async def generate_problem(request: ProblemGenerateRequest):
     - **count**: 생성할 문제 수 (기본 1, 최대 5)
     - **difficulty**: 난이도 (easy, medium, hard)
     - **use_rag**: RAG 패턴 사용 여부
+    - **chunk_indices**: 긴 텍스트에서 문제를 만들 조각 번호 (분석 응답의 chunks)
+    - **engine**: llm 또는 local. 생략하면 LLM이 혼잡할 때 로컬 엔진으로 자동 전환
+    - **lazy_explanation**: 해설 없이 문항만 먼저 (각 문제의 problem_id로 /api/generate/explanation 요청)
     
     Returns:
         생성된 TOEIC 문제들
@@ -23,23 +48,77 @@ async def generate_problem(request: ProblemGenerateRequest):
     if not request.text or not request.text.strip():
         raise HTTPException(status_code=400, detail="Text cannot be empty")
     
-    if len(request.text) > 5000:
-        raise HTTPException(status_code=400, detail="Text exceeds maximum length of 5000 characters")
+    if len(request.text) > settings.max_text_length:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Text exceeds maximum length of {settings.max_text_length} characters"
+        )
     
-    if request.count > 5:
-        raise HTTPException(status_code=400, detail="Cannot generate more than 5 problems at once")
+    _validate_options(request.part, request.difficulty, request.count)
     
-    if request.part and request.part not in [5, 6, 7]:
-        raise HTTPException(status_code=400, detail="Part must be 5, 6, or 7")
+    if request.engine and request.engine not in ["llm", "local"]:
+        raise HTTPException(status_code=400, detail="Engine must be llm or local")
     
-    if request.difficulty and request.difficulty not in ["easy", "medium", "hard"]:
-        raise HTTPException(status_code=400, detail="Difficulty must be easy, medium, or hard")
+    try:
+        result = await get_problem_generator().generate(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return FastJSONResponse(result)
+
+
+@router.post("/explanation", response_model=ExplanationResponse)
+async def generate_explanation(request: ExplanationRequest):
+    """
+    문제 해설 생성 (lazy_explanation으로 만든 문제, 한 번 생성한 해설은 캐시)
+    
+    - **problem_id**: 생성 응답의 problem_id
+    - **problem**: problem_id를 찾지 못할 때 (만료, 다른 워커) 사용할 문제
+    - **passage**: 세트 문항이면 생성 응답의 공유 지문
+    
+    Returns:
+        해설
+    """
+    if not request.problem_id and request.problem is None:
+        raise HTTPException(status_code=400, detail="problem_id or problem is required")
+    
+    try:
+        result = await get_problem_generator().explain(request)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return FastJSONResponse(result)
+
+
+@router.post("/batch", response_model=ProblemBatchResponse)
+async def generate_batch(request: ProblemBatchRequest):
+    """
+    로컬 엔진 일괄 문제 생성 (LLM 호출 없음)
+    
+    - **texts**: 소스 텍스트 목록
+    - **part**: TOEIC 파트 (5, 6, 7). None이면 텍스트마다 추정
+    - **count**: 텍스트당 문제 수 (최대 5)
+    - **difficulty**: 난이도 (easy, medium, hard)
+    
+    Returns:
+        texts 순서대로 생성 결과
+    """
+    if not request.texts:
+        raise HTTPException(status_code=400, detail="Texts cannot be empty")
+    
+    if len(request.texts) > settings.local_batch_max_texts:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot generate for more than {settings.local_batch_max_texts} texts at once"
+        )
+    
+    if any(not text.strip() or len(text) > settings.max_text_length for text in request.texts):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Each text must be non-empty and at most {settings.max_text_length} characters"
+        )
     
-    result = await problem_generator.generate(request)
+    _validate_options(request.part, request.difficulty, request.count)
     
-    return ProblemGenerateResponse(
-        success=result.get("success", False),
-        problems=result.get("problems", []),
-        source_text=result.get("source_text", request.text),
-        detected_part=result.get("detected_part")
-    )
+    result = await get_problem_generator().generate_batch(request)
+    return FastJSONResponse(result)
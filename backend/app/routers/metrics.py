@@ -0,0 +1,21 @@
+"""Metrics Router - Prometheus Scrape Endpoint"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..services.metrics import metrics
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Prometheus 텍스트 포맷 메트릭
+    
+    - 단계별 지연시간 히스토그램 (OCR, 분석, RAG 검색, 생성, 파싱, LLM 대기열)
+    - 토큰 입출력 / 시뮬레이션 폴백 / 캐시 히트 / 오류 카운터
+    - LLM 스케줄러 및 어드미션 컨트롤 게이지
+    """
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,7 +1,11 @@
 """OCR Router - Image Upload and Text Extraction"""
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from ..schemas import OCRResponse
-from ..services import extract_text_from_image
+import os
+import time
+from ..schemas import OCRResponse, OCRDocumentSummary
+from ..services import get_ocr_service, get_document_ocr
+from ..services.tracing import span
+from ..responses import FastJSONResponse, TempFileStreamingResponse
 
 router = APIRouter(prefix="/api/ocr", tags=["OCR"])
 
@@ -25,16 +29,83 @@ async def upload_image(file: UploadFile = File(...)):
         )
     
     # 파일 크기 제한 (10MB)
-    contents = await file.read()
+    with span("read_upload"):
+        contents = await file.read()
     if len(contents) > 10 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
     
     # OCR 수행
-    result = await extract_text_from_image(contents)
+    result = await get_ocr_service().extract_text_from_image(contents)
     
-    return OCRResponse(
+    return FastJSONResponse(OCRResponse(
         success=result.get("success", False),
         text=result.get("text", ""),
         confidence=result.get("confidence"),
         language=result.get("language")
-    )
+    ))
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@router.post("/upload-document")
+async def upload_document(file: UploadFile = File(...)):
+    """
+    다중 페이지 문서(PDF, TIFF) 업로드 및 페이지별 텍스트 추출
+    
+    - **file**: PDF 또는 다중 페이지 TIFF
+    
+    Returns:
+        NDJSON 스트림 - 페이지가 끝나는 순서대로 한 줄씩
+        (page, success, text, confidence, language, rasterize_ms, ocr_ms),
+        마지막 줄은 요약 (done, pages, succeeded, elapsed_ms)
+    """
+    started = time.perf_counter()
+    document_ocr = get_document_ocr()
+    
+    head = await file.read(8)
+    await file.seek(0)
+    kind = document_ocr.detect_kind(file.content_type, head)
+    if kind is None:
+        raise HTTPException(status_code=400, detail="Invalid file type. Allowed: application/pdf, image/tiff")
+    if not document_ocr.supported(kind):
+        raise HTTPException(
+            status_code=400,
+            detail=f"{kind.upper()} support is not installed on this server"
+        )
+    
+    try:
+        with span("read_upload"):
+            path = await document_ocr.save_upload(file, kind)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # 응답을 만들기 전까지는 여기서, 이후에는 응답이 끝날 때 임시 파일 삭제 (취소돼도)
+    pages = None
+    try:
+        pages = await document_ocr.count_pages(path, kind)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        # 손상된 PDF/TIFF
+        print(f"Document open error: {e}")
+        raise HTTPException(status_code=400, detail="Could not read document")
+    finally:
+        if pages is None:
+            os.unlink(path)
+    
+    async def stream():
+        succeeded = processed = 0
+        async for page in document_ocr.iter_pages(path, kind, pages):
+            succeeded += page.success
+            processed += 1
+            yield page.model_dump_json() + "\n"
+        summary = OCRDocumentSummary(
+            pages=pages,
+            succeeded=succeeded,
+            partial=processed < pages,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
+        yield summary.model_dump_json() + "\n"
+    
+    return TempFileStreamingResponse(stream(), path, media_type=NDJSON_MEDIA_TYPE)
@@ -1,24 +1,44 @@
 """Schemas Package"""
-from .ocr import OCRResponse, OCRTextRequest
-from .analysis import AnalysisRequest, AnalysisResponse, POSTag, GrammarElement
+from .ocr import OCRResponse, OCRTextRequest, OCRPage, OCRDocumentSummary
+from .analysis import AnalysisRequest, AnalysisResponse, AnalysisOutput, POSTag, GrammarElement, TextChunk
 from .problem import (
     Problem, 
     Choice, 
+    ProblemOutput,
+    QuestionOutput,
+    ProblemSetOutput,
     ProblemGenerateRequest, 
     ProblemGenerateResponse,
+    ProblemBatchRequest,
+    ProblemBatchResponse,
+    ExplanationRequest,
+    ExplanationOutput,
+    ExplanationResponse,
     ToeicPart
 )
 
 __all__ = [
     "OCRResponse",
     "OCRTextRequest",
+    "OCRPage",
+    "OCRDocumentSummary",
     "AnalysisRequest",
     "AnalysisResponse",
+    "AnalysisOutput",
     "POSTag",
     "GrammarElement",
+    "TextChunk",
     "Problem",
     "Choice",
+    "ProblemOutput",
+    "QuestionOutput",
+    "ProblemSetOutput",
     "ProblemGenerateRequest",
     "ProblemGenerateResponse",
+    "ProblemBatchRequest",
+    "ProblemBatchResponse",
+    "ExplanationRequest",
+    "ExplanationOutput",
+    "ExplanationResponse",
     "ToeicPart",
 ]
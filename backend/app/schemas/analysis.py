@@ -17,6 +17,15 @@ class GrammarElement(BaseModel):
     explanation: str
 
 
+class TextChunk(BaseModel):
+    """긴 텍스트의 조각 (원문 오프셋 기준)"""
+    index: int
+    start: int
+    end: int
+    toeic_part: Optional[int] = None
+    summary: Optional[str] = None
+
+
 class AnalysisRequest(BaseModel):
     """분석 요청"""
     text: str
@@ -34,3 +43,15 @@ class AnalysisResponse(BaseModel):
     toeic_part: Optional[int] = None  # 5, 6, 7
     toeic_part_reason: Optional[str] = None
     summary: Optional[str] = None
+    chunks: Optional[List[TextChunk]] = None  # 긴 텍스트를 나눠 분석한 경우만
+    analysis_id: Optional[str] = None  # 문제 생성 요청에 넘기면 재분석 생략 (TTL 동안 유효)
+
+
+class AnalysisOutput(BaseModel):
+    """LLM 분석 응답 JSON (프로바이더 출력을 직접 검증)"""
+    pos_tags: List[POSTag] = []
+    grammar_elements: List[GrammarElement] = []
+    sentence_structure: Optional[str] = None
+    toeic_part: Optional[int] = None
+    toeic_part_reason: Optional[str] = None
+    summary: Optional[str] = None
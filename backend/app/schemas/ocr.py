@@ -11,6 +11,26 @@ class OCRResponse(BaseModel):
     language: Optional[str] = None
 
 
+class OCRPage(BaseModel):
+    """문서 OCR 페이지 결과 (NDJSON 스트림의 한 줄)"""
+    page: int  # 1부터
+    success: bool
+    text: str
+    confidence: Optional[float] = None
+    language: Optional[str] = None
+    rasterize_ms: Optional[float] = None
+    ocr_ms: Optional[float] = None
+
+
+class OCRDocumentSummary(BaseModel):
+    """문서 OCR 스트림의 마지막 줄"""
+    done: bool = True
+    pages: int
+    succeeded: int
+    elapsed_ms: float
+    partial: bool = False  # 요청 시간 예산이 끝나 처리하지 않은 페이지가 있음
+
+
 class OCRTextRequest(BaseModel):
     """텍스트 직접 입력 요청"""
     text: str
@@ -2,6 +2,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from enum import Enum
+from .analysis import AnalysisResponse
 
 
 class ToeicPart(str, Enum):
@@ -25,8 +26,30 @@ class Problem(BaseModel):
     question: str
     choices: List[Choice]
     answer: str  # A, B, C, D
-    explanation: str
+    explanation: str  # lazy_explanation이면 빈 문자열 → problem_id로 해설 요청
     difficulty: str  # easy, medium, hard
+    problem_id: Optional[str] = None  # /api/generate/explanation 요청용 (lazy_explanation일 때만)
+
+
+class QuestionOutput(BaseModel):
+    """LLM이 생성한 문항 JSON (지문 제외)"""
+    question_type: str = "grammar"
+    question: str = ""
+    choices: List[Choice] = []
+    answer: str = ""  # 빠지면 problem_defects가 재질문 대상으로 잡음
+    explanation: str = ""
+    difficulty: str = "medium"
+
+
+class ProblemOutput(QuestionOutput):
+    """LLM 문제 생성 응답 JSON (프로바이더 출력을 직접 검증)"""
+    passage: Optional[str] = None
+
+
+class ProblemSetOutput(BaseModel):
+    """Part 6/7 세트 생성 응답 JSON - 지문 하나와 그 지문의 문항들"""
+    passage: str = ""
+    questions: List[QuestionOutput] = []
 
 
 class ProblemGenerateRequest(BaseModel):
@@ -36,6 +59,15 @@ class ProblemGenerateRequest(BaseModel):
     count: int = 1  # 생성할 문제 수
     difficulty: Optional[str] = None  # easy, medium, hard
     use_rag: bool = True
+    chunk_indices: Optional[List[int]] = None  # 긴 텍스트에서 문제를 만들 조각 (분석 응답의 chunks 번호)
+    # 이미 받은 분석 결과 재사용 (같은 text일 때만, 없거나 만료되면 재분석)
+    analysis_id: Optional[str] = None
+    analysis: Optional[AnalysisResponse] = None
+    passage_set: bool = False  # Part 6/7: True면 지문 하나에 문항 count개 (응답 passage에 한 번만), 기본은 문항마다 지문
+    engine: Optional[str] = None  # llm, local. None이면 자동 (API 키 없음 / LLM 혼잡 시 local)
+    # 해설 없이 문항만 먼저 (LLM은 짧은 근거만 출력, 서버에 저장) → 필요할 때 /api/generate/explanation
+    lazy_explanation: bool = False
+    use_cache: bool = True  # False면 유사 텍스트 캐시를 건너뛰고 새로 생성 (결과는 캐시에 저장)
 
 
 class ProblemGenerateResponse(BaseModel):
@@ -44,3 +76,41 @@ class ProblemGenerateResponse(BaseModel):
     problems: List[Problem]
     source_text: str
     detected_part: Optional[int] = None
+    passage: Optional[str] = None  # 세트 생성 시 문항들이 공유하는 지문 (각 Problem.passage는 비움)
+    engine: str = "llm"  # llm 또는 local (규칙 기반 로컬 엔진)
+    partial: bool = False  # 문제가 count보다 적음 (짧은 텍스트의 세트) 또는 시간 예산 초과로 일부가 로컬 엔진 문제로 대체됨
+    cached: bool = False  # 거의 같은 텍스트로 이전에 생성한 문제 재사용 (이름/숫자는 새 텍스트에 맞춤)
+
+
+class ExplanationRequest(BaseModel):
+    """해설 요청 - problem_id를 찾지 못하면 (만료, 다른 워커) 함께 보낸 문제로 생성"""
+    problem_id: Optional[str] = None
+    problem: Optional[Problem] = None
+    passage: Optional[str] = None  # 세트 문항이면 응답의 공유 지문
+
+
+class ExplanationOutput(BaseModel):
+    """LLM 해설 생성 응답 JSON"""
+    explanation: str = ""
+
+
+class ExplanationResponse(BaseModel):
+    """해설 응답"""
+    success: bool
+    problem_id: Optional[str] = None
+    explanation: str
+    cached: bool = False  # 이전에 생성한 해설 재사용
+
+
+class ProblemBatchRequest(BaseModel):
+    """로컬 엔진 일괄 생성 요청 (LLM 호출 없음)"""
+    texts: List[str]
+    part: Optional[int] = None  # None이면 텍스트마다 추정
+    count: int = 1  # 텍스트당 문제 수
+    difficulty: Optional[str] = None
+
+
+class ProblemBatchResponse(BaseModel):
+    """일괄 생성 응답 - texts 순서대로"""
+    success: bool
+    results: List[ProblemGenerateResponse]
@@ -0,0 +1,123 @@
+"""Server Launcher - Multi-worker mode with the app and RAG index preloaded before fork
+
+Usage:
+    cd backend
+    python -m app.server                          # SERVER_WORKERS=1 → uvicorn 단일 프로세스
+    python -m app.server --workers 4 --bind 0.0.0.0:8000
+
+워커가 2개 이상이면 gunicorn(uvicorn 워커)으로 실행
+- 마스터가 fork 전에 앱, 서비스 모듈, RAG 스냅샷과 임베딩 모델 파일을 로드
+  → 워커들은 copy-on-write로 같은 메모리 페이지를 공유 (gc.freeze로 GC가 페이지를 건드리지 않게 함)
+- ChromaDB 영속 저장소는 owner 프로세스 하나만 열고, 워커의 쓰기는 owner로 전달 (services/rag_shared.py)
+- LLM/HTTP 클라이언트는 이벤트 루프에 묶이므로 각 워커에서 첫 사용 시 생성
+- 임베딩 ONNX Runtime 세션은 스레드 풀을 가지므로 fork 후 각 워커에서 생성 (post_fork)
+"""
+import argparse
+import gc
+
+from .config import get_settings
+
+settings = get_settings()
+
+try:
+    import uvicorn_worker  # noqa: F401 - uvicorn.workers의 후속 패키지
+    WORKER_CLASS = "uvicorn_worker.UvicornWorker"
+except ImportError:
+    WORKER_CLASS = "uvicorn.workers.UvicornWorker"
+
+
+def preload():
+    """
+    마스터 프로세스에서 fork 전에 실행 - 워커가 공유할 것들을 미리 로드
+
+    Returns:
+        ASGI 앱
+    """
+    from .main import app
+    from .services import service_registry
+
+    # 서비스 모듈 import (모듈/코드 객체 공유, 클라이언트 생성은 워커에서)
+    for name, info in service_registry.stats().items():
+        if info["enabled"]:
+            service_registry.get(name)
+
+    if settings.use_rag:
+        try:
+            import chromadb  # noqa: F401
+            from .services.rag_shared import start_owner
+            from .services.rag_service import rag_service
+
+            rag_service.preload_from_owner(start_owner(settings.rag_owner_socket))
+            print(f"📚 RAG snapshot preloaded ({rag_service.count()} patterns)")
+        except ImportError:
+            print("ChromaDB not installed. RAG disabled.")
+
+    # 지금까지 만든 객체를 GC 대상에서 제외 - 워커에서 GC가 refcount/헤더를 써서 페이지가 복사되는 것 방지
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def post_fork(server, worker) -> None:
+    """gunicorn 워커 fork 직후 - 워커마다 임베딩 추론 세션 생성"""
+    if settings.use_rag:
+        try:
+            from .services.rag_service import rag_service
+
+            rag_service.warm_worker()
+        except Exception as e:
+            print(f"Embedding warmup error (worker {worker.pid}): {e}")
+
+
+def _run_gunicorn(bind: str, workers: int) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class ParseyServer(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": bind,
+                "workers": workers,
+                "worker_class": WORKER_CLASS,
+                "preload_app": True,
+                "post_fork": post_fork,
+                "max_requests": settings.server_max_requests,
+                "max_requests_jitter": settings.server_max_requests_jitter,
+                "timeout": settings.server_timeout,
+                "graceful_timeout": settings.server_graceful_timeout,
+                "keepalive": settings.server_keepalive,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return preload()
+
+    ParseyServer().run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Parsey API server")
+    parser.add_argument("--workers", type=int, default=settings.server_workers)
+    parser.add_argument("--bind", default=settings.server_bind)
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            print("gunicorn not installed. Running a single uvicorn worker.")
+            args.workers = 1
+
+    if args.workers > 1:
+        if settings.admission_enabled and settings.admission_backend == "memory":
+            print("ℹ️  ADMISSION_BACKEND=memory keeps per-worker client limits. Use sqlite to share them.")
+        _run_gunicorn(args.bind, args.workers)
+    else:
+        import uvicorn
+
+        host, _, port = args.bind.rpartition(":")
+        uvicorn.run("app.main:app", host=host or "0.0.0.0", port=int(port))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,61 @@
-"""Services Package"""
-from .ocr_service import extract_text_from_image
-from .llm_service import llm_service, LLMService
-from .rag_service import rag_service, RAGService
-from .problem_generator import problem_generator, ProblemGenerator
+"""Services Package
+
+서비스 모듈은 처음 접근할 때 import 됨 (registry.py 참고)
+`from app.services import llm_service` 형태의 기존 import도 그대로 동작
+"""
+import importlib
+from .llm_scheduler import llm_scheduler, LLMScheduler
+from .registry import (
+    service_registry,
+    ServiceRegistry,
+    get_llm_service,
+    get_rag_service,
+    get_problem_generator,
+    get_ocr_service,
+    get_document_ocr,
+)
+
+# 이름 -> 정의된 모듈 (PEP 562 지연 속성)
+_LAZY_ATTRIBUTES = {
+    "extract_text_from_image": ".ocr_service",
+    "llm_service": ".llm_service",
+    "LLMService": ".llm_service",
+    "rag_service": ".rag_service",
+    "RAGService": ".rag_service",
+    "problem_generator": ".problem_generator",
+    "ProblemGenerator": ".problem_generator",
+    "document_ocr": ".document_ocr",
+    "DocumentOCR": ".document_ocr",
+    "local_generator": ".local_generator",
+    "LocalGenerator": ".local_generator",
+    "difficulty_scorer": ".difficulty",
+    "DifficultyScorer": ".difficulty",
+    "model_router": ".model_router",
+    "ModelRouter": ".model_router",
+    "semantic_cache": ".semantic_cache",
+    "SemanticCache": ".semantic_cache",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # 서브모듈 import가 같은 이름의 패키지 속성을 모듈 객체로 덮어쓰므로 export 값으로 고정
+    globals()[name] = value
+    return value
+
 
 __all__ = [
-    "extract_text_from_image",
-    "llm_service",
-    "LLMService",
-    "rag_service",
-    "RAGService", 
-    "problem_generator",
-    "ProblemGenerator",
+    "llm_scheduler",
+    "LLMScheduler",
+    "service_registry",
+    "ServiceRegistry",
+    "get_llm_service",
+    "get_rag_service",
+    "get_problem_generator",
+    "get_ocr_service",
+    "get_document_ocr",
+    *_LAZY_ATTRIBUTES,
 ]
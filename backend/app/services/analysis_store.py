@@ -0,0 +1,71 @@
+"""Analysis Store - Short-lived server-side analysis results referenced by analysis_id"""
+from typing import Optional
+from collections import OrderedDict
+import threading
+import time
+import uuid
+from ..config import get_settings
+from ..schemas import AnalysisResponse
+from .metrics import metrics
+
+settings = get_settings()
+
+
+class AnalysisStore:
+    """
+    분석 결과 저장소 (프로세스 메모리, TTL + LRU)
+    /api/analysis/analyze 결과를 저장해 두고 문제 생성 시 analysis_id로 재사용
+    - 멀티 워커에서는 다른 워커가 저장한 ID를 찾지 못할 수 있음 → 호출 측에서 재분석
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, analysis: AnalysisResponse) -> str:
+        """분석 결과 저장 후 analysis_id 반환"""
+        analysis_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[analysis_id] = (time.monotonic() + self.ttl_seconds, analysis)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return analysis_id
+
+    def get(self, analysis_id: str, text: Optional[str] = None) -> Optional[AnalysisResponse]:
+        """
+        저장된 분석 결과
+
+        Args:
+            analysis_id: put()이 반환한 ID
+            text: 주어지면 원문이 같은 경우만 반환 (다른 텍스트에 잘못 재사용 방지)
+
+        Returns:
+            분석 결과, 없거나 만료됐거나 원문이 다르면 None
+        """
+        with self._lock:
+            entry = self._entries.get(analysis_id)
+            if entry is None:
+                return None
+            expires, analysis = entry
+            if expires < time.monotonic():
+                del self._entries[analysis_id]
+                return None
+            if text is not None and analysis.original_text != text:
+                return None
+            self._entries.move_to_end(analysis_id)
+            return analysis
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# 싱글톤 인스턴스
+analysis_store = AnalysisStore(settings.analysis_store_ttl_seconds, settings.analysis_store_max_entries)
+
+metrics.gauge(
+    "parsey_analysis_store_entries",
+    "Analysis results held for reuse by analysis_id",
+    lambda: [({}, len(analysis_store))],
+)
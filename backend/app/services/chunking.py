@@ -0,0 +1,111 @@
+"""Text Chunking - Split long passages and merge per-chunk analyses"""
+from typing import List, Optional, Tuple
+from collections import Counter
+import re
+from ..schemas import AnalysisResponse, TextChunk
+
+# 문단 경계 (빈 줄), 문장 경계 (종결 부호 + 공백)
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_SENTENCE = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+
+
+def _spans(text: str, pattern: re.Pattern, start: int, end: int) -> List[Tuple[int, int]]:
+    """[start, end) 구간을 pattern 경계로 나눈 (시작, 끝) 목록 - 구분자는 앞 조각에 포함"""
+    spans = []
+    position = start
+    for match in pattern.finditer(text, start, end):
+        spans.append((position, match.end()))
+        position = match.end()
+    if position < end:
+        spans.append((position, end))
+    return spans
+
+
+def _split_oversized(text: str, start: int, end: int, max_chars: int) -> List[Tuple[int, int]]:
+    """문장 하나가 max_chars보다 길면 공백에서 자름"""
+    spans = []
+    while end - start > max_chars:
+        cut = text.rfind(" ", start, start + max_chars)
+        if cut <= start:
+            cut = start + max_chars
+        spans.append((start, cut))
+        start = cut
+    spans.append((start, end))
+    return spans
+
+
+def split_text(text: str, max_chars: int) -> List[TextChunk]:
+    """
+    긴 텍스트를 문단 → 문장 경계 순으로 max_chars 이하 조각으로 분할
+    조각은 원문 오프셋(start, end)으로 표현되어 이어 붙이면 원문과 같음
+
+    Args:
+        text: 원문
+        max_chars: 조각 최대 길이
+
+    Returns:
+        순서대로 번호가 매겨진 조각 목록 (짧은 텍스트면 1개)
+    """
+    units: List[Tuple[int, int]] = []
+    for p_start, p_end in _spans(text, _PARAGRAPH, 0, len(text)):
+        if p_end - p_start <= max_chars:
+            units.append((p_start, p_end))
+            continue
+        for s_start, s_end in _spans(text, _SENTENCE, p_start, p_end):
+            units.extend(_split_oversized(text, s_start, s_end, max_chars))
+
+    # 인접 단위를 max_chars까지 묶음
+    merged: List[Tuple[int, int]] = []
+    for start, end in units:
+        if merged and end - merged[-1][0] <= max_chars:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    return [TextChunk(index=i, start=start, end=end) for i, (start, end) in enumerate(merged)]
+
+
+def merge_analyses(
+    text: str,
+    chunks: List[TextChunk],
+    results: List[AnalysisResponse]
+) -> AnalysisResponse:
+    """
+    조각별 분석 결과를 하나의 AnalysisResponse로 병합
+    - 품사 태그: (단어, 품사) 기준 중복 제거, 처음 나온 순서 유지
+    - 문법 요소: (종류, 값) 기준 중복 제거
+    - TOEIC 파트: 조각 중 가장 높은 파트 (긴 지문일수록 Part 7)
+    """
+    pos_tags, seen_tags = [], set()
+    grammar_elements, seen_grammar = [], set()
+    for result in results:
+        for tag in result.pos_tags or []:
+            key = (tag.word.lower(), tag.pos)
+            if key not in seen_tags:
+                seen_tags.add(key)
+                pos_tags.append(tag)
+        for element in result.grammar_elements or []:
+            key = (element.type.lower(), element.value.lower())
+            if key not in seen_grammar:
+                seen_grammar.add(key)
+                grammar_elements.append(element)
+
+    structures = Counter(r.sentence_structure for r in results if r.sentence_structure)
+    parts = [r.toeic_part for r in results if r.toeic_part]
+    toeic_part: Optional[int] = max(parts) if parts else None
+    part_reason = next((r.toeic_part_reason for r in results if r.toeic_part == toeic_part), None)
+
+    for chunk, result in zip(chunks, results):
+        chunk.toeic_part = result.toeic_part
+        chunk.summary = result.summary
+
+    return AnalysisResponse(
+        original_text=text,
+        pos_tags=pos_tags,
+        grammar_elements=grammar_elements,
+        sentence_structure=structures.most_common(1)[0][0] if structures else None,
+        toeic_part=toeic_part,
+        toeic_part_reason=f"{part_reason} ({len(chunks)} chunks)" if part_reason else None,
+        summary=" ".join(r.summary for r in results if r.summary) or None,
+        chunks=chunks
+    )
@@ -0,0 +1,91 @@
+"""Request Deadline - Per-request time budget propagated to OCR, LLM and queue waits"""
+from typing import Optional, Awaitable, TypeVar
+from contextvars import ContextVar
+import asyncio
+import inspect
+import time
+
+T = TypeVar("T")
+
+_RESERVE = 0.2  # 응답 조립에 남겨 둘 시간 (초)
+
+
+class DeadlineExceeded(TimeoutError):
+    """요청 시간 예산 소진 - 하위 호출을 시작하지 않거나 진행 중인 호출을 취소"""
+
+
+class Deadline:
+    """요청 마감 시각 (time.monotonic 기준) - 예산 초과로 줄인 결과가 있었는지도 기록"""
+
+    def __init__(self, at: float):
+        self.at = at
+        self.exceeded = False
+
+
+# 현재 요청의 마감 (middleware/deadline.py에서 설정, None이면 예산 없음)
+# gather 등으로 만든 하위 태스크도 같은 객체를 보므로 exceeded 표시가 요청 전체에 공유됨
+request_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """남은 시간 (초), 예산이 없으면 None"""
+    deadline = request_deadline.get()
+    return None if deadline is None else deadline.at - time.monotonic()
+
+
+def expired() -> bool:
+    """응답 여유분을 빼면 남은 시간이 없음"""
+    left = remaining()
+    return left is not None and left <= _RESERVE
+
+
+def exceeded() -> bool:
+    """이 요청에서 예산 초과로 하위 호출을 건너뛰거나 취소한 적이 있음 (부분 결과)"""
+    deadline = request_deadline.get()
+    return deadline is not None and deadline.exceeded
+
+
+def mark_exceeded(message: str = "Request deadline exceeded") -> DeadlineExceeded:
+    """예산 초과 표시 후 raise할 예외 반환"""
+    deadline = request_deadline.get()
+    if deadline is not None:
+        deadline.exceeded = True
+    return DeadlineExceeded(message)
+
+
+def timeout_for(default: Optional[float] = None) -> Optional[float]:
+    """
+    하위 호출 타임아웃 - 기본값과 남은 예산(응답 여유분 제외) 중 작은 값
+
+    Raises:
+        DeadlineExceeded: 남은 예산 없음
+    """
+    left = remaining()
+    if left is None:
+        return default
+    left -= _RESERVE
+    if left <= 0:
+        raise mark_exceeded()
+    return left if default is None else min(default, left)
+
+
+async def within_deadline(awaitable: Awaitable[T], default: Optional[float] = None) -> T:
+    """
+    timeout_for(default) 안에 완료 - 넘으면 취소 (진행 중인 HTTP 요청도 끊김)
+
+    Raises:
+        DeadlineExceeded: 요청 예산 초과
+        TimeoutError: 예산은 남았지만 기본 타임아웃 초과
+    """
+    try:
+        timeout = timeout_for(default)
+    except DeadlineExceeded:
+        if inspect.iscoroutine(awaitable):
+            awaitable.close()  # 시작하지 않은 호출
+        raise
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        if expired():
+            raise mark_exceeded() from None
+        raise
@@ -0,0 +1,156 @@
+"""Difficulty Scorer - Lexicon-based difficulty estimation for source texts and problems"""
+from typing import Dict, Optional, Tuple
+import os
+import re
+from ..config import get_settings
+
+settings = get_settings()
+
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "word_levels.txt")
+
+RARE_LEVEL = 6  # 사전에 없는 단어
+ADVANCED_LEVEL = 4  # B2 이상은 고급 어휘
+BANDS = ("easy", "medium", "hard")
+_BAND_EDGES = (0.35, 0.6)  # 점수 0~1: easy < 0.35 <= medium < 0.6 <= hard
+
+_WORD = re.compile(r"[A-Za-z]+(?:'[a-z]+)?")
+_SENTENCE_END = re.compile(r"[.!?]+(?=\s|$)")
+_SUBORDINATORS = frozenset(
+    "although because since unless whereas while whether which who whom whose that if when once until".split()
+)
+
+# 변화형 → 원형 (앞에서부터 시도, 가장 쉬운 수준 사용)
+_SUFFIXES = (
+    ("'s", ""), ("ies", "y"), ("ied", "y"), ("ily", "y"), ("ing", ""), ("ing", "e"),
+    ("ed", ""), ("ed", "e"), ("es", ""), ("s", ""), ("ly", ""), ("er", ""), ("est", ""),
+)
+
+_CACHE_LIMIT = 50000
+
+
+def _load_levels(path: str) -> Dict[str, int]:
+    """'<수준> 단어 단어 ...' 형식 파일 → 단어별 수준"""
+    levels: Dict[str, int] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            level, *words = line.split()
+            for word in words:
+                levels.setdefault(word, int(level))
+    return levels
+
+
+def _clamp(value: float) -> float:
+    return 0.0 if value < 0 else 1.0 if value > 1 else value
+
+
+class DifficultyScorer:
+    """
+    어휘 수준 사전 기반 난이도 추정 (LLM 호출 없음, 텍스트당 수십 마이크로초)
+    - 단어 수준: TOEIC/CEFR 어휘 목록 (data/word_levels.txt, 1=A1 ~ 5=C1, 없으면 6)
+    - 특징: 고급 어휘 비율, 평균 어휘 수준, 문장당 단어 수, 문장당 종속절 수
+    - 점수 0~1 → easy / medium / hard
+    """
+
+    def __init__(self, path: str = LEXICON_PATH):
+        self._levels = _load_levels(path)
+        self._resolved: Dict[str, int] = {}  # 변화형 해석 결과 캐시
+
+    def word_level(self, word: str) -> int:
+        """소문자 단어의 수준 (변화형은 원형으로, 모르면 RARE_LEVEL)"""
+        level = self._resolved.get(word)
+        if level is not None:
+            return level
+
+        level = self._levels.get(word)
+        if level is None:
+            level = RARE_LEVEL
+            for suffix, replacement in _SUFFIXES:
+                if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+                    base = word[:-len(suffix)] + replacement
+                    found = self._levels.get(base)
+                    if found is None and len(base) > 3 and base[-1] == base[-2]:
+                        found = self._levels.get(base[:-1])  # running → run
+                    if found is not None and found < level:
+                        level = found
+        if len(self._resolved) < _CACHE_LIMIT:
+            self._resolved[word] = level
+        return level
+
+    def features(self, text: str) -> Tuple[float, float, float, float]:
+        """
+        (고급 어휘 비율, 평균 어휘 수준, 문장당 단어 수, 문장당 종속절 수)
+        사전에 없는 대문자 단어는 고유명사로 보고 어휘 특징에서 제외
+        """
+        words = _WORD.findall(text)
+        if not words:
+            return 0.0, 1.0, 0.0, 0.0
+
+        levels = []
+        clauses = 0
+        for word in words:
+            lower = word.lower()
+            if lower in _SUBORDINATORS:
+                clauses += 1
+            level = self.word_level(lower)
+            if level == RARE_LEVEL and word[0].isupper():
+                continue
+            levels.append(level)
+
+        sentences = len(_SENTENCE_END.findall(text)) or 1
+        if not levels:
+            return 0.0, 1.0, len(words) / sentences, clauses / sentences
+        advanced = sum(1 for level in levels if level >= ADVANCED_LEVEL)
+        return advanced / len(levels), sum(levels) / len(levels), len(words) / sentences, clauses / sentences
+
+    def score(self, text: str) -> float:
+        """텍스트 난이도 점수 0~1"""
+        advanced, mean_level, sentence_length, clauses = self.features(text)
+        return (
+            0.45 * _clamp(advanced / 0.35)
+            + 0.15 * _clamp((mean_level - 1) / (RARE_LEVEL - 1))
+            + 0.25 * _clamp((sentence_length - 8) / 22)
+            + 0.15 * _clamp(clauses / 2)
+        )
+
+    def problem_score(self, problem, passage: Optional[str] = None) -> float:
+        """
+        문제 난이도 점수 0~1 (Problem 또는 QuestionOutput)
+        지문(있으면) + 문제 문장 + 선택지 어휘 수준 (선택지별 가장 어려운 단어)
+        """
+        question = self.score(problem.question)
+        choice_levels = [
+            max((self.word_level(w.lower()) for w in _WORD.findall(choice.text)), default=1)
+            for choice in problem.choices
+        ]
+        choices = _clamp((sum(choice_levels) / len(choice_levels) - 1) / (RARE_LEVEL - 1)) if choice_levels else 0.0
+
+        passage = passage or getattr(problem, "passage", None)
+        if passage:
+            return 0.5 * self.score(passage) + 0.2 * question + 0.3 * choices
+        return 0.7 * question + 0.3 * choices
+
+    def band(self, score: float) -> str:
+        """점수 → easy / medium / hard"""
+        if score < _BAND_EDGES[0]:
+            return "easy"
+        return "medium" if score < _BAND_EDGES[1] else "hard"
+
+    def deviation(self, score: float, difficulty: str) -> float:
+        """
+        목표 난이도 구간(± difficulty_tolerance)에서 벗어난 정도
+        음수: 너무 쉬움, 양수: 너무 어려움, 0: 구간 안
+        """
+        edges = (0.0,) + _BAND_EDGES + (1.0,)
+        index = BANDS.index(difficulty) if difficulty in BANDS else 1
+        low, high = edges[index] - settings.difficulty_tolerance, edges[index + 1] + settings.difficulty_tolerance
+        if score < low:
+            return score - low
+        if score > high:
+            return score - high
+        return 0.0
+
+
+# 싱글톤 인스턴스
+difficulty_scorer = DifficultyScorer()
@@ -0,0 +1,201 @@
+"""Document OCR - Multi-page PDF/TIFF rasterization and page-parallel OCR"""
+from typing import AsyncIterator, Optional
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import UploadFile
+import asyncio
+import io
+import multiprocessing
+import os
+import tempfile
+import time
+from ..config import get_settings
+from ..schemas import OCRPage
+from .ocr_service import extract_text_from_image
+from .tracing import span
+from . import deadline
+
+settings = get_settings()
+
+DOCUMENT_TYPES = {
+    "application/pdf": "pdf",
+    "image/tiff": "tiff",
+    "image/tif": "tiff",
+}
+
+_UPLOAD_CHUNK = 1024 * 1024
+
+
+class DocumentTooLarge(ValueError):
+    """업로드 크기 또는 페이지 수 초과"""
+
+
+# --- 래스터화 (프로세스 풀에서 실행, 모듈 최상위 함수여야 pickle 가능) ---
+
+def _open_pdf(path: str):
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    return pymupdf.open(path)
+
+
+def _count_pages(path: str, kind: str) -> int:
+    if kind == "pdf":
+        with _open_pdf(path) as doc:
+            return doc.page_count
+    from PIL import Image
+    with Image.open(path) as image:
+        return getattr(image, "n_frames", 1)
+
+
+def _rasterize_page(path: str, kind: str, index: int, dpi: int) -> bytes:
+    """페이지 하나를 PNG로 변환 - 워커 프로세스에는 이 페이지 이미지만 메모리에 올라감"""
+    if kind == "pdf":
+        with _open_pdf(path) as doc:
+            return doc.load_page(index).get_pixmap(dpi=dpi).tobytes("png")
+
+    from PIL import Image
+    with Image.open(path) as image:
+        image.seek(index)
+        frame = image if image.mode in ("1", "L", "RGB") else image.convert("RGB")
+        buffer = io.BytesIO()
+        frame.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+
+class DocumentOCR:
+    """
+    다중 페이지 문서 OCR
+    - 업로드는 임시 파일로 저장 (메모리에 전체 문서를 올리지 않음)
+    - 페이지 래스터화는 프로세스 풀 (PyMuPDF / Pillow는 CPU 바운드)
+    - 래스터화 + OCR 중인 페이지는 ocr_page_concurrency개까지만 유지 → 페이지 수와 무관하게 메모리 상한
+    - 끝난 페이지부터 바로 반환 (문서 전체 시간 ≈ 가장 느린 몇 페이지)
+    """
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # spawn: 이벤트 루프/스레드를 가진 워커 프로세스를 fork하지 않음
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.ocr_rasterize_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    @staticmethod
+    def detect_kind(content_type: Optional[str], head: bytes) -> Optional[str]:
+        """MIME 타입 또는 파일 시그니처로 문서 종류 판별 (pdf | tiff | None)"""
+        if head.startswith(b"%PDF"):
+            return "pdf"
+        if head[:4] in (b"II*\x00", b"MM\x00*"):
+            return "tiff"
+        return DOCUMENT_TYPES.get((content_type or "").lower())
+
+    def supported(self, kind: str) -> bool:
+        """필요한 선택 의존성(PDF: PyMuPDF, TIFF: Pillow) 설치 여부"""
+        try:
+            if kind == "pdf":
+                try:
+                    import pymupdf  # noqa: F401
+                except ImportError:
+                    import fitz  # noqa: F401
+            else:
+                import PIL  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    async def save_upload(self, file: UploadFile, kind: str) -> str:
+        """
+        업로드를 임시 파일로 저장 (청크 단위)
+
+        Raises:
+            DocumentTooLarge: ocr_document_max_mb 초과
+        """
+        max_bytes = settings.ocr_document_max_mb * 1024 * 1024
+        handle = tempfile.NamedTemporaryFile(prefix="parsey_doc_", suffix=f".{kind}", delete=False)
+        size = 0
+        try:
+            with handle:
+                while chunk := await file.read(_UPLOAD_CHUNK):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise DocumentTooLarge(f"File size exceeds {settings.ocr_document_max_mb}MB limit")
+                    await asyncio.to_thread(handle.write, chunk)
+        except BaseException:
+            os.unlink(handle.name)
+            raise
+        return handle.name
+
+    async def count_pages(self, path: str, kind: str) -> int:
+        """
+        페이지 수
+
+        Raises:
+            DocumentTooLarge: ocr_document_max_pages 초과
+        """
+        loop = asyncio.get_running_loop()
+        pages = await loop.run_in_executor(self._get_pool(), _count_pages, path, kind)
+        if pages > settings.ocr_document_max_pages:
+            raise DocumentTooLarge(f"Document exceeds {settings.ocr_document_max_pages} pages")
+        return pages
+
+    async def _process_page(self, path: str, kind: str, index: int) -> OCRPage:
+        loop = asyncio.get_running_loop()
+        try:
+            started = time.perf_counter()
+            with span("rasterize_page"):
+                image = await loop.run_in_executor(
+                    self._get_pool(), _rasterize_page, path, kind, index, settings.ocr_document_dpi
+                )
+            rasterized = time.perf_counter()
+            result = await extract_text_from_image(image)
+            del image
+            finished = time.perf_counter()
+        except Exception as e:
+            print(f"Document page {index + 1} error: {e}")
+            return OCRPage(page=index + 1, success=False, text=f"Error: {str(e)}")
+
+        return OCRPage(
+            page=index + 1,
+            success=result.get("success", False),
+            text=result.get("text", ""),
+            confidence=result.get("confidence"),
+            language=result.get("language"),
+            rasterize_ms=round((rasterized - started) * 1000, 1),
+            ocr_ms=round((finished - rasterized) * 1000, 1)
+        )
+
+    async def iter_pages(self, path: str, kind: str, pages: int) -> AsyncIterator[OCRPage]:
+        """
+        페이지별 OCR 결과를 완료 순서대로 반환
+        동시에 처리 중인 페이지는 ocr_page_concurrency개 이하 (하나 끝나면 다음 페이지 시작)
+        요청 시간 예산(X-Request-Timeout)이 끝나면 처리 중인 페이지는 취소 → 끝난 페이지까지만
+        """
+        limit = max(1, settings.ocr_page_concurrency)
+        next_page = 0
+        pending = set()
+        try:
+            while pending or (next_page < pages and not deadline.expired()):
+                while next_page < pages and len(pending) < limit and not deadline.expired():
+                    pending.add(asyncio.create_task(self._process_page(path, kind, next_page)))
+                    next_page += 1
+                try:
+                    timeout = deadline.timeout_for()
+                except deadline.DeadlineExceeded:
+                    break  # 처리 중인 페이지는 취소하고 요약으로
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            # 클라이언트 연결 종료 등으로 중단되면 남은 페이지 취소
+            for task in pending:
+                task.cancel()
+
+
+# 싱글톤 인스턴스
+document_ocr = DocumentOCR()
@@ -0,0 +1,76 @@
+"""Explanation Store - Lazily generated problem explanations referenced by problem_id"""
+from typing import Optional
+from collections import OrderedDict
+import threading
+import time
+import uuid
+from ..config import get_settings
+from ..schemas import Problem
+from .metrics import metrics
+
+settings = get_settings()
+
+
+class ExplanationStore:
+    """
+    해설 지연 생성용 문제 저장소 (프로세스 메모리, TTL + LRU)
+    lazy_explanation 생성 시 문제와 짧은 근거(rationale)를 저장해 두고
+    /api/generate/explanation 요청 때 전체 해설을 만들어 같은 항목에 캐시
+    - 멀티 워커에서는 다른 워커가 저장한 ID를 찾지 못할 수 있음 → 요청에 문제를 함께 보내면 그걸로 생성 (새 ID로 저장)
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, problem: Problem, passage: Optional[str] = None) -> str:
+        """
+        문제 저장 후 problem_id 반환
+
+        Args:
+            problem: explanation에 짧은 근거가 들어 있는 문제
+            passage: 세트 문항이면 공유 지문 (problem.passage는 비어 있음)
+        """
+        problem_id = uuid.uuid4().hex
+        record = {"problem": problem, "passage": passage or problem.passage, "explanation": None}
+        with self._lock:
+            self._entries[problem_id] = (time.monotonic() + self.ttl_seconds, record)
+            self._entries.move_to_end(problem_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return problem_id
+
+    def get(self, problem_id: str) -> Optional[dict]:
+        """저장된 항목 {"problem", "passage", "explanation"(생성 전이면 None)} - 없거나 만료됐으면 None"""
+        with self._lock:
+            entry = self._entries.get(problem_id)
+            if entry is None:
+                return None
+            expires, record = entry
+            if expires < time.monotonic():
+                del self._entries[problem_id]
+                return None
+            self._entries.move_to_end(problem_id)
+            return record
+
+    def save_explanation(self, problem_id: str, explanation: str) -> None:
+        """생성한 전체 해설 캐시 (항목이 이미 없어졌으면 무시)"""
+        with self._lock:
+            entry = self._entries.get(problem_id)
+            if entry is not None:
+                entry[1]["explanation"] = explanation
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# 싱글톤 인스턴스
+explanation_store = ExplanationStore(settings.explanation_store_ttl_seconds, settings.explanation_store_max_entries)
+
+metrics.gauge(
+    "parsey_explanation_store_entries",
+    "Problems held for on-demand explanation by problem_id",
+    lambda: [({}, len(explanation_store))],
+)
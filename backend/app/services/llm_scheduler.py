@@ -0,0 +1,312 @@
+"""LLM Scheduler - Rate-limit-aware priority scheduling for outgoing LLM calls"""
+from typing import Optional, List, Tuple, Any, Dict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import asyncio
+import heapq
+import itertools
+import time
+from ..config import get_settings
+from .rate_limit import TokenBucket
+from .metrics import metrics
+from .tracing import span
+from . import deadline
+
+settings = get_settings()
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+_PRIORITY_RANK = {PRIORITY_INTERACTIVE: 0, PRIORITY_BULK: 1}
+
+# 현재 요청의 우선순위 (main.py 미들웨어에서 X-Request-Priority 헤더로 설정)
+request_priority: ContextVar[str] = ContextVar("request_priority", default=PRIORITY_INTERACTIVE)
+
+
+def normalize_priority(value: Optional[str]) -> str:
+    """헤더 값 등을 알려진 우선순위 클래스로 정규화"""
+    if value and value.strip().lower() in _PRIORITY_RANK:
+        return value.strip().lower()
+    return PRIORITY_INTERACTIVE
+
+
+def estimate_tokens(*texts: str, expected_output_tokens: int = 0) -> int:
+    """대략적인 토큰 수 추정 (영문 기준 4자 ≈ 1토큰)"""
+    return sum(len(t) for t in texts) // 4 + expected_output_tokens
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """프로바이더의 429 / 쿼터 초과 오류 여부"""
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    return type(exc).__name__ in ("RateLimitError", "ResourceExhausted", "TooManyRequests")
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """오류 응답의 Retry-After 헤더(초) 추출"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _usage_tokens(usage: Any) -> Optional[int]:
+    """OpenAI usage / Gemini usage_metadata / 정수에서 총 토큰 수 추출"""
+    if usage is None:
+        return None
+    if isinstance(usage, (int, float)):
+        return int(usage)
+    total = getattr(usage, "total_tokens", None)
+    if total is None:
+        total = getattr(usage, "total_token_count", None)
+    return int(total) if total is not None else None
+
+
+class LLMTicket:
+    """스케줄러가 발급한 호출 슬롯"""
+
+    def __init__(self, estimated_tokens: int, priority: str):
+        self.estimated_tokens = estimated_tokens
+        self.priority = priority
+        self.actual_tokens: Optional[int] = None
+        self.granted_at = time.monotonic()
+
+    def record_usage(self, usage: Any) -> None:
+        """응답의 실제 usage 기록 (반환 시 TPM 버킷 보정에 사용)"""
+        tokens = _usage_tokens(usage)
+        if tokens is not None:
+            self.actual_tokens = tokens
+
+
+class LLMScheduler:
+    """
+    LLM 호출 스케줄러
+    - RPM / TPM 토큰 버킷 (추정치로 선차감, 실제 usage로 보정)
+    - 우선순위 클래스 (interactive > bulk, bulk는 예비 용량을 사용하지 못함)
+    - 적응형 동시성 (429 수신 시 절반으로 감소, 성공 시 점진적 증가)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        bulk_reserve_ratio: float = 0.2,
+    ):
+        self._rpm = TokenBucket(requests_per_minute)
+        self._tpm = TokenBucket(tokens_per_minute)
+        self._max_concurrency = max(1, max_concurrency)
+        self._limit = float(self._max_concurrency)
+        self._bulk_reserve_ratio = bulk_reserve_ratio
+        self._in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future, int]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._paused_until = 0.0
+        self._last_backoff = 0.0
+        self._counts = {"granted": 0, "rate_limited": 0, "errors": 0}
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int, priority: Optional[str] = None):
+        """
+        호출 슬롯 획득 컨텍스트
+
+        Usage:
+            async with llm_scheduler.slot(estimated) as ticket:
+                response = await client.chat.completions.create(...)
+                ticket.record_usage(response.usage)
+        """
+        ticket = await self.acquire(estimated_tokens, priority)
+        try:
+            yield ticket
+        except BaseException as e:
+            self.release(ticket, error=e)
+            raise
+        else:
+            self.release(ticket)
+
+    async def acquire(self, estimated_tokens: int, priority: Optional[str] = None) -> LLMTicket:
+        """
+        우선순위 큐에서 대기 후 슬롯 획득 (요청 예산이 있으면 그 안에서만 대기)
+
+        Raises:
+            DeadlineExceeded: 예산 안에 슬롯을 받지 못함
+        """
+        timeout = deadline.timeout_for()
+        priority = normalize_priority(priority or request_priority.get())
+        rank = _PRIORITY_RANK[priority]
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (rank, next(self._seq), future, estimated_tokens))
+        self._dispatch()
+
+        try:
+            with span("llm_queue"):
+                await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            # wait_for가 future를 취소 → _dispatch가 대기열에서 제거
+            raise deadline.mark_exceeded("Request deadline exceeded while queued for an LLM slot") from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 슬롯을 받은 직후 취소됨 - 용량 반환
+                self._in_flight -= 1
+                self._rpm.adjust(1)
+                self._tpm.adjust(estimated_tokens)
+                self._dispatch()
+            raise
+
+        self._counts["granted"] += 1
+        return LLMTicket(estimated_tokens, priority)
+
+    def release(self, ticket: LLMTicket, error: Optional[BaseException] = None) -> None:
+        """슬롯 반환 및 동시성 한도 조정"""
+        self._in_flight -= 1
+
+        if ticket.actual_tokens is not None:
+            self._tpm.adjust(ticket.estimated_tokens - ticket.actual_tokens)
+
+        if error is not None and is_rate_limit_error(error):
+            self._counts["rate_limited"] += 1
+            self._back_off(_retry_after(error))
+        elif error is not None:
+            if not isinstance(error, asyncio.CancelledError):
+                self._counts["errors"] += 1
+        else:
+            # Additive increase
+            self._limit = min(self._max_concurrency, self._limit + 1.0 / self._limit)
+
+        self._dispatch()
+
+    def _back_off(self, retry_after: Optional[float]) -> None:
+        """Multiplicative decrease - 동시에 도착한 429들은 한 번만 반영"""
+        now = time.monotonic()
+        if now - self._last_backoff >= 1.0:
+            self._limit = max(1.0, self._limit / 2)
+            self._last_backoff = now
+        self._paused_until = max(self._paused_until, now + (retry_after or 1.0))
+
+    def _dispatch(self) -> None:
+        """대기열 선두부터 용량이 허락하는 만큼 슬롯 배정"""
+        while self._waiters:
+            rank, _, future, tokens = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            if self._in_flight >= int(self._limit):
+                return  # release() 시 재시도
+
+            reserve_ratio = self._bulk_reserve_ratio if rank > 0 else 0.0
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self._rpm.time_until(1, reserve_ratio * self._rpm.capacity),
+                self._tpm.time_until(tokens, reserve_ratio * self._tpm.capacity),
+            )
+            if wait > 0:
+                self._schedule(wait)
+                return
+
+            heapq.heappop(self._waiters)
+            self._rpm.consume(1)
+            self._tpm.consume(tokens)
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        """버킷 리필 시점에 다시 dispatch"""
+        if self._timer is not None:
+            self._timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def overloaded(self, max_waiting: int, priority: Optional[str] = None) -> bool:
+        """
+        새 호출을 보내지 않는 편이 나은 상태 (호출 측에서 로컬 처리로 전환)
+        - 429로 일시 정지 중
+        - 대기 호출이 max_waiting 이상 (bulk 요청은 절반에서 먼저 전환)
+        """
+        if max_waiting <= 0:
+            return False
+        if self._paused_until > time.monotonic():
+            return True
+        priority = normalize_priority(priority or request_priority.get())
+        limit = max_waiting if priority == PRIORITY_INTERACTIVE else max(1, max_waiting // 2)
+        waiting = sum(1 for _, _, future, _ in self._waiters if not future.done())
+        return waiting >= limit
+
+    def stats(self) -> dict:
+        """스케줄러 상태"""
+        waiting = {p: 0 for p in _PRIORITY_RANK}
+        for rank, _, future, _ in self._waiters:
+            if not future.done():
+                waiting[next(p for p, r in _PRIORITY_RANK.items() if r == rank)] += 1
+        return {
+            "in_flight": self._in_flight,
+            "concurrency_limit": int(self._limit),
+            "waiting": waiting,
+            "rpm_available": round(self._rpm.available(), 1),
+            "tpm_available": round(self._tpm.available(), 1),
+            **self._counts,
+        }
+
+
+# 싱글톤 인스턴스
+llm_scheduler = LLMScheduler(
+    requests_per_minute=settings.llm_requests_per_minute,
+    tokens_per_minute=settings.llm_tokens_per_minute,
+    max_concurrency=settings.llm_max_concurrency,
+    bulk_reserve_ratio=settings.llm_bulk_reserve_ratio,
+)
+
+# 전용 한도가 설정된 모델의 스케줄러 (llm_model_limits - 프로바이더 쿼터는 모델별)
+model_schedulers: Dict[str, LLMScheduler] = {
+    model: LLMScheduler(
+        requests_per_minute=rpm,
+        tokens_per_minute=tpm,
+        max_concurrency=concurrency,
+        bulk_reserve_ratio=settings.llm_bulk_reserve_ratio,
+    )
+    for model, (rpm, tpm, concurrency) in settings.llm_model_limits_map.items()
+}
+
+
+def scheduler_for(model: Optional[str]) -> LLMScheduler:
+    """모델 호출에 사용할 스케줄러 - 전용 한도가 없으면 공용 llm_scheduler"""
+    return model_schedulers.get(model, llm_scheduler)
+
+metrics.gauge(
+    "parsey_llm_scheduler_in_flight",
+    "LLM calls currently holding a scheduler slot",
+    lambda: [({}, llm_scheduler.stats()["in_flight"])],
+)
+metrics.gauge(
+    "parsey_llm_scheduler_concurrency_limit",
+    "Current adaptive LLM concurrency limit",
+    lambda: [({}, llm_scheduler.stats()["concurrency_limit"])],
+)
+metrics.gauge(
+    "parsey_llm_scheduler_waiting",
+    "LLM calls waiting for a scheduler slot",
+    lambda: [({"priority": p}, n) for p, n in llm_scheduler.stats()["waiting"].items()],
+    labelnames=("priority",),
+)
+metrics.gauge(
+    "parsey_llm_model_scheduler_in_flight",
+    "LLM calls holding a slot of a model with dedicated limits",
+    lambda: [({"model": model}, scheduler.stats()["in_flight"]) for model, scheduler in model_schedulers.items()],
+    labelnames=("model",),
+)
+metrics.gauge(
+    "parsey_llm_model_scheduler_waiting",
+    "LLM calls waiting for a slot of a model with dedicated limits",
+    lambda: [
+        ({"model": model}, sum(scheduler.stats()["waiting"].values())) for model, scheduler in model_schedulers.items()
+    ],
+    labelnames=("model",),
+)
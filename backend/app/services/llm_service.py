@@ -1,8 +1,16 @@
 """LLM Service - OpenAI/Gemini Integration for Text Analysis"""
-from typing import Optional, List
-import json
+from typing import Optional, List, Union
+import asyncio
 from ..config import get_settings
-from ..schemas import POSTag, GrammarElement
+from ..schemas import POSTag, GrammarElement, AnalysisOutput, AnalysisResponse
+from .llm_scheduler import scheduler_for, estimate_tokens
+from .metrics import metrics
+from .tracing import span
+from .transport import get_http_client
+from .model_router import model_router
+from . import deadline
+from .chunking import split_text, merge_analyses
+from .structured_output import OutputParseError, parse_model_output, fix_analysis_data, response_format_for
 
 settings = get_settings()
 
@@ -14,17 +22,26 @@ class LLMService:
         self.provider = settings.llm_provider
         self.model = settings.llm_model
         self._client = None
+        self._http_client = None
     
     async def _get_client(self):
         """LLM 클라이언트 초기화"""
-        if self._client is None:
-            if self.provider == "openai":
+        if self.provider == "openai":
+            # 공유 httpx 클라이언트가 바뀌면 (이벤트 루프 교체 등) 재생성
+            http_client = get_http_client()
+            if self._client is None or self._http_client is not http_client:
                 try:
                     from openai import AsyncOpenAI
-                    self._client = AsyncOpenAI(api_key=settings.openai_api_key)
+                    self._client = AsyncOpenAI(
+                        api_key=settings.openai_api_key,
+                        base_url=settings.openai_base_url,
+                        http_client=http_client
+                    )
+                    self._http_client = http_client
                 except ImportError:
                     self._client = None
-            elif self.provider == "gemini":
+        elif self._client is None:
+            if self.provider == "gemini":
                 try:
                     import google.generativeai as genai
                     genai.configure(api_key=settings.google_api_key)
@@ -33,43 +50,98 @@ class LLMService:
                     self._client = None
         return self._client
     
-    async def analyze_text(self, text: str) -> dict:
+    async def warmup(self) -> None:
+        """provider SDK import 및 클라이언트 생성을 미리 수행"""
+        if settings.openai_api_key or self.provider == "gemini":
+            await self._get_client()
+    
+    async def analyze_text(self, text: str) -> AnalysisResponse:
         """
         텍스트 분석 수행
         - 품사 분류
         - 문법 요소 식별
         - 문장 구조 분석
         - TOEIC 파트 판별
+        
+        analysis_chunk_chars보다 긴 텍스트는 문단/문장 경계에서 나눠 동시에 분석한 뒤 병합
+        (각 조각 호출은 LLM 스케줄러가 동시성/쿼터를 조절)
         """
-        client = await self._get_client()
+        if len(text) <= settings.analysis_chunk_chars:
+            return await self._analyze_single(text)
         
-        if client is None or not settings.openai_api_key:
-            return await self._simulate_analysis(text)
+        chunks = split_text(text, settings.analysis_chunk_chars)
+        with span("analyze_chunks", provider=self.provider, model=self.model, chunks=len(chunks)):
+            results = await asyncio.gather(*[
+                self._analyze_single(text[chunk.start:chunk.end].strip()) for chunk in chunks
+            ])
+            return merge_analyses(text, chunks, list(results))
+    
+    async def _analyze_single(self, text: str) -> AnalysisResponse:
+        """
+        텍스트 한 덩어리 분석 (LLM 호출 1회)
+        OpenAI는 입력 복잡도에 따라 작은/큰 모델 - 작은 모델 출력이 검증에 실패하면 큰 모델로 한 번 더
+        """
+        client = await self._get_client() if settings.openai_api_key else None
         
-        try:
-            prompt = self._build_analysis_prompt(text)
-            
-            if self.provider == "openai":
-                response = await client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are an expert English linguist and TOEIC instructor. Analyze the given text precisely."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.2
-                )
-                result = json.loads(response.choices[0].message.content)
-            else:
-                # Gemini
-                response = await client.generate_content_async(prompt)
-                result = json.loads(response.text)
-            
-            return self._parse_analysis_result(text, result)
-            
-        except Exception as e:
-            print(f"LLM Analysis Error: {e}")
+        if client is None:
+            metrics.fallbacks.inc(stage="analyze_text", provider=self.provider, model=self.model)
             return await self._simulate_analysis(text)
+        
+        models = model_router.cascade(text, "analyze_text") if self.provider == "openai" else [self.model]
+        for model in models:
+            labels = {"provider": self.provider, "model": model}
+            try:
+                return await self._analyze_with(client, text, labels)
+            except Exception as e:
+                print(f"LLM Analysis Error ({model}): {e}")
+                metrics.errors.inc(stage="analyze_text", **labels)
+                if isinstance(e, OutputParseError):
+                    metrics.llm_outputs.inc(stage="analyze_text", outcome="failed", **labels)
+                    if not deadline.expired():
+                        continue  # 작은 모델이었으면 큰 모델로 승격
+                break
+        
+        metrics.fallbacks.inc(stage="analyze_text", **labels)
+        return await self._simulate_analysis(text)
+    
+    async def _analyze_with(self, client, text: str, labels: dict) -> AnalysisResponse:
+        """labels["model"]로 분석 호출 후 파싱 (모델별 스케줄러)"""
+        prompt = self._build_analysis_prompt(text)
+        # 품사 태그가 단어마다 출력되므로 출력 토큰은 단어 수에 비례
+        estimated = estimate_tokens(
+            prompt, expected_output_tokens=300 + 15 * len(text.split())
+        )
+        
+        async with scheduler_for(labels["model"]).slot(estimated) as ticket:
+            with span("analyze_text", **labels):
+                # 호출 타임아웃은 요청 예산에서 (넘으면 호출 취소 후 시뮬레이션 분석)
+                if self.provider == "openai":
+                    response = await deadline.within_deadline(client.chat.completions.create(
+                        model=labels["model"],
+                        messages=[
+                            {"role": "system", "content": "You are an expert English linguist and TOEIC instructor. Analyze the given text precisely."},
+                            {"role": "user", "content": prompt}
+                        ],
+                        response_format=(
+                            response_format_for(AnalysisOutput)
+                            if settings.llm_structured_output else {"type": "json_object"}
+                        ),
+                        temperature=0.2
+                    ), settings.llm_timeout_seconds)
+                    usage = response.usage
+                    content = response.choices[0].message.content
+                else:
+                    # Gemini
+                    response = await deadline.within_deadline(
+                        client.generate_content_async(prompt), settings.llm_timeout_seconds
+                    )
+                    usage = getattr(response, "usage_metadata", None)
+                    content = response.text
+            ticket.record_usage(usage)
+        metrics.observe_llm_usage(usage, **labels)
+        
+        with span("parse_analysis", **labels):
+            return self._parse_analysis_result(text, content, labels)
     
     def _build_analysis_prompt(self, text: str) -> str:
         """분석 프롬프트 생성"""
@@ -96,26 +168,25 @@ TOEIC Part Guidelines:
 - Part 6: Short passages with multiple blanks (text completion)
 - Part 7: Reading comprehension passages (emails, memos, articles, etc.)"""
     
-    def _parse_analysis_result(self, original_text: str, result: dict) -> dict:
-        """분석 결과 파싱"""
-        pos_tags = [
-            POSTag(**tag) for tag in result.get("pos_tags", [])
-        ]
-        grammar_elements = [
-            GrammarElement(**elem) for elem in result.get("grammar_elements", [])
-        ]
+    def _parse_analysis_result(self, original_text: str, content: Union[str, bytes], labels: dict) -> AnalysisResponse:
+        """
+        분석 결과 파싱 - 프로바이더 JSON을 중간 dict 없이 모델로 바로 검증
+        검증 실패 시 로컬 JSON 복구 후 재검증 (응답을 버리지 않음)
+        """
+        result, outcome = parse_model_output(AnalysisOutput, content, fix=fix_analysis_data)
+        metrics.llm_outputs.inc(stage="analyze_text", outcome=outcome, **labels)
         
-        return {
-            "original_text": original_text,
-            "pos_tags": pos_tags,
-            "grammar_elements": grammar_elements,
-            "sentence_structure": result.get("sentence_structure"),
-            "toeic_part": result.get("toeic_part"),
-            "toeic_part_reason": result.get("toeic_part_reason"),
-            "summary": result.get("summary")
-        }
+        return AnalysisResponse.model_construct(
+            original_text=original_text,
+            pos_tags=result.pos_tags,
+            grammar_elements=result.grammar_elements,
+            sentence_structure=result.sentence_structure,
+            toeic_part=result.toeic_part,
+            toeic_part_reason=result.toeic_part_reason,
+            summary=result.summary
+        )
     
-    async def _simulate_analysis(self, text: str) -> dict:
+    async def _simulate_analysis(self, text: str) -> AnalysisResponse:
         """시뮬레이션 분석 (API 없을 때)"""
         # 기본적인 분석 시뮬레이션
         words = text.split()
@@ -174,16 +245,16 @@ TOEIC Part Guidelines:
             toeic_part = 7
             part_reason = "Longer passage suitable for reading comprehension"
         
-        return {
-            "original_text": text,
-            "pos_tags": pos_tags,
-            "grammar_elements": grammar_elements,
-            "sentence_structure": "Simple" if sentence_count <= 1 else "Complex",
-            "toeic_part": toeic_part,
-            "toeic_part_reason": part_reason,
-            "summary": f"Text containing {word_count} words in {max(1, sentence_count)} sentence(s).",
-            "_note": "Simulated analysis (No API key configured)"
-        }
+        # Simulated analysis (No API key configured)
+        return AnalysisResponse(
+            original_text=text,
+            pos_tags=pos_tags,
+            grammar_elements=grammar_elements,
+            sentence_structure="Simple" if sentence_count <= 1 else "Complex",
+            toeic_part=toeic_part,
+            toeic_part_reason=part_reason,
+            summary=f"Text containing {word_count} words in {max(1, sentence_count)} sentence(s)."
+        )
 
 
 # 싱글톤 인스턴스
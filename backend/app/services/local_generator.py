@@ -0,0 +1,681 @@
+"""Local Generator - Rule-based TOEIC problem generation without an LLM (degraded mode)"""
+from typing import Dict, List, Optional, Sequence, Tuple
+from functools import lru_cache
+import random
+import re
+import zlib
+from ..schemas import Problem, Choice
+
+LABELS = ("A", "B", "C", "D")
+BLANK = "_______"
+
+
+# --- 어휘 데이터 ---
+
+# 불규칙 동사: 원형, 과거, 과거분사 (3인칭 단수/-ing는 규칙으로 생성)
+_IRREGULAR_VERBS = """
+begin began begun|bring brought brought|build built built|buy bought bought|choose chose chosen
+come came come|draw drew drawn|drive drove driven|find found found|give gave given|go went gone
+grow grew grown|hold held held|keep kept kept|know knew known|lead led led|leave left left
+make made made|meet met met|pay paid paid|rise rose risen|run ran run|see saw seen|sell sold sold
+send sent sent|show showed shown|speak spoke spoken|spend spent spent|take took taken
+teach taught taught|tell told told|think thought thought|write wrote written|win won won
+"""
+
+# 규칙 동사 (TOEIC 빈출)
+_REGULAR_VERBS = """
+accept access add address adjust announce apply approve arrange arrive assist attach attend
+complete confirm consider contact continue create decide deliver design develop discuss
+expand expect extend finish focus follow hire implement improve include increase inform
+install introduce invite join launch manage notify offer order organize postpone prepare
+present process produce provide purchase receive recommend reduce register renovate replace
+report request require reserve resolve review revise schedule serve ship submit support
+train transfer update visit
+"""
+
+# 품사별 파생어 묶음 (word form 문제)
+_WORD_FAMILIES = """
+noun:success verb:succeed adj:successful adv:successfully
+noun:decision verb:decide adj:decisive adv:decisively
+noun:efficiency adj:efficient adv:efficiently noun:efficiencies
+noun:addition verb:add adj:additional adv:additionally
+noun:competition verb:compete adj:competitive adv:competitively
+noun:expansion verb:expand adj:expansive adv:expansively
+noun:attraction verb:attract adj:attractive adv:attractively
+noun:creation verb:create adj:creative adv:creatively
+noun:production verb:produce adj:productive adv:productively
+noun:effect adj:effective adv:effectively noun:effectiveness
+noun:information verb:inform adj:informative adv:informatively
+noun:preparation verb:prepare adj:preparatory noun:preparations
+noun:approval verb:approve adv:approvingly noun:approvals
+noun:agreement verb:agree adj:agreeable adv:agreeably
+noun:management verb:manage adj:manageable noun:manager
+noun:employment verb:employ noun:employee noun:employer
+noun:payment verb:pay adj:payable noun:payments
+noun:development verb:develop adj:developmental noun:developer
+noun:announcement verb:announce noun:announcements noun:announcer
+noun:reliability verb:rely adj:reliable adv:reliably
+noun:availability verb:avail adj:available noun:availabilities
+noun:responsibility adj:responsible adv:responsibly noun:responsibilities
+noun:possibility adj:possible adv:possibly noun:possibilities
+noun:accuracy adj:accurate adv:accurately noun:accuracies
+noun:difference verb:differ adj:different adv:differently
+noun:dependence verb:depend adj:dependent adv:dependently
+noun:confidence verb:confide adj:confident adv:confidently
+noun:convenience adj:convenient adv:conveniently noun:conveniences
+noun:performance verb:perform noun:performer noun:performances
+noun:assistance verb:assist adj:assistive noun:assistant
+noun:attendance verb:attend adj:attentive noun:attendee
+noun:appearance verb:appear adj:apparent adv:apparently
+noun:permission verb:permit adj:permissible noun:permissions
+noun:recommendation verb:recommend adj:recommendable noun:recommendations
+noun:registration verb:register noun:registrant noun:registrations
+noun:consideration verb:consider adj:considerable adv:considerably
+noun:satisfaction verb:satisfy adj:satisfactory adv:satisfactorily
+noun:qualification verb:qualify noun:qualifications noun:qualifier
+noun:profit adj:profitable adv:profitably noun:profitability
+noun:care adj:careful adv:carefully noun:carefulness
+noun:frequency adj:frequent adv:frequently noun:frequencies
+noun:quickness adj:quick adv:quickly verb:quicken
+noun:regularity adj:regular adv:regularly verb:regularize
+noun:sufficiency adj:sufficient adv:sufficiently verb:suffice
+noun:probability adj:probable adv:probably noun:probabilities
+noun:extension verb:extend adj:extensive adv:extensively
+noun:innovation verb:innovate adj:innovative adv:innovatively
+noun:operation verb:operate adj:operational adv:operationally
+noun:expectation verb:expect adj:expectant adv:expectantly
+"""
+
+# 혼동 기능어 묶음 (종류, 해설 규칙, 단어들)
+_CONFUSABLES = (
+    ("pronoun", "Choose the case the position requires: subject, possessive, object, or reflexive.",
+     ("he", "his", "him", "himself")),
+    ("pronoun", "Choose the case the position requires: subject, possessive, object, or reflexive.",
+     ("she", "her", "hers", "herself")),
+    ("pronoun", "Choose the case the position requires: subject, possessive, object, or reflexive.",
+     ("they", "their", "them", "themselves")),
+    ("pronoun", "Choose the case the position requires: subject, possessive, object, or reflexive.",
+     ("we", "our", "us", "ourselves")),
+    ("pronoun", "Choose the case the position requires: subject, possessive, object, or reflexive.",
+     ("you", "your", "yours", "yourself")),
+    ("pronoun", "'Its' is possessive, 'it's' means 'it is', and 'itself' is reflexive.",
+     ("its", "it's", "itself", "it")),
+    ("relative pronoun", "The relative pronoun must match its antecedent and its role in the clause.",
+     ("who", "whom", "whose", "which")),
+    ("preposition", "Time and place prepositions are fixed by the noun that follows.",
+     ("in", "on", "at", "into")),
+    ("preposition", "'During' and 'throughout' take a noun phrase; 'while' introduces a clause.",
+     ("during", "while", "throughout", "among")),
+    ("preposition", "'By' marks a deadline, 'until' a continuing state, 'within' a period, 'since' a starting point.",
+     ("by", "until", "within", "since")),
+    ("preposition", "Choose the preposition that expresses the relationship between the nouns.",
+     ("for", "of", "with", "from")),
+    ("preposition", "'Between' links two items; 'among' three or more; 'across' and 'through' describe movement.",
+     ("between", "among", "across", "through")),
+    ("conjunction", "'Although' and 'because' introduce clauses; 'despite' and 'due to' take noun phrases.",
+     ("although", "despite", "because", "due to")),
+    ("conjunction", "'Unless' means 'if not'; 'if', 'whether' and 'once' introduce conditions or time.",
+     ("if", "unless", "whether", "once")),
+    ("conjunction", "Correlative pairs are fixed: both/and, either/or, neither/nor, not only/but also.",
+     ("and", "or", "nor", "but")),
+    ("connective", "The transition must match the logical relation between the two sentences.",
+     ("however", "therefore", "moreover", "otherwise")),
+    ("connective", "The transition must match the logical relation between the two sentences.",
+     ("consequently", "nevertheless", "furthermore", "instead")),
+    ("quantifier", "'Many' and 'few' take plural countable nouns; 'much' and 'little' take uncountable nouns.",
+     ("many", "much", "few", "little")),
+    ("quantifier", "'Each' and 'every' take a singular noun; 'all' and 'most' take plural or uncountable nouns.",
+     ("each", "every", "all", "most")),
+    ("comparative", "The degree form must match 'than', 'the', or the absence of a comparison.",
+     ("more", "most", "less", "least")),
+)
+
+# be 동사 (수 일치 / 시제)
+_BE_FORMS = ("is", "are", "was", "were", "be", "been", "being")
+
+# 어휘 문제용 유의어 (Part 7 vocabulary-in-context)
+_SYNONYMS = {
+    "commence": "begin", "purchase": "buy", "assist": "help", "approximately": "about",
+    "obtain": "get", "reside": "live", "inquire": "ask", "terminate": "end",
+    "sufficient": "enough", "vital": "essential", "notify": "inform", "postpone": "delay",
+    "expand": "grow", "modify": "change", "attempt": "try", "complimentary": "free",
+    "renowned": "famous", "anticipate": "expect", "retain": "keep", "verify": "confirm",
+    "annual": "yearly", "frequently": "often", "primary": "main", "require": "need",
+    "select": "choose", "demonstrate": "show", "numerous": "many", "relocate": "move",
+    "reimburse": "repay", "currently": "now", "additional": "extra", "prior": "earlier",
+    "facility": "building", "colleague": "coworker", "candidate": "applicant",
+    "schedule": "timetable", "revenue": "income", "respond": "reply",
+    "launch": "introduce", "reduce": "cut", "assemble": "gather", "conclude": "finish",
+}
+
+_DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_MONTHS = ("January", "February", "March", "April", "May", "June", "July",
+           "August", "September", "October", "November", "December")
+
+# 빈칸/세부 정보 후보가 하나도 없는 텍스트 대신 사용하는 예문
+_DEFAULT_TEXT = (
+    "The project deadline was extended because the supplier could not deliver the materials on time. "
+    "Our team will meet on Monday to review the revised schedule."
+)
+
+# 난이도별 우선 출제 유형
+_DIFFICULTY_ORDER = {
+    "easy": ("pronoun", "preposition", "be", "quantifier", "word form", "verb", "conjunction",
+             "relative pronoun", "comparative", "connective"),
+    "medium": ("word form", "verb", "be", "pronoun", "conjunction", "preposition", "quantifier",
+               "comparative", "relative pronoun", "connective"),
+    "hard": ("connective", "conjunction", "relative pronoun", "verb", "word form", "comparative",
+             "quantifier", "preposition", "be", "pronoun"),
+}
+
+
+def _third_person(base: str) -> str:
+    if base.endswith(("s", "sh", "ch", "x", "z", "o")):
+        return base + "es"
+    if base.endswith("y") and base[-2:-1] not in "aeiou":
+        return base[:-1] + "ies"
+    return base + "s"
+
+
+def _ing(base: str) -> str:
+    if base.endswith("ie"):
+        return base[:-2] + "ying"
+    if base.endswith("e") and not base.endswith(("ee", "ye", "oe")):
+        return base[:-1] + "ing"
+    if base in ("begin", "run", "win", "plan", "ship", "stop", "admit", "submit", "transfer"):
+        return base + base[-1] + "ing"
+    return base + "ing"
+
+
+def _past(base: str) -> str:
+    if base.endswith("e"):
+        return base + "d"
+    if base.endswith("y") and base[-2:-1] not in "aeiou":
+        return base[:-1] + "ied"
+    if base in ("plan", "ship", "stop", "admit", "submit", "transfer"):
+        return base + base[-1] + "ed"
+    return base + "ed"
+
+
+def _build_lexicon() -> Dict[str, tuple]:
+    """단어 → (유형, 정답 후보 묶음, 해설 규칙 또는 품사표) - 모듈 로드 시 한 번 구성"""
+    lexicon: Dict[str, tuple] = {}
+
+    for category, rule, words in _CONFUSABLES:
+        for word in words:
+            lexicon.setdefault(word, (category, words, rule))
+
+    for word in _BE_FORMS:
+        lexicon[word] = ("be", _BE_FORMS, "The verb must agree with the subject in number and match the tense.")
+
+    families = []
+    for line in _WORD_FAMILIES.strip().splitlines():
+        members = tuple(tuple(item.split(":", 1)) for item in line.split())
+        families.append(members)
+    for members in families:
+        words = tuple(word for _, word in members)
+        pos = dict((word, tag) for tag, word in members)
+        for word in words:
+            # 품사가 다른 오답이 3개 이상일 때만 (같은 품사 오답은 정답이 될 수 있음)
+            if sum(pos[other] != pos[word] for other in words) >= 3:
+                lexicon.setdefault(word, ("word form", words, pos))
+
+    verbs = [tuple(entry.split()) for entry in _IRREGULAR_VERBS.replace("\n", "|").split("|") if entry.strip()]
+    verbs += [(base, _past(base), _past(base)) for base in _REGULAR_VERBS.split()]
+    for base, past, participle in verbs:
+        forms = tuple(dict.fromkeys((base, _third_person(base), past, participle, _ing(base))))
+        if len(forms) < 4:
+            forms += (f"to {base}", f"will {base}")
+        # 원형/3인칭 단수는 명사와 형태가 같은 경우가 많아(purchase, orders) 빈칸 대상에서 제외
+        for form in (past, participle, _ing(base)):
+            lexicon.setdefault(form, ("verb", forms[:5], base))
+    return lexicon
+
+
+_LEXICON = _build_lexicon()
+
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+(?=[A-Z\"'(\d$])")
+# 마침표 뒤에 대문자가 와도 문장이 끝나지 않는 약어 (Mr. Lee, Dr. Kim)
+_ABBREVIATIONS = frozenset("mr mrs ms dr st jr sr co inc ltd corp dept no vs etc".split())
+_WORD = re.compile(r"[A-Za-z]+(?:'[a-z]+)?")
+_TWO_WORD = re.compile(r"\bdue to\b", re.IGNORECASE)
+_DETAIL = re.compile(
+    r"\$\d[\d,]*(?:\.\d+)?"
+    r"|\b\d{1,2}(?::\d{2})?\s?(?:a\.m\.|p\.m\.|AM|PM)"
+    r"|\b\d+(?:\.\d+)?\s?(?:%|percent)"
+    r"|\b(?:" + "|".join(_DAYS + _MONTHS) + r")\b"
+    r"|\b\d[\d,]*\b"
+)
+
+
+# --- 텍스트 분석 (텍스트별 캐시) ---
+
+def _paragraphs(text: str) -> List[str]:
+    """빈 줄 기준 문단 (문단 내 줄바꿈/공백은 하나로)"""
+    return [re.sub(r"\s+", " ", p).strip() for p in _PARAGRAPH.split(text) if p.strip()]
+
+
+def _split_sentences(paragraph: str) -> List[str]:
+    """문단을 문장으로 (약어 뒤 마침표에서는 나누지 않음)"""
+    sentences = []
+    for piece in _SENTENCE_BREAK.split(paragraph):
+        words = sentences[-1].split() if sentences else []
+        if words and words[-1].rstrip(".").lower() in _ABBREVIATIONS:
+            sentences[-1] += " " + piece
+        else:
+            sentences.append(piece)
+    return sentences
+
+
+@lru_cache(maxsize=1024)
+def _sentences(text: str) -> Tuple[str, ...]:
+    """4단어 이상 문장 (문단을 넘지 않음)"""
+    sentences = []
+    for paragraph in _paragraphs(text):
+        sentences += [s for s in _split_sentences(paragraph) if len(s.split()) >= 4]
+    return tuple(sentences)
+
+
+@lru_cache(maxsize=1024)
+def _cloze_targets(text: str) -> Tuple[tuple, ...]:
+    """
+    빈칸 후보 (문장 번호, 시작, 끝, 유형, 정답, 묶음, 해설 정보)
+    고유명사(문장 중간의 대문자 단어)는 제외, 문장마다 유형별 첫 후보만
+    """
+    targets = []
+    for s_index, sentence in enumerate(_sentences(text)):
+        seen = set()
+        matches = [(m.start(), m.end(), m.group()) for m in _TWO_WORD.finditer(sentence)]
+        matches += [(m.start(), m.end(), m.group()) for m in _WORD.finditer(sentence)]
+        for start, end, word in matches:
+            if start > 0 and word[0].isupper():
+                continue
+            entry = _LEXICON.get(word.lower())
+            if entry is None or entry[0] in seen:
+                continue
+            seen.add(entry[0])
+            targets.append((s_index, start, end, entry[0], word.lower(), entry[1], entry[2]))
+    return tuple(targets)
+
+
+@lru_cache(maxsize=1024)
+def _detail_targets(text: str) -> Tuple[tuple, ...]:
+    """세부 정보 후보 (문장 번호, 시작, 끝, 값) - 요일, 월, 시각, 금액, 비율, 숫자"""
+    targets = []
+    for s_index, sentence in enumerate(_sentences(text)):
+        for match in _DETAIL.finditer(sentence):
+            targets.append((s_index, match.start(), match.end(), match.group()))
+    return tuple(targets)
+
+
+def _seed(text: str, index: int) -> int:
+    return zlib.crc32(text.encode("utf-8", "ignore")) ^ (index * 0x9E3779B1)
+
+
+def _detail_variants(value: str, rng: random.Random) -> List[str]:
+    """같은 종류의 다른 값 3개"""
+    for names in (_DAYS, _MONTHS):
+        if value in names:
+            others = [n for n in names if n != value]
+            return rng.sample(others, 3)
+
+    if re.fullmatch(r"(?:19|20)\d\d", value):
+        return [str(int(value) + d) for d in (1, -1, 2)]
+
+    number = re.search(r"\d[\d,]*(?:\.\d+)?", value)
+    if number is None:
+        return []
+    raw = number.group()
+    amount = float(raw.replace(",", ""))
+    if re.search(r"a\.m\.|p\.m\.|AM|PM", value):
+        hour = int(amount) if ":" not in value else int(value.split(":")[0])
+        candidates = [((hour + d - 1) % 12) + 1 for d in (1, 2, 3, -1)]
+        return [value.replace(str(hour), str(h), 1) for h in candidates[:3]]
+
+    step = max(1.0, round(amount * 0.25))
+    candidates = [amount * 2, amount + step, amount - step if amount > step else amount + 2 * step, amount * 3]
+    decimals = len(raw.split(".")[1]) if "." in raw else 0
+    out = []
+    for candidate in candidates:
+        formatted = f"{candidate:,.{decimals}f}" if "," in raw else f"{candidate:.{decimals}f}"
+        variant = value.replace(raw, formatted, 1)
+        if formatted != raw and variant not in out:
+            out.append(variant)
+    return out[:3]
+
+
+def _choices(answer: str, distractors: Sequence[str], rng: random.Random) -> Tuple[List[Choice], str]:
+    options = [answer] + list(distractors[:3])
+    rng.shuffle(options)
+    label = LABELS[options.index(answer)]
+    return [
+        Choice.model_construct(label=LABELS[i], text=text, is_correct=(text == answer))
+        for i, text in enumerate(options)
+    ], label
+
+
+def _cloze_explanation(category: str, answer: str, options: Sequence[str], info) -> str:
+    if category == "word form":
+        names = {w: _POS_NAMES[info[w]] for w in options}
+        parts = ", ".join(f"'{w}' is {'an' if names[w][0] in 'aeiou' else 'a'} {names[w]}" for w in options)
+        return f"The blank requires the {names[answer]} '{answer}': {parts}."
+    if category == "verb":
+        return (
+            f"'{answer}' is the form of '{info}' that fits the tense, voice, and subject of the sentence. "
+            f"The other options are different forms of the same verb."
+        )
+    return f"'{answer}' is correct. {info}"
+
+
+_POS_NAMES = {"noun": "noun", "verb": "verb", "adj": "adjective", "adv": "adverb"}
+
+
+class LocalGenerator:
+    """
+    로컬 문제 생성 엔진 (LLM 없이, 입력 텍스트 기반)
+    - Part 5: 품사/형태로 빈칸 대상 선택, 활용표 · 파생어 · 혼동 기능어 사전으로 오답 생성
+    - Part 6: 지문에 번호 빈칸 (문장마다 하나)
+    - Part 7: 세부 정보 · 사실 확인 · 문맥 어휘 템플릿
+    - 같은 텍스트 + 번호면 항상 같은 문제 (텍스트 분석은 캐시) → 코어당 수천 문항/초
+    """
+
+    def guess_part(self, text: str) -> int:
+        """분석 없이 파트 추정 - 한 문장이면 5, 짧은 지문이면 6, 그 외 7"""
+        sentences = _sentences(text)
+        if len(sentences) <= 1:
+            return 5
+        return 6 if len(text.split()) < 120 else 7
+
+    def generate(
+        self,
+        text: str,
+        part: int,
+        difficulty: Optional[str] = None,
+        count: int = 1,
+        start: int = 0
+    ) -> List[Problem]:
+        """
+        문제 count개 (문항마다 지문 포함)
+
+        Args:
+            start: 첫 문제 번호 (같은 텍스트로 여러 번 호출할 때 서로 다른 대상 선택)
+        """
+        difficulty = difficulty or "medium"
+        if part == 5:
+            return [self._cloze(text, difficulty, start + i) for i in range(count)]
+        if part == 6:
+            passage = self._passage(text, max_words=160)
+            return [self._text_completion(passage, difficulty, start + i) for i in range(count)]
+        passage = self._passage(text)
+        return [self._reading(passage, difficulty, start + i) for i in range(count)]
+
+    def generate_set(
+        self,
+        text: str,
+        part: int,
+        difficulty: Optional[str] = None,
+        count: int = 1
+    ) -> Tuple[str, List[Problem]]:
+        """Part 6/7 세트 - 지문 하나와 문항들 (Part 6은 [1]..[N] 빈칸, 각 Problem.passage는 None)"""
+        difficulty = difficulty or "medium"
+        if part == 6:
+            return self._text_completion_set(self._passage(text, max_words=160), difficulty, count)
+
+        passage = self._passage(text)
+        # 같은 대상에 같은 템플릿을 반복하지 않음 - 조합이 모자라면 count보다 적음
+        items = self._reading_items(passage, difficulty)
+        problems = [self._reading(passage, difficulty, i) for i in range(min(count, len(items)) if items else count)]
+        for problem in problems:
+            problem.passage = None
+        return passage, problems
+
+    def generate_batch(
+        self,
+        texts: Sequence[str],
+        part: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        count: int = 1
+    ) -> List[Tuple[int, Optional[str], List[Problem]]]:
+        """
+        여러 텍스트 일괄 생성
+
+        Returns:
+            텍스트마다 (파트, 세트 지문 또는 None, 문제 목록)
+        """
+        results = []
+        for text in texts:
+            text_part = part or self.guess_part(text)
+            if text_part in (6, 7):
+                passage, problems = self.generate_set(text, text_part, difficulty, count)
+            else:
+                passage, problems = None, self.generate(text, text_part, difficulty, count)
+            results.append((text_part, passage, problems))
+        return results
+
+    # --- Part 5 ---
+
+    @staticmethod
+    def _ranked(targets: Sequence[tuple], difficulty: str) -> List[tuple]:
+        """난이도 우선순위 순 (같은 유형은 문장/위치 순)"""
+        order = _DIFFICULTY_ORDER.get(difficulty, _DIFFICULTY_ORDER["medium"])
+        return sorted(targets, key=lambda t: (order.index(t[3]), t[0], t[1]))
+
+    def _pick(self, targets: Sequence[tuple], difficulty: str, index: int, sentence: Optional[int] = None) -> Optional[tuple]:
+        """난이도 우선순위 순으로 정렬한 후보 중 index번째 (순환)"""
+        if sentence is not None:
+            targets = [t for t in targets if t[0] == sentence]
+        if not targets:
+            return None
+        ranked = self._ranked(targets, difficulty)
+        return ranked[index % len(ranked)]
+
+    def _cloze_parts(self, target: tuple, rng: random.Random) -> Tuple[List[Choice], str, str]:
+        """(선택지, 정답 라벨, 해설)"""
+        _, _, _, category, answer, group, info = target
+        if category == "word form":
+            distractors = [w for w in group if info[w] != info[answer]]
+        else:
+            distractors = [w for w in group if w != answer]
+        rng.shuffle(distractors)
+        choices, label = _choices(answer, distractors, rng)
+        explanation = _cloze_explanation(category, answer, [c.text for c in choices], info)
+        return choices, label, explanation
+
+    def _cloze(self, text: str, difficulty: str, index: int) -> Problem:
+        if not _cloze_targets(text):
+            text = _DEFAULT_TEXT
+        target = self._pick(_cloze_targets(text), difficulty, index)
+        sentence = _sentences(text)[target[0]]
+        rng = random.Random(_seed(text, index))
+        choices, label, explanation = self._cloze_parts(target, rng)
+        return Problem.model_construct(
+            part=5,
+            question_type="vocabulary" if target[3] == "word form" else "grammar",
+            passage=None,
+            question=sentence[:target[1]] + BLANK + sentence[target[2]:],
+            choices=choices,
+            answer=label,
+            explanation=explanation,
+            difficulty=difficulty
+        )
+
+    # --- Part 6 ---
+
+    def _passage(self, text: str, max_words: Optional[int] = None) -> str:
+        """문단을 유지한 지문 - max_words가 있으면 문장 단위로 그 이하까지"""
+        paragraphs = _paragraphs(text) if _sentences(text) else _paragraphs(_DEFAULT_TEXT)
+        if max_words is None:
+            return "\n\n".join(paragraphs)
+
+        kept, words = [], 0
+        for paragraph in paragraphs:
+            sentences = _split_sentences(paragraph)
+            taken = []
+            for sentence in sentences:
+                if (kept or taken) and words + len(sentence.split()) > max_words:
+                    break
+                taken.append(sentence)
+                words += len(sentence.split())
+            if taken:
+                kept.append(" ".join(taken))
+            if len(taken) < len(sentences):
+                break
+        return "\n\n".join(kept)
+
+    def _blanks(self, passage: str, difficulty: str, count: int, start: int = 0) -> List[tuple]:
+        """
+        빈칸 대상 count개 (지문 순서대로)
+        문장마다 하나씩 먼저, 문장이 모자라면 같은 문장의 다른 유형 (이웃한 단어는 제외)
+        후보가 다 떨어지면 count보다 적음
+        """
+        targets = _cloze_targets(passage)
+        sentences = sorted({t[0] for t in targets})
+        chosen = []
+        for i in range(min(count, len(sentences))):
+            sentence = sentences[(start + i) % len(sentences)]
+            chosen.append(self._pick(targets, difficulty, start + i, sentence=sentence))
+        for target in self._ranked(targets, difficulty):
+            if len(chosen) >= count:
+                break
+            if all(t[0] != target[0] or target[1] > t[2] + 1 or target[2] < t[1] - 1 for t in chosen):
+                chosen.append(target)
+        return sorted(chosen, key=lambda t: (t[0], t[1]))
+
+    def _fill_blanks(self, passage: str, targets: Sequence[tuple], marks: Sequence[str]) -> str:
+        """지문 순서대로 정렬된 대상을 빈칸 표시로 치환 (문단 유지, 한 문장에 여러 개 가능)"""
+        offsets, position = [], 0
+        for sentence in _sentences(passage):
+            position = passage.find(sentence, position)
+            offsets.append(position)
+            position += len(sentence)
+        out, position = [], 0
+        for target, mark in zip(targets, marks):
+            offset = offsets[target[0]]
+            out += [passage[position:offset + target[1]], mark]
+            position = offset + target[2]
+        out.append(passage[position:])
+        return "".join(out)
+
+    def _text_completion(self, passage: str, difficulty: str, index: int) -> Problem:
+        targets = self._blanks(passage, difficulty, 1, start=index)
+        if not targets:
+            passage = self._passage(_DEFAULT_TEXT)
+            targets = self._blanks(passage, difficulty, 1, start=index)
+        rng = random.Random(_seed(passage, index))
+        choices, label, explanation = self._cloze_parts(targets[0], rng)
+        return Problem.model_construct(
+            part=6,
+            question_type="context",
+            passage=self._fill_blanks(passage, targets, [BLANK]),
+            question="Select the best answer to complete the text.",
+            choices=choices,
+            answer=label,
+            explanation=explanation,
+            difficulty=difficulty
+        )
+
+    def _text_completion_set(self, passage: str, difficulty: str, count: int) -> Tuple[str, List[Problem]]:
+        targets = self._blanks(passage, difficulty, count)
+        if not targets:
+            passage = self._passage(_DEFAULT_TEXT)
+            targets = self._blanks(passage, difficulty, count)
+        problems = []
+        for i, target in enumerate(targets):
+            rng = random.Random(_seed(passage, i))
+            choices, label, explanation = self._cloze_parts(target, rng)
+            problems.append(Problem.model_construct(
+                part=6,
+                question_type="context",
+                passage=None,
+                question=f"Which choice best fills blank [{i + 1}]?",
+                choices=choices,
+                answer=label,
+                explanation=explanation,
+                difficulty=difficulty
+            ))
+        marks = [f"[{i + 1}]" for i in range(len(targets))]
+        return self._fill_blanks(passage, targets, marks), problems
+
+    # --- Part 7 ---
+
+    def _reading_items(self, passage: str, difficulty: str) -> List[Tuple[str, tuple]]:
+        """
+        (템플릿, 대상) 조합 - 세부 정보 → 사실 확인 → 문맥 어휘 순으로 돌아가며
+        대상이 모자란 템플릿은 건너뜀 (같은 대상에 같은 템플릿은 한 번만)
+        """
+        details = [t for t in _detail_targets(passage) if len(_detail_variants(t[3], random.Random(0))) == 3]
+        vocabulary = [
+            (m.group(), _SYNONYMS[m.group().lower()], m.start())
+            for m in _WORD.finditer(passage) if m.group().lower() in _SYNONYMS
+        ]
+        # 사실 확인은 정답이 문장 전체이므로 문장마다 한 번만
+        stated, seen = [], set()
+        for target in details:
+            if target[0] not in seen:
+                seen.add(target[0])
+                stated.append(target)
+        pools = []
+        if details:
+            pools += [("detail", details), ("stated", stated)]
+        if vocabulary:
+            pools.append(("vocabulary", vocabulary))
+            if difficulty == "hard":
+                pools.insert(0, pools.pop())
+        items = []
+        for round_ in range(max((len(pool) for _, pool in pools), default=0)):
+            items += [(template, pool[round_]) for template, pool in pools if round_ < len(pool)]
+        return items
+
+    def _reading(self, passage: str, difficulty: str, index: int) -> Problem:
+        """index번째 (템플릿, 대상) 조합 (순환) - 조합이 없으면 빈칸 문제"""
+        rng = random.Random(_seed(passage, index))
+        items = self._reading_items(passage, difficulty)
+        if not items:
+            problem = self._text_completion(passage, difficulty, index)
+            problem.part = 7
+            problem.question_type = "reading comprehension"
+            problem.passage = passage
+            problem.question = "Which word best completes the sentence from the passage?"
+            return problem
+
+        template, target = items[index % len(items)]
+        sentences = _sentences(passage)
+
+        if template == "vocabulary":
+            word, synonym, position = target
+            others = sorted({v for v in _SYNONYMS.values() if v != synonym})
+            choices, label = _choices(synonym, rng.sample(others, 3), rng)
+            paragraph = 1 + passage[:position].count("\n\n")
+            question = f"In the passage, the word \"{word}\" in paragraph {paragraph} is closest in meaning to"
+            explanation = f"In this context, \"{word}\" means \"{synonym}\"."
+        else:
+            s_index, start, end, value = target
+            sentence = sentences[s_index]
+            variants = _detail_variants(value, rng)
+            if template == "detail":
+                choices, label = _choices(value, variants, rng)
+                question = (
+                    "According to the passage, which of the following completes the statement?\n"
+                    f"\"{sentence[:start]}{BLANK}{sentence[end:]}\""
+                )
+            else:
+                altered = [sentence[:start] + v + sentence[end:] for v in variants]
+                choices, label = _choices(sentence, altered, rng)
+                question = "Which of the following is stated in the passage?"
+            explanation = f"The passage states: \"{sentence}\""
+
+        return Problem.model_construct(
+            part=7,
+            question_type="reading comprehension",
+            passage=passage,
+            question=question,
+            choices=choices,
+            answer=label,
+            explanation=explanation,
+            difficulty=difficulty
+        )
+
+
+# 싱글톤 인스턴스
+local_generator = LocalGenerator()
@@ -0,0 +1,261 @@
+"""Metrics - Prometheus text-format counters and histograms"""
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import bisect
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (16e3, 64e3, 256e3, 1e6, 2e6, 4e6, 8e6, 16e6)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Prometheus 텍스트 형식 줄 (HELP/TYPE 헤더 포함)"""
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """버킷 히스토그램"""
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [버킷별 카운트..., +Inf 카운트], 합계
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """블록 실행 시간(초) 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            for key, counts in self._counts.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """스크레이프 시점에 콜백으로 값을 읽는 게이지"""
+    kind = "gauge"
+
+    def __init__(self, *args, collect: Callable[[], Iterable[Tuple[Dict[str, object], float]]], **kwargs):
+        super().__init__(*args, **kwargs)
+        self._collect = collect
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        try:
+            for labels, value in self._collect():
+                lines.append(f"{self.name}{_format_labels(self.labelnames, self._key(labels))} {_format_value(value)}")
+        except Exception as e:
+            print(f"Metrics collect error ({self.name}): {e}")
+        return lines
+
+
+class ParseyMetrics:
+    """
+    서비스 메트릭 레지스트리
+    - 단계별 지연시간 (OCR, 분석, RAG 검색, 생성, 파싱)
+    - 토큰 입출력, 시뮬레이션 폴백, 출력 복구, 모델 라우팅, 캐시 히트/미스, 로컬 엔진, 오류 카운터
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+        self.stage_latency = self._register(Histogram(
+            "parsey_stage_duration_seconds",
+            "Duration of each pipeline stage in seconds",
+            ("stage", "provider", "model", "part"),
+        ))
+        self.image_size = self._register(Histogram(
+            "parsey_ocr_image_bytes",
+            "Size of images submitted for OCR in bytes",
+            buckets=SIZE_BUCKETS,
+        ))
+        self.tokens = self._register(Counter(
+            "parsey_llm_tokens_total",
+            "LLM tokens consumed",
+            ("provider", "model", "part", "direction"),
+        ))
+        self.fallbacks = self._register(Counter(
+            "parsey_simulation_fallbacks_total",
+            "Responses served from simulated output instead of a provider",
+            ("stage", "provider", "model", "part"),
+        ))
+        self.llm_outputs = self._register(Counter(
+            "parsey_llm_outputs_total",
+            "LLM responses by parse outcome (valid, repaired, reasked, failed)",
+            ("stage", "provider", "model", "part", "outcome"),
+        ))
+        self.cache_hits = self._register(Counter(
+            "parsey_cache_hits_total",
+            "Cache hits by cache name",
+            ("cache", "provider", "model", "part"),
+        ))
+        self.cache_misses = self._register(Counter(
+            "parsey_cache_misses_total",
+            "Cache misses by cache name",
+            ("cache", "provider", "model", "part"),
+        ))
+        self.llm_routes = self._register(Counter(
+            "parsey_llm_routes_total",
+            "Model cascade decisions by chosen model and reason (simple, length, structure, escalated)",
+            ("stage", "model", "reason"),
+        ))
+        self.local_problems = self._register(Counter(
+            "parsey_local_problems_total",
+            "Problems produced by the local rule-based engine instead of the LLM",
+            ("part", "reason"),
+        ))
+        self.difficulty_checks = self._register(Counter(
+            "parsey_difficulty_checks_total",
+            "Generated problems by measured-difficulty outcome (match, regenerated, rejected, mismatch)",
+            ("part", "outcome"),
+        ))
+        self.requests_cancelled = self._register(Counter(
+            "parsey_requests_cancelled_total",
+            "Requests cancelled before completion (client disconnect or deadline)",
+            ("path", "reason"),
+        ))
+        self.errors = self._register(Counter(
+            "parsey_errors_total",
+            "Errors raised by pipeline stages",
+            ("stage", "provider", "model", "part"),
+        ))
+        self.admission_shed = self._register(Counter(
+            "parsey_admission_shed_total",
+            "Requests shed by the endpoint gate (503)",
+            ("path",),
+        ))
+        self.admission_rate_limited = self._register(Counter(
+            "parsey_admission_rate_limited_total",
+            "Requests rejected by per-client rate limiting (429)",
+        ))
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Iterable[Tuple[Dict[str, object], float]]],
+        labelnames: Sequence[str] = (),
+    ) -> Gauge:
+        """스크레이프 시점 콜백 게이지 등록"""
+        return self._register(Gauge(name, documentation, labelnames, collect=collect))
+
+    def observe_llm_usage(self, usage, provider: str, model: str, part: Optional[int] = None) -> None:
+        """OpenAI usage / Gemini usage_metadata에서 토큰 카운터 갱신"""
+        if usage is None:
+            return
+        prompt = getattr(usage, "prompt_tokens", None)
+        if prompt is None:
+            prompt = getattr(usage, "prompt_token_count", 0)
+        completion = getattr(usage, "completion_tokens", None)
+        if completion is None:
+            completion = getattr(usage, "candidates_token_count", 0)
+        labels = {"provider": provider, "model": model, "part": part or ""}
+        self.tokens.inc(prompt or 0, direction="in", **labels)
+        self.tokens.inc(completion or 0, direction="out", **labels)
+
+        details = getattr(usage, "prompt_tokens_details", None)
+        if getattr(details, "cached_tokens", 0):
+            self.cache_hits.inc(cache="llm_prompt", **labels)
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 싱글톤 인스턴스
+metrics = ParseyMetrics()
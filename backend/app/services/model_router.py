@@ -0,0 +1,91 @@
+"""Model Router - Small/large model cascade by input complexity with escalation on invalid output"""
+from typing import Iterator, Optional, Tuple
+from ..config import get_settings
+from .difficulty import difficulty_scorer
+from .metrics import metrics
+
+settings = get_settings()
+
+
+class ModelRouter:
+    """
+    모델 cascade 라우터 (OpenAI 호출 - 텍스트 분석, 문제/세트/해설 생성)
+    - 단순한 입력(짧고 문장 구조가 단순)은 작은 모델, 복잡한 입력은 바로 큰 모델(llm_model)
+    - 작은 모델 출력이 검증에 실패하면 같은 요청을 큰 모델로 한 번 더 (승격)
+    - small_model이 없으면 모든 호출이 큰 모델 (라우팅 기록 없음)
+    """
+
+    def __init__(
+        self,
+        small_model: Optional[str],
+        large_model: str,
+        max_words: int,
+        max_sentence_words: float,
+        max_clauses: float,
+    ):
+        self.small_model = small_model if small_model and small_model != large_model else None
+        self.large_model = large_model
+        self.max_words = max_words
+        self.max_sentence_words = max_sentence_words
+        self.max_clauses = max_clauses
+        self._counts = {"simple": 0, "length": 0, "structure": 0, "escalated": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.small_model is not None
+
+    def select(self, text: str) -> Tuple[str, str]:
+        """
+        입력에 맞는 첫 모델 (model, reason) - 기록 없음
+        reason: simple(작은 모델) / length(단어 수 초과) / structure(긴 문장 또는 종속절 많음) / disabled
+        """
+        if not self.enabled:
+            return self.large_model, "disabled"
+        if len(text.split()) > self.max_words:
+            return self.large_model, "length"
+        _, _, sentence_words, clauses = difficulty_scorer.features(text)
+        if sentence_words > self.max_sentence_words or clauses > self.max_clauses:
+            return self.large_model, "structure"
+        return self.small_model, "simple"
+
+    def cascade(self, text: str, stage: str) -> Iterator[str]:
+        """
+        호출에 사용할 모델을 차례로 - 첫 모델 시도가 출력 검증에 실패했을 때만 다음 모델을 받음
+
+        Usage:
+            for model in model_router.cascade(text, "generate_problem"):
+                try:
+                    return await attempt(model)
+                except OutputParseError:
+                    continue  # 큰 모델로 승격 (작은 모델이었을 때만 다음 값이 있음)
+        """
+        model, reason = self.select(text)
+        if self.enabled:
+            self._counts[reason] += 1
+            metrics.llm_routes.inc(stage=stage, model=model, reason=reason)
+        yield model
+
+        if model == self.small_model:
+            self._counts["escalated"] += 1
+            metrics.llm_routes.inc(stage=stage, model=self.large_model, reason="escalated")
+            yield self.large_model
+
+    def stats(self) -> dict:
+        """라우팅 결정 수와 승격 비율 (작은 모델로 보낸 호출 중 큰 모델로 다시 보낸 비율)"""
+        simple = self._counts["simple"]
+        return {
+            "small_model": self.small_model,
+            "large_model": self.large_model,
+            **self._counts,
+            "escalation_rate": round(self._counts["escalated"] / simple, 4) if simple else 0.0,
+        }
+
+
+# 싱글톤 인스턴스
+model_router = ModelRouter(
+    small_model=settings.llm_small_model,
+    large_model=settings.llm_model,
+    max_words=settings.cascade_max_words,
+    max_sentence_words=settings.cascade_max_sentence_words,
+    max_clauses=settings.cascade_max_clauses,
+)
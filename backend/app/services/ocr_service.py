@@ -1,8 +1,11 @@
 """OCR Service - Google Vision API Integration"""
 from typing import Optional
 import base64
-import httpx
 from ..config import get_settings
+from .metrics import metrics
+from .tracing import span
+from .transport import get_http_client
+from .deadline import within_deadline
 
 settings = get_settings()
 
@@ -17,8 +20,11 @@ async def extract_text_from_image(image_bytes: bytes) -> dict:
     Returns:
         dict: 추출된 텍스트와 메타데이터
     """
+    metrics.image_size.observe(len(image_bytes))
+    
     # Google Vision API 키가 없으면 시뮬레이션 모드
     if not settings.google_api_key and not settings.google_application_credentials:
+        metrics.fallbacks.inc(stage="ocr", provider="google_vision")
         return await _simulate_ocr(image_bytes)
     
     try:
@@ -26,7 +32,7 @@ async def extract_text_from_image(image_bytes: bytes) -> dict:
         image_content = base64.b64encode(image_bytes).decode("utf-8")
         
         # Google Vision API 호출
-        url = f"https://vision.googleapis.com/v1/images:annotate?key={settings.google_api_key}"
+        url = f"{settings.google_vision_endpoint}?key={settings.google_api_key}"
         
         payload = {
             "requests": [
@@ -37,8 +43,12 @@ async def extract_text_from_image(image_bytes: bytes) -> dict:
             ]
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, timeout=30.0)
+        with span("ocr_call", provider="google_vision"):
+            # 요청 예산이 더 적게 남았으면 그 안에서 (넘으면 호출 취소 후 실패 결과)
+            response = await within_deadline(
+                get_http_client().post(url, json=payload, timeout=settings.ocr_timeout_seconds),
+                settings.ocr_timeout_seconds
+            )
             response.raise_for_status()
             
         result = response.json()
@@ -64,6 +74,7 @@ async def extract_text_from_image(image_bytes: bytes) -> dict:
         
     except Exception as e:
         print(f"OCR Error: {e}")
+        metrics.errors.inc(stage="ocr", provider="google_vision")
         return {
             "success": False,
             "text": f"Error: {str(e)}",
@@ -72,6 +83,11 @@ async def extract_text_from_image(image_bytes: bytes) -> dict:
         }
 
 
+async def warmup() -> None:
+    """공유 HTTP 클라이언트 미리 생성 (서비스 레지스트리 warmup에서 호출)"""
+    get_http_client()
+
+
 async def _simulate_ocr(image_bytes: bytes) -> dict:
     """
     API 키 없을 때 시뮬레이션 모드
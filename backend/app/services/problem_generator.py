@@ -1,18 +1,65 @@
 """Problem Generator Service - TOEIC Problem Generation with LLM + RAG"""
-from typing import Optional, List
+from typing import Optional, List, Tuple, Type
+from contextvars import ContextVar
+import asyncio
 import json
+import re
+from pydantic import BaseModel
 from ..config import get_settings
-from ..schemas import Problem, Choice, ProblemGenerateRequest
-from .llm_service import llm_service
-from .rag_service import rag_service
+from ..schemas import (
+    Problem,
+    ProblemOutput,
+    QuestionOutput,
+    ProblemSetOutput,
+    ProblemGenerateRequest,
+    ProblemGenerateResponse,
+    ProblemBatchRequest,
+    ProblemBatchResponse,
+    ExplanationRequest,
+    ExplanationOutput,
+    ExplanationResponse,
+    AnalysisResponse
+)
+from .registry import get_llm_service, get_rag_service
+from .llm_scheduler import scheduler_for, estimate_tokens
+from .metrics import metrics
+from .tracing import span
+from .transport import get_http_client
+from .analysis_store import analysis_store
+from .explanation_store import explanation_store
+from .semantic_cache import semantic_cache
+from .chunking import split_text
+from .local_generator import local_generator
+from .difficulty import difficulty_scorer
+from .model_router import model_router
+from . import deadline
+from .structured_output import (
+    OutputParseError,
+    parse_model_output,
+    fix_problem_data,
+    fix_set_data,
+    problem_defects,
+    response_format_for
+)
 
 settings = get_settings()
 
+# lazy_explanation: 해설 대신 요청하는 짧은 근거 (서버에만 저장, 해설 생성 시 참고)
+_RATIONALE = "one short sentence (max 15 words) on why the answer is correct"
+
+# 현재 요청에서 LLM 대신 로컬 엔진으로 만든 문제의 파트 (gather 하위 태스크도 같은 리스트에 기록)
+# 하나라도 있으면 유사 텍스트 캐시에 저장하지 않음
+_fallback_parts: ContextVar[Optional[List[int]]] = ContextVar("fallback_parts", default=None)
+
+# 현재 요청이 난이도를 직접 지정했는지 - 지정했을 때만 측정 난이도가 어긋난 문제를 재생성/보류
+# (원문에서 추정한 난이도는 프롬프트와 RAG 패턴에만 사용, 추가 LLM 호출 없음)
+_explicit_difficulty: ContextVar[bool] = ContextVar("explicit_difficulty", default=False)
+
 
 class ProblemGenerator:
     """TOEIC 문제 생성기"""
     
-    async def generate(self, request: ProblemGenerateRequest) -> dict:
+    async def generate(self, request: ProblemGenerateRequest) -> ProblemGenerateResponse:
         """
         TOEIC 문제 생성
         
@@ -22,96 +69,567 @@ class ProblemGenerator:
         Returns:
             생성된 문제들과 메타데이터
         """
-        # 1. 텍스트 분석 (파트 자동 판별)
-        analysis = await llm_service.analyze_text(request.text)
-        detected_part = request.part or analysis.get("toeic_part", 5)
+        # 같은 조건에서 거의 같은 텍스트로 만든 문제가 있으면 재사용 (분석/RAG/생성 호출 없음)
+        if settings.semantic_cache_enabled and request.use_cache and request.engine != "local":
+            cached = semantic_cache.get(request)
+            if cached is not None:
+                return cached
         
-        # 2. RAG 패턴 검색 (선택적)
+        # 0. 부하 단계 - API 키가 없거나 LLM이 혼잡하면 로컬 엔진으로 (분석/RAG 생략)
+        reason = self._local_reason(request)
+        if reason is not None:
+            return self._generate_local(request, reason)
+        
+        # 1. 텍스트 분석 (파트 자동 판별, 긴 텍스트는 조각별로 분석 후 병합)
+        #    요청에 같은 텍스트의 분석 결과가 있으면 LLM 분석 생략
+        analysis = self._reuse_analysis(request)
+        if analysis is None:
+            analysis = await get_llm_service().analyze_text(request.text)
+        detected_part = request.part or analysis.toeic_part or 5
+        sources = self._select_sources(request, analysis)
+        # 난이도 미지정이면 원문 난이도에 맞춤 (프롬프트/RAG 패턴만 - 측정 난이도로 재생성하지 않음)
+        difficulty = request.difficulty or difficulty_scorer.band(difficulty_scorer.score(sources[0]))
+        
+        # 2. RAG 패턴 검색 (선택적) + 목표 난이도 패턴 - 분석에서 예산을 다 썼으면 생략
         rag_patterns = []
-        if request.use_rag and settings.use_rag:
-            await rag_service.initialize()
+        if request.use_rag and settings.use_rag and not deadline.expired():
+            rag_service = get_rag_service()
+            with span("rag_initialize"):
+                await rag_service.initialize()
             rag_patterns = await rag_service.search_patterns(
-                query=request.text,
+                query=sources[0],
                 part=detected_part
             )
+            rag_patterns += await rag_service.difficulty_patterns(detected_part, difficulty)
         
-        # 3. 문제 생성
-        problems = []
-        for i in range(request.count):
-            problem = await self._generate_single_problem(
-                text=request.text,
-                part=detected_part,
-                analysis=analysis,
-                rag_patterns=rag_patterns,
-                difficulty=request.difficulty,
-                index=i
-            )
-            problems.append(problem)
+        # 3. 문제 생성 (lazy_explanation이면 해설 대신 짧은 근거만 받아 서버에 저장)
+        #    요청 예산이 끝나면 진행 중인 호출은 취소되고 그 문제는 로컬 엔진 문제로, 세트는 받은 문항까지만
+        fallback_parts: List[int] = []
+        token = _fallback_parts.set(fallback_parts)
+        explicit_token = _explicit_difficulty.set(request.difficulty is not None)
+        try:
+            passage = None
+            if request.passage_set and detected_part in (6, 7):
+                # 지문 하나와 그 지문의 문항 count개를 한 번에 (지문은 응답에 한 번만)
+                passage, problems = await self._generate_set(
+                    text="\n\n".join(sources),
+                    part=detected_part,
+                    analysis=analysis,
+                    rag_patterns=rag_patterns,
+                    difficulty=difficulty,
+                    count=request.count,
+                    lazy=request.lazy_explanation
+                )
+            else:
+                # 대상 조각을 돌아가며 동시에 (동시성은 LLM 스케줄러가 조절)
+                problems = await asyncio.gather(*[
+                    self._generate_single_problem(
+                        text=sources[i % len(sources)],
+                        part=detected_part,
+                        analysis=analysis,
+                        rag_patterns=rag_patterns,
+                        difficulty=difficulty,
+                        index=i,
+                        lazy=request.lazy_explanation
+                    )
+                    for i in range(request.count)
+                ])
+        finally:
+            _fallback_parts.reset(token)
+            _explicit_difficulty.reset(explicit_token)
+        
+        response = ProblemGenerateResponse(
+            success=True,
+            problems=list(problems),
+            source_text=request.text,
+            detected_part=detected_part,
+            passage=passage,
+            partial=deadline.exceeded() or len(problems) < request.count
+        )
+        # 4. 모든 문제가 LLM 결과일 때만 유사 텍스트 캐시에 저장
+        if settings.semantic_cache_enabled and not response.partial and not fallback_parts:
+            semantic_cache.put(request, response)
+        return response
+    
+    async def generate_batch(self, request: ProblemBatchRequest) -> ProblemBatchResponse:
+        """로컬 엔진으로 여러 텍스트 일괄 생성 (CPU 작업이므로 스레드에서)"""
+        results = await asyncio.to_thread(
+            local_generator.generate_batch, request.texts, request.part, request.difficulty, request.count
+        )
+        responses = []
+        for text, (part, passage, problems) in zip(request.texts, results):
+            metrics.local_problems.inc(len(problems), part=part, reason="batch")
+            responses.append(ProblemGenerateResponse(
+                success=True,
+                problems=problems,
+                source_text=text,
+                detected_part=part,
+                passage=passage,
+                partial=len(problems) < request.count,
+                engine="local"
+            ))
+        return ProblemBatchResponse(success=True, results=responses)
+    
+    def _local_reason(self, request: ProblemGenerateRequest) -> Optional[str]:
+        """로컬 엔진으로 처리할 이유 (None이면 LLM)"""
+        if request.engine == "local":
+            return "requested"
+        if request.engine == "llm":
+            return None
+        if not settings.openai_api_key:
+            return "no_api_key"
+        # 이 입력이 처음 보낼 모델의 대기열 기준
+        if scheduler_for(model_router.select(request.text)[0]).overloaded(settings.local_generation_queue_depth):
+            return "overloaded"
+        return None
+    
+    def _generate_local(self, request: ProblemGenerateRequest, reason: str) -> ProblemGenerateResponse:
+        """로컬 엔진 생성 - 요청에 분석 결과가 있으면 파트 판별/조각 선택에만 사용"""
+        analysis = self._reuse_analysis(request)
+        sources = self._select_sources(request, analysis)
+        detected_part = (
+            request.part
+            or (analysis.toeic_part if analysis else None)
+            or local_generator.guess_part(request.text)
+        )
+        
+        passage = None
+        with span("generate_local", part=detected_part):
+            if request.passage_set and detected_part in (6, 7):
+                passage, problems = local_generator.generate_set(
+                    "\n\n".join(sources), detected_part, request.difficulty, request.count
+                )
+            else:
+                problems = [
+                    local_generator.generate(sources[i % len(sources)], detected_part, request.difficulty, start=i)[0]
+                    for i in range(request.count)
+                ]
+        metrics.local_problems.inc(len(problems), part=detected_part, reason=reason)
+        
+        return ProblemGenerateResponse(
+            success=True,
+            problems=problems,
+            source_text=request.text,
+            detected_part=detected_part,
+            passage=passage,
+            partial=len(problems) < request.count,  # 세트 대상이 모자란 짧은 텍스트
+            engine="local"
+        )
+    
+    def _reuse_analysis(self, request: ProblemGenerateRequest) -> Optional[AnalysisResponse]:
+        """요청에 포함된 분석 결과 (인라인 → analysis_id 순). 원문이 다르면 사용하지 않음"""
+        labels = {"provider": settings.llm_provider, "model": settings.llm_model}
+        
+        if request.analysis is not None and request.analysis.original_text == request.text:
+            metrics.cache_hits.inc(cache="analysis_inline", **labels)
+            return request.analysis
+        
+        if request.analysis_id:
+            analysis = analysis_store.get(request.analysis_id, text=request.text)
+            if analysis is not None:
+                metrics.cache_hits.inc(cache="analysis_store", **labels)
+                return analysis
+            metrics.cache_misses.inc(cache="analysis_store", **labels)
+        
+        return None
+    
+    def _select_sources(self, request: ProblemGenerateRequest, analysis: Optional[AnalysisResponse]) -> List[str]:
+        """
+        문제를 만들 원문 - 짧은 텍스트는 전체, 나눠 분석한 텍스트는 지정한 조각 (없으면 모든 조각)
+        분석 없이 (로컬 엔진) 조각을 지정하면 분석과 같은 기준으로 분할
+        
+        Raises:
+            ValueError: 존재하지 않는 조각 번호
+        """
+        if analysis is not None:
+            chunks = analysis.chunks or []
+        elif request.chunk_indices and len(request.text) > settings.analysis_chunk_chars:
+            chunks = split_text(request.text, settings.analysis_chunk_chars)
+        else:
+            chunks = []
+        count = len(chunks) or 1
+        indices = request.chunk_indices or list(range(count))
+        invalid = [i for i in indices if not 0 <= i < count]
+        if invalid:
+            raise ValueError(f"chunk_indices out of range: {invalid} (text has {count} chunks)")
         
-        return {
-            "success": True,
-            "problems": problems,
-            "source_text": request.text,
-            "detected_part": detected_part
-        }
+        if not chunks:
+            return [request.text]
+        return [request.text[chunks[i].start:chunks[i].end].strip() for i in indices]
     
     async def _generate_single_problem(
         self,
         text: str,
         part: int,
-        analysis: dict,
+        analysis: AnalysisResponse,
         rag_patterns: List[dict],
         difficulty: Optional[str],
-        index: int
+        index: int,
+        lazy: bool = False
     ) -> Problem:
-        """단일 문제 생성"""
+        """
+        단일 문제 생성 (lazy면 해설은 problem_id로 나중에)
+        입력 복잡도에 따라 작은/큰 모델 - 작은 모델 출력이 검증에 실패하면 큰 모델로 한 번 더
+        """
+        labels = {"provider": "openai", "model": settings.llm_model, "part": part}
         
         # API 키 없으면 시뮬레이션
         if not settings.openai_api_key:
-            return await self._simulate_problem(text, part, difficulty)
+            metrics.fallbacks.inc(stage="generate_problem", **labels)
+            return await self._simulate_problem(text, part, difficulty, index)
         
-        try:
-            from openai import AsyncOpenAI
-            client = AsyncOpenAI(api_key=settings.openai_api_key)
-            
-            prompt = self._build_generation_prompt(
-                text=text,
-                part=part,
-                analysis=analysis,
-                rag_patterns=rag_patterns,
-                difficulty=difficulty
-            )
-            
-            response = await client.chat.completions.create(
-                model=settings.llm_model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are an expert TOEIC test writer. Create authentic TOEIC questions following ETS guidelines."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.7
+        for model in model_router.cascade(text, "generate_problem"):
+            labels = {"provider": "openai", "model": model, "part": part}
+            try:
+                return await self._llm_problem(text, part, analysis, rag_patterns, difficulty, lazy, labels)
+            except Exception as e:
+                print(f"Problem generation error ({model}): {e}")
+                metrics.errors.inc(stage="generate_problem", **labels)
+                if isinstance(e, OutputParseError):
+                    metrics.llm_outputs.inc(stage="generate_problem", outcome="failed", **labels)
+                    if not deadline.expired():
+                        continue  # 작은 모델이었으면 큰 모델로 승격
+                break
+        
+        metrics.fallbacks.inc(stage="generate_problem", **labels)
+        return await self._simulate_problem(text, part, difficulty, index)
+    
+    async def _llm_problem(
+        self,
+        text: str,
+        part: int,
+        analysis: AnalysisResponse,
+        rag_patterns: List[dict],
+        difficulty: Optional[str],
+        lazy: bool,
+        labels: dict
+    ) -> Problem:
+        """
+        labels["model"]로 문제 한 개 생성 (깨진 필드 재질문, 난이도 재생성 포함)
+        
+        Raises:
+            OutputParseError: 재질문 후에도 유효하지 않은 출력
+        """
+        client = self._openai_client()
+        
+        prompt = self._build_generation_prompt(
+            text=text,
+            part=part,
+            analysis=analysis,
+            rag_patterns=rag_patterns,
+            difficulty=difficulty,
+            lazy=lazy
+        )
+        
+        expected_tokens = 250 if lazy else 600
+        content = await self._complete(client, prompt, expected_tokens, labels, "generate_problem")
+        
+        with span("parse_problem", **labels):
+            output, outcome = parse_model_output(ProblemOutput, content, fix=fix_problem_data)
+        
+        # 일부 필드만 깨졌으면 전체 재생성 대신 그 필드만 다시 요청
+        defects = problem_defects(output.model_dump())
+        if defects:
+            output = await self._reask_fields(client, prompt, output, defects, labels)
+            outcome = "reasked"
+            if problem_defects(output.model_dump()):
+                raise OutputParseError(f"Fields still invalid after re-ask: {defects}")
+        
+        metrics.llm_outputs.inc(stage="generate_problem", outcome=outcome, **labels)
+        
+        score = difficulty_scorer.problem_score(output)
+        if self._checks_difficulty(difficulty):
+            output, score = await self._match_difficulty(
+                client, prompt, output, score, difficulty, labels, expected_tokens
             )
-            
-            result = json.loads(response.choices[0].message.content)
-            return self._parse_problem(result, part)
-            
+        problem = self._parse_problem(output, part, output.passage, difficulty_scorer.band(score))
+        return self._defer_explanation(problem) if lazy else problem
+    
+    async def _generate_set(
+        self,
+        text: str,
+        part: int,
+        analysis: AnalysisResponse,
+        rag_patterns: List[dict],
+        difficulty: Optional[str],
+        count: int,
+        lazy: bool = False
+    ) -> Tuple[str, List[Problem]]:
+        """
+        Part 6/7 세트 생성 - 지문 하나와 그 지문에 대한 문항 count개 (lazy면 해설은 problem_id로 나중에)
+        - Part 7이고 원문이 충분히 길면 원문을 정리해 지문으로 쓰고 문항만 요청
+        - 그 외에는 한 번의 호출로 지문과 문항을 함께 생성
+        - 유효하지 않은 문항이 있으면 같은 지문으로 부족한 문항만 추가 요청
+        - 작은 모델 출력에서 세트를 만들지 못하면 큰 모델로 한 번 더
+        
+        Returns:
+            (지문, 문항 목록 - 각 Problem.passage는 None)
+        """
+        labels = {"provider": "openai", "model": settings.llm_model, "part": part}
+        
+        if not settings.openai_api_key:
+            metrics.fallbacks.inc(stage="generate_set", **labels)
+            return await self._simulate_set(text, part, difficulty, count)
+        
+        for model in model_router.cascade(text, "generate_set"):
+            labels = {"provider": "openai", "model": model, "part": part}
+            try:
+                return await self._llm_set(text, part, analysis, rag_patterns, difficulty, count, lazy, labels)
+            except Exception as e:
+                print(f"Problem set generation error ({model}): {e}")
+                metrics.errors.inc(stage="generate_set", **labels)
+                if isinstance(e, OutputParseError):
+                    metrics.llm_outputs.inc(stage="generate_set", outcome="failed", **labels)
+                    if not deadline.expired():
+                        continue  # 작은 모델이었으면 큰 모델로 승격
+                break
+        
+        metrics.fallbacks.inc(stage="generate_set", **labels)
+        return await self._simulate_set(text, part, difficulty, count)
+    
+    async def _llm_set(
+        self,
+        text: str,
+        part: int,
+        analysis: AnalysisResponse,
+        rag_patterns: List[dict],
+        difficulty: Optional[str],
+        count: int,
+        lazy: bool,
+        labels: dict
+    ) -> Tuple[str, List[Problem]]:
+        """
+        labels["model"]로 세트 생성 (부족한 문항 추가 요청 포함)
+        
+        Raises:
+            OutputParseError: 지문이 없거나 유효한 문항이 하나도 없음
+        """
+        client = self._openai_client()
+        passage = None
+        if part == 7 and len(text.split()) >= settings.passage_set_min_words:
+            passage = self._normalize_passage(text)
+        
+        question_tokens = 110 if lazy else 200
+        prompt = self._set_prompt(text, part, count, analysis, rag_patterns, difficulty, passage, lazy=lazy)
+        content = await self._complete(
+            client, prompt, (0 if passage else 250) + question_tokens * count, labels, "generate_set",
+            output_model=ProblemSetOutput, fields=["questions"] if passage else None
+        )
+        with span("parse_problem_set", **labels):
+            output, outcome = parse_model_output(ProblemSetOutput, content, fix=fix_set_data)
+        
+        passage = passage or output.passage
+        if not passage:
+            raise OutputParseError("Set output has no passage")
+        questions, rejected = self._accept_questions(output.questions, passage, difficulty, part)
+        questions = questions[:count]
+        
+        accepted, more_rejected = [], []
+        # Part 6은 빈칸 번호가 지문과 함께 정해지므로 같은 지문으로 문항만 다시 요청하지 않음
+        if len(questions) < count and part == 7:
+            try:
+                prompt = self._set_prompt(
+                    text, part, count - len(questions), analysis, rag_patterns, difficulty, passage,
+                    exclude=[q.question for q in questions], lazy=lazy
+                )
+                content = await self._complete(
+                    client, prompt, question_tokens * (count - len(questions)), labels, "reask_problem_set",
+                    output_model=ProblemSetOutput, fields=["questions"]
+                )
+                with span("parse_problem_set", **labels):
+                    extra, _ = parse_model_output(ProblemSetOutput, content, fix=fix_set_data)
+                accepted, more_rejected = self._accept_questions(extra.questions, passage, difficulty, part)
+                outcome = "reasked"
+            except deadline.DeadlineExceeded:
+                pass  # 예산 초과 - 이미 받은 문항만 (부분 결과)
+        # 난이도만 어긋난 문항은 빈자리를 채우는 데 사용 (문항 수 우선)
+        questions = (questions + accepted + rejected + more_rejected)[:count]
+        
+        if not questions:
+            raise OutputParseError("No valid questions in set output")
+        metrics.llm_outputs.inc(stage="generate_set", outcome=outcome, **labels)
+        problems = [
+            self._parse_problem(q, part, difficulty=difficulty_scorer.band(difficulty_scorer.problem_score(q, passage)))
+            for q in questions
+        ]
+        if lazy:
+            problems = [self._defer_explanation(problem, passage) for problem in problems]
+        return passage, problems
+    
+    def _accept_questions(
+        self,
+        questions: List[QuestionOutput],
+        passage: str,
+        difficulty: Optional[str],
+        part: int
+    ) -> Tuple[List[QuestionOutput], List[QuestionOutput]]:
+        """
+        세트 문항 분류 - (사용할 문항, 난이도가 목표와 달라 보류한 문항)
+        필드가 깨진 문항은 버림
+        """
+        accepted, rejected = [], []
+        check = self._checks_difficulty(difficulty)
+        for question in questions:
+            if problem_defects(question.model_dump()):
+                continue
+            if not check:
+                accepted.append(question)
+            elif difficulty_scorer.deviation(difficulty_scorer.problem_score(question, passage), difficulty):
+                metrics.difficulty_checks.inc(part=part, outcome="rejected")
+                rejected.append(question)
+            else:
+                metrics.difficulty_checks.inc(part=part, outcome="match")
+                accepted.append(question)
+        return accepted, rejected
+    
+    @staticmethod
+    def _checks_difficulty(difficulty: Optional[str]) -> bool:
+        """측정 난이도로 재생성/보류할지 - 요청에서 직접 지정한 난이도일 때만"""
+        return settings.difficulty_check and difficulty is not None and _explicit_difficulty.get()
+    
+    async def _match_difficulty(
+        self,
+        client,
+        prompt: str,
+        output: ProblemOutput,
+        score: float,
+        difficulty: str,
+        labels: dict,
+        expected_tokens: int = 600
+    ) -> Tuple[ProblemOutput, float]:
+        """
+        측정 난이도가 목표 구간을 벗어나면 방향을 알려 한 번 재생성
+        두 결과 중 목표에 더 가까운 쪽 반환 (재생성 실패 시 원래 문제)
+        """
+        deviation = difficulty_scorer.deviation(score, difficulty)
+        if not deviation:
+            metrics.difficulty_checks.inc(part=labels["part"], outcome="match")
+            return output, score
+        
+        direction = "easy" if deviation < 0 else "hard"
+        retry_prompt = (
+            f"{prompt}\n\nA previous draft was too {direction} for {difficulty} difficulty. "
+            f"Adjust vocabulary level and sentence complexity."
+        )
+        try:
+            content = await self._complete(client, retry_prompt, expected_tokens, labels, "regenerate_difficulty")
+            retry, _ = parse_model_output(ProblemOutput, content, fix=fix_problem_data)
         except Exception as e:
-            print(f"Problem generation error: {e}")
-            return await self._simulate_problem(text, part, difficulty)
+            print(f"Difficulty regeneration error: {e}")
+            retry = None
+        
+        if retry is not None and not problem_defects(retry.model_dump()):
+            retry_score = difficulty_scorer.problem_score(retry)
+            retry_deviation = difficulty_scorer.deviation(retry_score, difficulty)
+            if abs(retry_deviation) < abs(deviation):
+                metrics.difficulty_checks.inc(
+                    part=labels["part"], outcome="mismatch" if retry_deviation else "regenerated"
+                )
+                return retry, retry_score
+        metrics.difficulty_checks.inc(part=labels["part"], outcome="mismatch")
+        return output, score
+    
+    def _normalize_passage(self, text: str) -> str:
+        """OCR 줄바꿈/공백 정리 - 문단 경계만 남김"""
+        text = re.sub(r"[ \t]+", " ", text)
+        text = re.sub(r"(?<!\n)\n(?!\n)", " ", text)
+        return re.sub(r"\n{3,}", "\n\n", text).strip()
+    
+    def _openai_client(self):
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            http_client=get_http_client()
+        )
+    
+    async def _complete(
+        self,
+        client,
+        prompt: str,
+        expected_output_tokens: int,
+        labels: dict,
+        stage: str,
+        output_model: Type[BaseModel] = ProblemOutput,
+        fields: Optional[List[str]] = None
+    ) -> str:
+        """
+        labels["model"]의 스케줄러 슬롯 안에서 문제 생성 호출 (fields가 있으면 해당 필드만 스키마로 강제)
+        
+        Raises:
+            DeadlineExceeded: 요청 예산 초과 (슬롯 대기 중이거나 호출 중 - 호출은 취소됨)
+        """
+        response_format = {"type": "json_object"}
+        if settings.llm_structured_output:
+            response_format = response_format_for(output_model, fields)
+        
+        estimated = estimate_tokens(prompt, expected_output_tokens=expected_output_tokens)
+        async with scheduler_for(labels["model"]).slot(estimated) as ticket:
+            with span(stage, **labels):
+                response = await deadline.within_deadline(client.chat.completions.create(
+                    model=labels["model"],
+                    messages=[
+                        {
+                            "role": "system", 
+                            "content": "You are an expert TOEIC test writer. Create authentic TOEIC questions following ETS guidelines."
+                        },
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format=response_format,
+                    temperature=0.7
+                ), settings.llm_timeout_seconds)
+            ticket.record_usage(response.usage)
+        metrics.observe_llm_usage(response.usage, **labels)
+        return response.choices[0].message.content
+    
+    async def _reask_fields(
+        self,
+        client,
+        prompt: str,
+        output: ProblemOutput,
+        fields: List[str],
+        labels: dict
+    ) -> ProblemOutput:
+        """깨진 필드만 재질문 - 나머지 필드는 그대로 두고 작은 출력만 받아 병합"""
+        kept = output.model_dump(exclude=set(fields))
+        reask_prompt = f"""{prompt}
+
+A previous answer to this request was incomplete. Keep these fields exactly as they are:
+{json.dumps(kept, ensure_ascii=False)}
+
+Respond in JSON with only these fields: {", ".join(fields)}"""
+        
+        content = await self._complete(
+            client, reask_prompt, 80 * len(fields), labels, "reask_problem", fields=fields
+        )
+        with span("parse_problem", **labels):
+            patch, _ = parse_model_output(ProblemOutput, content, fix=fix_problem_data)
+        merged = {**kept, **patch.model_dump(include=set(fields))}
+        return ProblemOutput.model_validate(fix_problem_data(merged))
     
     def _build_generation_prompt(
         self,
         text: str,
         part: int,
-        analysis: dict,
+        analysis: AnalysisResponse,
         rag_patterns: List[dict],
-        difficulty: Optional[str]
+        difficulty: Optional[str],
+        lazy: bool = False
     ) -> str:
-        """문제 생성 프롬프트 구성"""
+        """문제 생성 프롬프트 구성 (lazy면 explanation 필드에 짧은 근거만)"""
+        analysis_context, pattern_context = self._prompt_context(analysis, rag_patterns)
+        difficulty_str = difficulty or "medium"
+        explanation = _RATIONALE if lazy else None
         
+        if part == 5:
+            return self._part5_prompt(text, analysis_context, pattern_context, difficulty_str, explanation)
+        elif part == 6:
+            return self._part6_prompt(text, analysis_context, pattern_context, difficulty_str, explanation)
+        else:
+            return self._part7_prompt(text, analysis_context, pattern_context, difficulty_str, explanation)
+    
+    def _prompt_context(self, analysis: AnalysisResponse, rag_patterns: List[dict]) -> Tuple[str, str]:
+        """프롬프트에 넣을 분석 요약과 ETS 패턴 (analysis_context, pattern_context)"""
         # RAG 패턴 포함
         pattern_context = ""
         if rag_patterns:
@@ -122,21 +640,70 @@ class ProblemGenerator:
         # 분석 결과 포함
         analysis_context = ""
         if analysis:
-            grammar = analysis.get("grammar_elements", [])
+            grammar = analysis.grammar_elements or []
             if grammar:
-                grammar_str = ", ".join([g.value if hasattr(g, 'value') else str(g) for g in grammar[:3]])
+                grammar_str = ", ".join([g.value for g in grammar[:3]])
                 analysis_context = f"\nGrammar elements identified: {grammar_str}"
         
-        difficulty_str = difficulty or "medium"
+        return analysis_context, pattern_context
+    
+    def _set_prompt(
+        self,
+        text: str,
+        part: int,
+        count: int,
+        analysis: AnalysisResponse,
+        rag_patterns: List[dict],
+        difficulty: Optional[str],
+        passage: Optional[str] = None,
+        exclude: Optional[List[str]] = None,
+        lazy: bool = False
+    ) -> str:
+        """세트 프롬프트 - passage가 없으면 지문까지, 있으면 그 지문의 문항만 요청 (Part 7만)"""
+        analysis_context, pattern_context = self._prompt_context(analysis, rag_patterns)
         
-        if part == 5:
-            return self._part5_prompt(text, analysis_context, pattern_context, difficulty_str)
-        elif part == 6:
-            return self._part6_prompt(text, analysis_context, pattern_context, difficulty_str)
+        if passage is None and part == 6:
+            task = f"""Create a TOEIC Part 6 (Text Completion) set based on this text.
+Write one passage of 100-150 words with {count} blanks marked [1] to [{count}], then {count} questions.
+Question i asks which choice best fills blank [i]; one may be a sentence-insertion question."""
+        elif passage is None:
+            task = f"""Create a TOEIC Part 7 (Reading Comprehension) set based on this text.
+Write one passage (email, memo, notice, or article), then {count} different questions about it
+(detail, inference, main idea, vocabulary in context)."""
         else:
-            return self._part7_prompt(text, analysis_context, pattern_context, difficulty_str)
+            task = f"""Write {count} different TOEIC Part 7 (Reading Comprehension) questions about the passage below
+(detail, inference, main idea, vocabulary in context)."""
+        
+        if exclude:
+            task += f"\nDo not repeat these questions: {json.dumps(exclude, ensure_ascii=False)}"
+        source = f'Passage: "{passage}"' if passage else f'Source text: "{text}"'
+        passage_field = "" if passage else '\n    "passage": "the passage shared by all questions",'
+        
+        return f"""{task}
+{pattern_context}
+{source}
+{analysis_context}
+Difficulty: {difficulty or "medium"}
+
+Respond in JSON:
+{{{passage_field}
+    "questions": [
+        {{
+            "question": "question text",
+            "choices": [
+                {{"label": "A", "text": "option1", "is_correct": false}},
+                {{"label": "B", "text": "option2", "is_correct": true}},
+                {{"label": "C", "text": "option3", "is_correct": false}},
+                {{"label": "D", "text": "option4", "is_correct": false}}
+            ],
+            "answer": "B",
+            "question_type": "{"context" if part == 6 else "reading comprehension"}",
+            "explanation": "{_RATIONALE if lazy else "explanation referencing the passage"}"
+        }}
+    ]
+}}"""
     
-    def _part5_prompt(self, text: str, analysis: str, patterns: str, difficulty: str) -> str:
+    def _part5_prompt(self, text: str, analysis: str, patterns: str, difficulty: str, explanation: Optional[str] = None) -> str:
         return f"""Create a TOEIC Part 5 (Incomplete Sentences) question based on this text.
 {patterns}
 Source text: "{text}"
@@ -156,10 +723,10 @@ Respond in JSON:
     ],
     "answer": "B",
     "question_type": "grammar" or "vocabulary",
-    "explanation": "detailed explanation of why B is correct and others are wrong"
+    "explanation": "{explanation or "detailed explanation of why B is correct and others are wrong"}"
 }}"""
     
-    def _part6_prompt(self, text: str, analysis: str, patterns: str, difficulty: str) -> str:
+    def _part6_prompt(self, text: str, analysis: str, patterns: str, difficulty: str, explanation: Optional[str] = None) -> str:
         return f"""Create a TOEIC Part 6 (Text Completion) question based on this text.
 {patterns}
 Source text: "{text}"
@@ -180,10 +747,10 @@ Respond in JSON:
     ],
     "answer": "B",
     "question_type": "context",
-    "explanation": "explanation of the correct answer"
+    "explanation": "{explanation or "explanation of the correct answer"}"
 }}"""
     
-    def _part7_prompt(self, text: str, analysis: str, patterns: str, difficulty: str) -> str:
+    def _part7_prompt(self, text: str, analysis: str, patterns: str, difficulty: str, explanation: Optional[str] = None) -> str:
         return f"""Create a TOEIC Part 7 (Reading Comprehension) question based on this text.
 {patterns}
 Source text: "{text}"
@@ -204,88 +771,154 @@ Respond in JSON:
     ],
     "answer": "B",
     "question_type": "reading comprehension",
-    "explanation": "explanation referencing the passage"
+    "explanation": "{explanation or "explanation referencing the passage"}"
 }}"""
     
-    def _parse_problem(self, result: dict, part: int) -> Problem:
-        """LLM 결과를 Problem 객체로 변환"""
-        choices = [
-            Choice(**c) for c in result.get("choices", [])
-        ]
+    def _parse_problem(
+        self,
+        result: QuestionOutput,
+        part: int,
+        passage: Optional[str] = None,
+        difficulty: Optional[str] = None
+    ) -> Problem:
+        """검증된 LLM 결과를 Problem 객체로 변환 (재검증 없이 구성, difficulty는 측정값 우선)"""
         
-        return Problem(
+        return Problem.model_construct(
             part=part,
-            question_type=result.get("question_type", "grammar"),
-            passage=result.get("passage"),
-            question=result.get("question", ""),
-            choices=choices,
-            answer=result.get("answer", "A"),
-            explanation=result.get("explanation", ""),
-            difficulty=result.get("difficulty", "medium")
+            question_type=result.question_type,
+            passage=passage,
+            question=result.question,
+            choices=result.choices,
+            answer=result.answer,
+            explanation=result.explanation,
+            difficulty=difficulty or result.difficulty
         )
     
+    def _defer_explanation(self, problem: Problem, passage: Optional[str] = None) -> Problem:
+        """근거(explanation)는 서버에 저장하고 응답에서는 비움 - problem_id로 해설 요청"""
+        problem_id = explanation_store.put(problem, passage)
+        return problem.model_copy(update={"explanation": "", "problem_id": problem_id})
+    
+    async def explain(self, request: ExplanationRequest) -> ExplanationResponse:
+        """
+        문제 해설 (lazy_explanation으로 생성한 문제)
+        problem_id의 캐시된 해설이 있으면 그대로, 없으면 저장된 근거를 참고해 생성 후 캐시
+        problem_id를 찾지 못해 요청의 문제로 생성하면 응답의 problem_id는 서버가 새로 발급한 ID
+        
+        Raises:
+            LookupError: problem_id가 없거나 만료됐고 요청에 문제도 없음
+        """
+        record = explanation_store.get(request.problem_id) if request.problem_id else None
+        problem = record["problem"] if record else request.problem
+        if problem is None:
+            raise LookupError("Problem not found or expired - send the problem with the request")
+        labels = {"provider": "openai", "model": settings.llm_model, "part": problem.part}
+        
+        if record and record["explanation"] is not None:
+            metrics.cache_hits.inc(cache="explanation", **labels)
+            return ExplanationResponse(
+                success=True, problem_id=request.problem_id, explanation=record["explanation"], cached=True
+            )
+        metrics.cache_misses.inc(cache="explanation", **labels)
+        
+        if record is None:  # 다른 워커/만료 - 받은 문제는 새 ID로 저장 (클라이언트가 보낸 ID의 항목을 덮어쓰지 않음)
+            problem_id = explanation_store.put(problem, request.passage)
+            passage = request.passage or problem.passage
+        else:
+            problem_id, passage = request.problem_id, record["passage"]
+        
+        explanation = await self._generate_explanation(problem, passage, labels)
+        if explanation is None:
+            # 생성 실패는 캐시하지 않음 (다음 요청에서 다시 시도)
+            return ExplanationResponse(success=True, problem_id=problem_id, explanation=self._simulate_explanation(problem))
+        explanation_store.save_explanation(problem_id, explanation)
+        return ExplanationResponse(success=True, problem_id=problem_id, explanation=explanation)
+    
+    async def _generate_explanation(self, problem: Problem, passage: Optional[str], labels: dict) -> Optional[str]:
+        """LLM 해설 생성 (API 키 없거나 실패하면 None, 작은 모델 출력이 검증에 실패하면 큰 모델로)"""
+        if not settings.openai_api_key:
+            metrics.fallbacks.inc(stage="generate_explanation", **labels)
+            return None
+        
+        prompt = self._explanation_prompt(problem, passage)
+        for model in model_router.cascade(passage or problem.question, "generate_explanation"):
+            labels = {**labels, "model": model}
+            try:
+                client = self._openai_client()
+                content = await self._complete(
+                    client, prompt, 300, labels, "generate_explanation", output_model=ExplanationOutput
+                )
+                output, outcome = parse_model_output(ExplanationOutput, content)
+                if not output.explanation.strip():
+                    raise OutputParseError("Empty explanation")
+                metrics.llm_outputs.inc(stage="generate_explanation", outcome=outcome, **labels)
+                return output.explanation
+            except Exception as e:
+                print(f"Explanation generation error ({model}): {e}")
+                metrics.errors.inc(stage="generate_explanation", **labels)
+                if isinstance(e, OutputParseError):
+                    metrics.llm_outputs.inc(stage="generate_explanation", outcome="failed", **labels)
+                    if not deadline.expired():
+                        continue  # 작은 모델이었으면 큰 모델로 승격
+                break
+        
+        metrics.fallbacks.inc(stage="generate_explanation", **labels)
+        return None
+    
+    def _explanation_prompt(self, problem: Problem, passage: Optional[str]) -> str:
+        """해설 프롬프트 - 문항, 정답, 생성 시 저장한 근거"""
+        choices = "\n".join(f"({c.label}) {c.text}" for c in problem.choices)
+        source = f'Passage: "{passage}"\n' if passage else ""
+        rationale = f"\nRationale: {problem.explanation}" if problem.explanation else ""
+        return f"""Explain the answer to this TOEIC Part {problem.part} question for a learner.
+{source}Question: {problem.question}
+{choices}
+Answer: {problem.answer}{rationale}
+
+Explain why the answer is correct and why each other choice is wrong.
+
+Respond in JSON:
+{{
+    "explanation": "detailed explanation of why {problem.answer} is correct and others are wrong"
+}}"""
+    
+    def _simulate_explanation(self, problem: Problem) -> str:
+        """API 없거나 생성 실패 시 - 저장된 근거, 없으면 정답만"""
+        if problem.explanation:
+            return problem.explanation
+        answer = next((c.text for c in problem.choices if c.label == problem.answer), "")
+        return f"The correct answer is ({problem.answer}) {answer}.".replace(" .", ".")
+    
+    async def _simulate_set(
+        self,
+        text: str,
+        part: int,
+        difficulty: Optional[str],
+        count: int
+    ) -> Tuple[str, List[Problem]]:
+        """API 없거나 생성 실패 시 로컬 엔진 세트 (지문은 응답에 한 번만)"""
+        passage, problems = local_generator.generate_set(text, part, difficulty, count)
+        metrics.local_problems.inc(len(problems), part=part, reason="fallback")
+        self._record_fallback(part)
+        return passage, problems
+    
     async def _simulate_problem(
         self, 
         text: str, 
         part: int, 
-        difficulty: Optional[str]
+        difficulty: Optional[str],
+        index: int = 0
     ) -> Problem:
-        """API 없을 때 시뮬레이션 문제 생성"""
-        
-        difficulty = difficulty or "medium"
-        
-        # 텍스트에서 키워드 추출
-        words = text.split()
-        key_word = words[2] if len(words) > 2 else "meeting"
-        
-        if part == 5:
-            return Problem(
-                part=5,
-                question_type="grammar",
-                passage=None,
-                question=f"The project deadline _______ extended due to unforeseen circumstances.",
-                choices=[
-                    Choice(label="A", text="was", is_correct=True),
-                    Choice(label="B", text="were", is_correct=False),
-                    Choice(label="C", text="is", is_correct=False),
-                    Choice(label="D", text="be", is_correct=False),
-                ],
-                answer="A",
-                explanation="'Deadline' is singular, so the correct verb form is 'was' (past tense, singular). 'Were' is for plural subjects, 'is' is present tense, and 'be' requires an auxiliary.",
-                difficulty=difficulty
-            )
-        elif part == 6:
-            return Problem(
-                part=6,
-                question_type="context",
-                passage=f"Dear Team,\n\nWe would like to inform you that the quarterly {key_word} has been rescheduled. _______ We apologize for any inconvenience this may cause.\n\nBest regards,\nManagement",
-                question="Which sentence best fits in the blank?",
-                choices=[
-                    Choice(label="A", text="The new date will be announced shortly.", is_correct=True),
-                    Choice(label="B", text="Please submit your reports.", is_correct=False),
-                    Choice(label="C", text="The office will be closed.", is_correct=False),
-                    Choice(label="D", text="Thank you for your cooperation.", is_correct=False),
-                ],
-                answer="A",
-                explanation="Option A logically follows the announcement of rescheduling by promising information about the new date. It maintains coherence with the topic of schedule changes.",
-                difficulty=difficulty
-            )
-        else:  # Part 7
-            return Problem(
-                part=7,
-                question_type="reading comprehension",
-                passage=f"MEMO\n\nTo: All Staff\nFrom: HR Department\nSubject: Policy Update\n\nEffective next month, all employees will be required to complete the new compliance training. The training can be accessed through our online portal and must be completed within two weeks of the start date. {text}",
-                question="What is indicated about the training?",
-                choices=[
-                    Choice(label="A", text="It must be completed online.", is_correct=True),
-                    Choice(label="B", text="It is optional for senior staff.", is_correct=False),
-                    Choice(label="C", text="It starts immediately.", is_correct=False),
-                    Choice(label="D", text="It takes two months to complete.", is_correct=False),
-                ],
-                answer="A",
-                explanation="The memo states that 'The training can be accessed through our online portal,' indicating it must be completed online. The other options contradict the information given.",
-                difficulty=difficulty
-            )
+        """API 없거나 생성 실패 시 로컬 엔진 문제 (index마다 다른 빈칸/문항)"""
+        metrics.local_problems.inc(part=part, reason="fallback")
+        self._record_fallback(part)
+        return local_generator.generate(text, part, difficulty, start=index)[0]
+    
+    def _record_fallback(self, part: int) -> None:
+        """generate() 안이면 로컬 엔진 대체를 기록 (캐시 저장 제외)"""
+        fallback_parts = _fallback_parts.get()
+        if fallback_parts is not None:
+            fallback_parts.append(part)
 
 
 # 싱글톤 인스턴스
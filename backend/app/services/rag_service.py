@@ -1,21 +1,60 @@
 """RAG Service - ChromaDB Vector Store for ETS Patterns"""
 from typing import Optional, List, Dict
+import asyncio
 import json
 import os
+import re
 from ..config import get_settings
+from .metrics import metrics
+from .tracing import span
 
 settings = get_settings()
 
+COLLECTION_PREFIX = "ets_patterns"  # 파티션 이전의 단일 컬렉션 이름이기도 함
+_EMPTY = {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+
+
+def _type_slug(pattern_type: str) -> str:
+    """컬렉션 이름에 쓸 수 있는 패턴 타입 (영숫자와 _)"""
+    return re.sub(r"[^A-Za-z0-9]+", "_", pattern_type)[:32].strip("_") or "other"
+
+
+def partition_name(part, pattern_type: str) -> str:
+    """(파트, 패턴 타입) 파티션 컬렉션 이름 - 예: ets_patterns__p5__distractor"""
+    return f"{COLLECTION_PREFIX}__p{part}__{_type_slug(pattern_type)}"
+
+
+def _embedding_function():
+    from chromadb.utils import embedding_functions
+    embedding_function = getattr(embedding_functions, "DefaultEmbeddingFunction", None)
+    return embedding_function() if embedding_function else embedding_functions.SentenceTransformerEmbeddingFunction()
+
+
+def _fetch_embedding_weights(embed) -> None:
+    """임베딩 모델 파일만 미리 받아 둠 (ONNX Runtime 세션은 첫 호출 때 생성)"""
+    download = getattr(embed, "_download_model_if_not_exists", None)
+    if download is not None:
+        download()
+
 
 class RAGService:
     """
     RAG 서비스 - ETS TOEIC 패턴 검색
     토익 스타일 문제 생성을 위한 패턴 참조
+    
+    패턴은 (파트, 패턴 타입)별 컬렉션에 나눠 저장하고 검색 시 해당 파티션으로 라우팅
+    (큰 컬렉션 하나에 where 필터를 거는 것보다 빠르고 작은 n_results에서도 recall 유지)
+    HNSW 파라미터는 rag_hnsw_* 설정 - benchmarks/rag_ann.py로 측정해 기본값 선택
     """
     
     def __init__(self):
-        self._collection = None
+        self._client = None
+        self._partitions: Dict[str, object] = {}  # 파티션 이름 → 컬렉션
         self._initialized = False
+        # 멀티 워커 모드 (rag_shared.py): fork 전에 마스터가 채움
+        self._snapshot = None
+        self._embed = None
+        self._owner = None
     
     async def initialize(self):
         """ChromaDB 초기화 및 데이터 로드"""
@@ -40,14 +79,20 @@ class RAGService:
                 anonymized_telemetry=False
             ))
             
-            # 컬렉션 가져오기 또는 생성
-            self._collection = client.get_or_create_collection(
-                name="ets_patterns",
-                metadata={"description": "ETS TOEIC problem patterns"}
-            )
+            self._client = client
+            self._embed = _embedding_function()
+            
+            # 기존 파티션 컬렉션 열기 (0.4는 Collection, 0.6부터는 이름 목록 반환)
+            names = [getattr(c, "name", c) for c in client.list_collections()]
+            for name in names:
+                if name.startswith(f"{COLLECTION_PREFIX}__"):
+                    self._partitions[name] = client.get_collection(name=name, embedding_function=self._embed)
+            
+            if COLLECTION_PREFIX in names:
+                self._migrate_legacy_collection()
             
             # 초기 데이터가 없으면 로드
-            if self._collection.count() == 0:
+            if self.count() == 0:
                 await self._load_initial_patterns()
             
             self._initialized = True
@@ -59,21 +104,143 @@ class RAGService:
             print(f"RAG initialization error: {e}")
             self._initialized = True
     
+    async def warmup(self):
+        """벡터 스토어와 임베딩 모델 미리 로드"""
+        await self.initialize()
+    
+    def preload_from_owner(self, owner) -> None:
+        """
+        멀티 워커 모드 - 마스터에서 fork 전에 호출
+        owner 프로세스의 인덱스를 읽기 전용 스냅샷으로, 임베딩 모델 파일과 함께 로드
+        (워커는 ChromaDB를 열지 않고 스냅샷에서 검색, 쓰기는 owner로 전달)
+        ONNX Runtime 세션은 내부 스레드 풀이 fork를 견디지 못하므로 만들지 않음 → warm_worker
+        """
+        from .rag_shared import PatternSnapshot
+
+        self._owner = owner
+        self._snapshot = PatternSnapshot(**owner.export())
+        self._embed = _embedding_function()
+        _fetch_embedding_weights(self._embed)
+        self._initialized = True
+    
+    def warm_worker(self) -> None:
+        """워커 fork 직후 호출 - 임베딩 추론 세션을 워커에서 생성 (첫 요청 지연 방지)"""
+        if self._embed is not None:
+            self._embed(["warmup"])
+    
+    def count(self) -> int:
+        if self._snapshot is not None:
+            return len(self._snapshot)
+        return sum(collection.count() for collection in self._partitions.values())
+    
+    def _partition(self, part, pattern_type: str):
+        """파티션 컬렉션 (없으면 현재 HNSW 설정으로 생성 - 기존 파티션의 인덱스 파라미터는 생성 시 고정)"""
+        name = partition_name(part, pattern_type)
+        collection = self._partitions.get(name)
+        if collection is None:
+            collection = self._client.get_or_create_collection(
+                name=name,
+                embedding_function=self._embed,
+                metadata={
+                    "description": f"ETS TOEIC Part {part} {pattern_type} patterns",
+                    "hnsw:space": settings.rag_hnsw_space,
+                    "hnsw:construction_ef": settings.rag_hnsw_construction_ef,
+                    "hnsw:search_ef": settings.rag_hnsw_search_ef,
+                    "hnsw:M": settings.rag_hnsw_m,
+                }
+            )
+            self._partitions[name] = collection
+        return collection
+    
+    def _route(self, part: Optional[int] = None, pattern_type: Optional[str] = None) -> List:
+        """검색 대상 파티션 - 파트와 타입이 모두 있으면 하나, 일부만 있으면 이름으로 고름"""
+        if part and pattern_type:
+            collection = self._partitions.get(partition_name(part, pattern_type))
+            return [collection] if collection is not None else []
+        prefix = f"{COLLECTION_PREFIX}__p{part}__" if part else f"{COLLECTION_PREFIX}__"
+        suffix = f"__{_type_slug(pattern_type)}" if pattern_type else ""
+        return [
+            collection for name, collection in self._partitions.items()
+            if name.startswith(prefix) and name.endswith(suffix)
+        ]
+    
+    def _migrate_legacy_collection(self) -> None:
+        """파티션 이전의 단일 ets_patterns 컬렉션을 임베딩 그대로 파티션으로 옮기고 삭제"""
+        legacy = self._client.get_collection(name=COLLECTION_PREFIX, embedding_function=self._embed)
+        data = legacy.get(include=["documents", "metadatas", "embeddings"])
+        self._store(data["documents"], data["metadatas"], [list(map(float, e)) for e in data["embeddings"]])
+        self._client.delete_collection(name=COLLECTION_PREFIX)
+        print(f"📚 Migrated {len(data['ids'])} RAG patterns into {len(self._partitions)} partitions")
+    
+    def export_snapshot(self) -> Dict[str, list]:
+        """전체 패턴과 임베딩 (owner → 마스터 스냅샷용)"""
+        exported = {key: [] for key in _EMPTY}
+        for collection in self._partitions.values():
+            data = collection.get(include=["documents", "metadatas", "embeddings"])
+            exported["ids"] += data["ids"]
+            exported["documents"] += data["documents"]
+            exported["metadatas"] += data["metadatas"]
+            exported["embeddings"] += [list(map(float, e)) for e in data["embeddings"]]
+        return exported
+    
+    async def add_patterns(self, patterns: List[Dict]) -> Dict[str, list]:
+        """
+        패턴 추가 - 멀티 워커 모드에서는 owner 프로세스를 거쳐 저장
+        
+        Returns:
+            저장된 레코드 (ids, documents, metadatas, embeddings)
+        """
+        if self._owner is not None:
+            added = await asyncio.to_thread(self._owner.add, patterns)
+            self._snapshot.extend(**added)
+            return added
+        
+        if not self._client:
+            return {key: [] for key in _EMPTY}
+        
+        documents = [pattern["content"] for pattern in patterns]
+        metadatas = [{
+            "type": pattern["type"],
+            "part": str(pattern["part"]),
+            "category": pattern["category"]
+        } for pattern in patterns]
+        return self._store(documents, metadatas)
+    
+    def _store(self, documents: List[str], metadatas: List[Dict], embeddings: Optional[List[List[float]]] = None) -> Dict[str, list]:
+        """파티션별로 나눠 저장 (embeddings가 없으면 컬렉션이 임베딩), 입력 순서대로 레코드 반환"""
+        groups: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            groups.setdefault(partition_name(metadata["part"], metadata["type"]), []).append(i)
+        
+        ids = [""] * len(documents)
+        stored_embeddings = [None] * len(documents)
+        for indices in groups.values():
+            metadata = metadatas[indices[0]]
+            collection = self._partition(metadata["part"], metadata["type"])
+            start = collection.count()
+            group_ids = [f"{collection.name}_{start + n}" for n in range(len(indices))]
+            collection.add(
+                documents=[documents[i] for i in indices],
+                metadatas=[metadatas[i] for i in indices],
+                embeddings=[embeddings[i] for i in indices] if embeddings is not None else None,
+                ids=group_ids
+            )
+            stored = collection.get(ids=group_ids, include=["embeddings"])
+            by_id = dict(zip(stored["ids"], stored["embeddings"]))
+            for i, record_id in zip(indices, group_ids):
+                ids[i] = record_id
+                stored_embeddings[i] = list(map(float, by_id[record_id]))
+        
+        return {
+            "ids": ids,
+            "documents": list(documents),
+            "metadatas": list(metadatas),
+            "embeddings": stored_embeddings,
+        }
+    
     async def _load_initial_patterns(self):
         """초기 ETS 패턴 데이터 로드"""
-        patterns = self._get_default_patterns()
-        
-        if self._collection:
-            for i, pattern in enumerate(patterns):
-                self._collection.add(
-                    documents=[pattern["content"]],
-                    metadatas=[{
-                        "type": pattern["type"],
-                        "part": str(pattern["part"]),
-                        "category": pattern["category"]
-                    }],
-                    ids=[f"pattern_{i}"]
-                )
+        await self.add_patterns(self._get_default_patterns())
     
     def _get_default_patterns(self) -> List[Dict]:
         """기본 ETS 패턴 데이터"""
@@ -147,6 +314,36 @@ class RAGService:
                 "part": 5,
                 "category": "hard",
                 "content": "Hard Part 5: Advanced vocabulary, subtle grammar distinctions, multiple grammar points, idiomatic expressions."
+            },
+            {
+                "type": "difficulty",
+                "part": 5,
+                "category": "medium",
+                "content": "Medium Part 5: Everyday business vocabulary, one grammar point with a plausible distractor of the same word family or tense."
+            },
+            {
+                "type": "difficulty",
+                "part": 6,
+                "category": "easy",
+                "content": "Easy Part 6: Short sentences, common workplace vocabulary, blanks decided by the sentence containing them."
+            },
+            {
+                "type": "difficulty",
+                "part": 6,
+                "category": "hard",
+                "content": "Hard Part 6: Longer sentences with subordinate clauses, blanks that require the previous or next sentence, sentence insertion."
+            },
+            {
+                "type": "difficulty",
+                "part": 7,
+                "category": "easy",
+                "content": "Easy Part 7: Short notices or emails, detail questions whose answers are stated almost word for word."
+            },
+            {
+                "type": "difficulty",
+                "part": 7,
+                "category": "hard",
+                "content": "Hard Part 7: Longer passages with advanced vocabulary, inference and paraphrased answers, distractors that repeat passage words."
             }
         ]
     
@@ -169,38 +366,80 @@ class RAGService:
         Returns:
             관련 패턴 목록
         """
-        if not settings.use_rag or not self._collection:
+        if not settings.use_rag or not (self._partitions or self._snapshot):
             # RAG 비활성화시 기본 패턴 반환
             return self._get_fallback_patterns(part)
         
         try:
-            # 필터 구성
-            where_filter = {}
-            if part:
-                where_filter["part"] = str(part)
-            if pattern_type:
-                where_filter["type"] = pattern_type
+            with span("search_patterns", part=part or ""):
+                embedding = self._embed([query])[0]
+                if self._snapshot is not None:
+                    where_filter = {}
+                    if part:
+                        where_filter["part"] = str(part)
+                    if pattern_type:
+                        where_filter["type"] = pattern_type
+                    results = self._snapshot.query(embedding, n_results=n_results, where=where_filter)
+                    found = list(zip(results["distances"][0], results["documents"][0], results["metadatas"][0]))
+                else:
+                    # 파티션마다 상위 n_results → 거리순 병합 (쿼리 임베딩은 한 번만)
+                    found = []
+                    for collection in self._route(part, pattern_type):
+                        size = collection.count()
+                        if size == 0:
+                            continue
+                        results = collection.query(
+                            query_embeddings=[list(map(float, embedding))],
+                            n_results=min(n_results, size)
+                        )
+                        found += zip(results["distances"][0], results["documents"][0], results["metadatas"][0])
+                    found.sort(key=lambda item: item[0])
             
-            results = self._collection.query(
-                query_texts=[query],
-                n_results=n_results,
-                where=where_filter if where_filter else None
-            )
-            
-            patterns = []
-            if results and results["documents"]:
-                for i, doc in enumerate(results["documents"][0]):
-                    patterns.append({
-                        "content": doc,
-                        "metadata": results["metadatas"][0][i] if results["metadatas"] else {}
-                    })
+            patterns = [
+                {"content": doc, "metadata": metadata or {}}
+                for _, doc, metadata in found[:n_results]
+            ]
             
             return patterns
             
         except Exception as e:
             print(f"RAG search error: {e}")
+            metrics.errors.inc(stage="search_patterns", part=part or "")
             return self._get_fallback_patterns(part)
     
+    async def difficulty_patterns(self, part: int, difficulty: str) -> List[Dict]:
+        """
+        난이도 패턴 (type=difficulty, 파트와 난이도 일치)
+        벡터 검색이 아니라 (파트, difficulty) 파티션의 메타데이터 필터로 선택
+        """
+        if self._snapshot is not None:
+            rows = self._snapshot.partition_rows(str(part), "difficulty")
+            records = [(self._snapshot.documents[i], self._snapshot.metadatas[i]) for i in rows]
+        elif self._partitions:
+            collection = self._partitions.get(partition_name(part, "difficulty"))
+            if collection is None:
+                return []
+            try:
+                found = collection.get(where={"category": difficulty})
+                return [
+                    {"content": doc, "metadata": metadata}
+                    for doc, metadata in zip(found["documents"], found["metadatas"])
+                ]
+            except Exception as e:
+                print(f"RAG difficulty pattern error: {e}")
+                metrics.errors.inc(stage="difficulty_patterns", part=part)
+                records = []
+        else:
+            records = [(p["content"], p) for p in self._get_default_patterns()]
+        
+        return [
+            {"content": doc, "metadata": metadata}
+            for doc, metadata in records
+            if metadata.get("type") == "difficulty"
+            and str(metadata.get("part")) == str(part)
+            and metadata.get("category") == difficulty
+        ]
+    
     def _get_fallback_patterns(self, part: Optional[int] = None) -> List[Dict]:
         """RAG 없을 때 기본 패턴"""
         all_patterns = self._get_default_patterns()
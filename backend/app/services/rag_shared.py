@@ -0,0 +1,181 @@
+"""Shared RAG Index - Read-only pattern snapshot for preforked workers and a single writer process
+
+멀티 워커 모드(python -m app.server)에서 사용
+- 소유 프로세스(owner)만 ChromaDB(duckdb+parquet) 영속 저장소를 열고 쓰기를 처리
+- 마스터는 fork 전에 owner에서 인덱스를 받아 PatternSnapshot과 임베딩 모델을 로드
+  → 워커들은 같은 메모리 페이지를 copy-on-write로 공유
+- 워커의 쓰기는 unix 소켓으로 owner에 전달
+"""
+from typing import Optional, List, Dict, Any, Tuple
+from multiprocessing.connection import Client, Listener
+import asyncio
+import multiprocessing
+import os
+import time
+import numpy as np
+
+
+class PatternSnapshot:
+    """
+    읽기 전용 패턴 인덱스 (문서, 메타데이터, 임베딩 행렬)
+    전수 L2 검색으로 ChromaDB query와 같은 결과 순서를 냄
+    (파트, 패턴 타입)별 행 번호를 미리 나눠 두어 part/type 필터는 해당 행만 계산
+    """
+
+    def __init__(self, ids: List[str], documents: List[str], metadatas: List[Dict], embeddings: List[List[float]]):
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas)
+        self.embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(self.ids), -1)
+        self._partitions: Dict[Tuple[str, str], np.ndarray] = {}
+        self._index_partitions(0)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _index_partitions(self, start: int) -> None:
+        """start 이후 행을 (part, type) 파티션 행 번호에 추가"""
+        added: Dict[Tuple[str, str], List[int]] = {}
+        for i in range(start, len(self.metadatas)):
+            metadata = self.metadatas[i]
+            added.setdefault((str(metadata.get("part")), metadata.get("type")), []).append(i)
+        for key, rows in added.items():
+            existing = self._partitions.get(key)
+            rows = np.asarray(rows, dtype=np.int64)
+            self._partitions[key] = np.concatenate([existing, rows]) if existing is not None else rows
+
+    def partition_rows(self, part: Optional[str] = None, pattern_type: Optional[str] = None) -> np.ndarray:
+        """파트/타입이 일치하는 행 번호 (None이면 해당 조건 없음)"""
+        matched = [
+            rows for (row_part, row_type), rows in self._partitions.items()
+            if (part is None or row_part == part) and (pattern_type is None or row_type == pattern_type)
+        ]
+        return np.sort(np.concatenate(matched)) if matched else np.empty(0, dtype=np.int64)
+
+    def extend(self, ids: List[str], documents: List[str], metadatas: List[Dict], embeddings: List[List[float]]) -> None:
+        """owner에 쓴 패턴을 이 프로세스의 스냅샷에도 반영 (다른 워커는 재시작 시 반영)"""
+        start = len(self.ids)
+        self.ids += ids
+        self.documents += documents
+        self.metadatas += metadatas
+        added = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        self.embeddings = np.vstack([self.embeddings, added]) if len(self.embeddings) else added
+        self._index_partitions(start)
+
+    def query(self, embedding: List[float], n_results: int, where: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """ChromaDB collection.query와 같은 형태의 결과 (쿼리 1개)"""
+        where = dict(where or {})
+        candidates = self.partition_rows(where.pop("part", None), where.pop("type", None))
+        if where:  # part/type 외 조건은 메타데이터 비교
+            candidates = np.asarray([
+                i for i in candidates
+                if all(self.metadatas[i].get(k) == v for k, v in where.items())
+            ], dtype=np.int64)
+        if not len(candidates):
+            return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        distances = ((self.embeddings[candidates] - vector) ** 2).sum(axis=1)
+        if n_results < len(distances):
+            top = np.argpartition(distances, n_results)[:n_results]
+            order = top[np.argsort(distances[top], kind="stable")]
+        else:
+            order = np.argsort(distances, kind="stable")
+        picked = candidates[order].tolist()
+        return {
+            "ids": [[self.ids[i] for i in picked]],
+            "documents": [[self.documents[i] for i in picked]],
+            "metadatas": [[self.metadatas[i] for i in picked]],
+            "distances": [[float(distances[i]) for i in order]],
+        }
+
+
+class RAGOwnerClient:
+    """owner 프로세스 RPC 클라이언트 (호출마다 연결 - 쓰기 빈도가 낮음)"""
+
+    def __init__(self, socket_path: str, authkey: bytes):
+        self.socket_path = socket_path
+        self.authkey = authkey
+
+    def _call(self, request: Dict[str, Any], connect_timeout: float = 0.0) -> Any:
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            try:
+                conn = Client(self.socket_path, family="AF_UNIX", authkey=self.authkey)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+
+        with conn:
+            conn.send(request)
+            response = conn.recv()
+        if "error" in response:
+            raise RuntimeError(f"RAG owner error: {response['error']}")
+        return response["result"]
+
+    def export(self, connect_timeout: float = 30.0) -> Dict[str, list]:
+        """전체 인덱스 (ids, documents, metadatas, embeddings)"""
+        return self._call({"op": "export"}, connect_timeout)
+
+    def add(self, patterns: List[Dict]) -> Dict[str, list]:
+        """패턴 추가 - 저장된 레코드(임베딩 포함) 반환"""
+        return self._call({"op": "add", "patterns": patterns})
+
+
+def serve_owner(socket_path: str, authkey: bytes) -> None:
+    """
+    owner 프로세스 진입점
+    직접 모드의 RAGService로 ChromaDB를 열고 요청을 순서대로 처리 (쓰기 직렬화)
+    """
+    from .rag_service import RAGService
+
+    service = RAGService()
+    asyncio.run(service.initialize())
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    listener = Listener(socket_path, family="AF_UNIX", authkey=authkey)
+    os.chmod(socket_path, 0o600)
+    print(f"🗄️  RAG owner listening on {socket_path} ({service.count()} patterns)")
+
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:  # 인증 실패 등 - 다음 연결 처리
+                print(f"RAG owner connection error: {e}")
+                continue
+            with conn:
+                try:
+                    request = conn.recv()
+                    if request["op"] == "export":
+                        result = service.export_snapshot()
+                    elif request["op"] == "add":
+                        result = asyncio.run(service.add_patterns(request["patterns"]))
+                    else:
+                        raise ValueError(f"Unknown op: {request['op']}")
+                    conn.send({"result": result})
+                except EOFError:
+                    pass
+                except Exception as e:
+                    print(f"RAG owner request error: {e}")
+                    conn.send({"error": str(e)})
+    finally:
+        listener.close()
+
+
+def start_owner(socket_path: str) -> RAGOwnerClient:
+    """
+    owner 프로세스 시작 (spawn - 마스터 상태를 물려받지 않음)
+    마스터 종료 시 함께 종료되도록 daemon 프로세스로 실행
+    """
+    socket_path = os.path.abspath(socket_path)
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    authkey = os.urandom(32)
+    process = multiprocessing.get_context("spawn").Process(
+        target=serve_owner, args=(socket_path, authkey), name="parsey-rag-owner", daemon=True
+    )
+    process.start()
+    return RAGOwnerClient(socket_path, authkey)
@@ -0,0 +1,55 @@
+"""Rate Limit Primitives - Token Bucket"""
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    토큰 버킷
+    분당 용량(capacity)만큼 채워지며, 초당 capacity / period 속도로 리필
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0, burst: Optional[float] = None):
+        self.capacity = float(burst if burst is not None else capacity)
+        self.rate = float(capacity) / period
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def available(self) -> float:
+        """현재 사용 가능한 토큰 수"""
+        self._refill()
+        return self.tokens
+
+    def time_until(self, amount: float, reserve: float = 0.0) -> float:
+        """
+        amount 만큼 소비 가능해질 때까지 남은 시간(초)
+
+        Args:
+            amount: 필요한 토큰 수 (용량을 넘으면 용량으로 제한)
+            reserve: 소비 후에도 남겨둬야 하는 토큰 수 (합이 용량을 넘으면 용량까지만)
+        """
+        self._refill()
+        needed = min(amount + reserve, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (needed - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """토큰 소비 (추정치가 부족했던 경우 음수까지 허용)"""
+        self._refill()
+        self.tokens -= amount
+
+    def adjust(self, delta: float) -> None:
+        """실제 사용량과 추정치의 차이 반영 (양수면 반환, 음수면 추가 차감)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + delta)
+
@@ -0,0 +1,130 @@
+"""Service Registry - Lazy service loading and explicit warmup"""
+from typing import Callable, Dict, Iterable, Optional, Any
+import importlib
+import inspect
+import sys
+import time
+from ..config import get_settings
+
+settings = get_settings()
+
+
+class _ServiceSpec:
+    def __init__(self, module: str, attribute: Optional[str], enabled: Callable[[], bool]):
+        self.module = module
+        self.attribute = attribute
+        self.enabled = enabled
+
+
+class ServiceRegistry:
+    """
+    서비스 레지스트리
+    - 서비스 모듈은 처음 사용될 때 import (provider SDK, 벡터 스토어는 그 안에서 다시 지연 로드)
+    - warmup()으로 설정된 서비스만 시작 시 미리 로드
+    """
+
+    def __init__(self):
+        self._specs: Dict[str, _ServiceSpec] = {}
+        self._instances: Dict[str, Any] = {}
+        self._load_times: Dict[str, float] = {}
+
+    def register(
+        self,
+        name: str,
+        module: str,
+        attribute: Optional[str] = None,
+        enabled: Callable[[], bool] = lambda: True
+    ) -> None:
+        """서비스 등록 (import는 하지 않음). attribute가 없으면 모듈 자체가 서비스"""
+        self._specs[name] = _ServiceSpec(module, attribute, enabled)
+
+    def get(self, name: str) -> Any:
+        """서비스 인스턴스 (첫 호출 시 모듈 import)"""
+        instance = self._instances.get(name)
+        if instance is None:
+            spec = self._specs[name]
+            started = time.perf_counter()
+            module = importlib.import_module(spec.module, package=__package__)
+            instance = module if spec.attribute is None else getattr(module, spec.attribute)
+            if spec.attribute is not None:
+                # import_module이 app.services.<이름>을 모듈 객체로 바꿔 놓으므로 인스턴스로 되돌림
+                setattr(sys.modules[__package__], spec.attribute, instance)
+            self._instances[name] = instance
+            self._load_times[name] = time.perf_counter() - started
+        return instance
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    async def warmup(self, names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """
+        서비스 미리 로드 - 활성화된 서비스만, warmup() 메서드가 있으면 함께 호출
+
+        Returns:
+            서비스별 소요 시간(초)
+        """
+        timings = {}
+        for name in names if names is not None else self._specs:
+            spec = self._specs.get(name)
+            if spec is None:
+                print(f"Unknown service in warmup list: {name}")
+                continue
+            if not spec.enabled():
+                continue
+            started = time.perf_counter()
+            instance = self.get(name)
+            warm = getattr(instance, "warmup", None)
+            if warm is not None:
+                result = warm()
+                if inspect.isawaitable(result):
+                    await result
+            timings[name] = round(time.perf_counter() - started, 4)
+        return timings
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "loaded": name in self._instances,
+                "enabled": spec.enabled(),
+                "load_seconds": round(self._load_times[name], 4) if name in self._load_times else None,
+            }
+            for name, spec in self._specs.items()
+        }
+
+
+# 싱글톤 인스턴스
+service_registry = ServiceRegistry()
+service_registry.register(
+    "llm_service", ".llm_service", "llm_service",
+    enabled=lambda: bool(settings.openai_api_key or settings.google_api_key),
+)
+service_registry.register(
+    "rag_service", ".rag_service", "rag_service",
+    enabled=lambda: settings.use_rag,
+)
+service_registry.register("problem_generator", ".problem_generator", "problem_generator")
+service_registry.register(
+    "ocr_service", ".ocr_service",
+    enabled=lambda: bool(settings.google_api_key or settings.google_application_credentials),
+)
+service_registry.register("document_ocr", ".document_ocr", "document_ocr")
+
+
+def get_llm_service():
+    return service_registry.get("llm_service")
+
+
+def get_rag_service():
+    return service_registry.get("rag_service")
+
+
+def get_problem_generator():
+    return service_registry.get("problem_generator")
+
+
+def get_ocr_service():
+    return service_registry.get("ocr_service")
+
+
+def get_document_ocr():
+    return service_registry.get("document_ocr")
@@ -0,0 +1,275 @@
+"""Semantic Cache - Reuse problems generated from near-duplicate source texts"""
+from typing import Dict, List, Optional
+from collections import OrderedDict
+from difflib import SequenceMatcher
+import re
+import threading
+import time
+import numpy as np
+from ..config import get_settings
+from ..schemas import Problem, ProblemGenerateRequest, ProblemGenerateResponse
+from .difficulty import difficulty_scorer, RARE_LEVEL
+from .explanation_store import explanation_store
+from .metrics import metrics
+
+settings = get_settings()
+
+EMBEDDING_DIM = 2048
+
+_ABBREVIATIONS = frozenset("mr mrs ms dr st jr sr co inc ltd corp dept no vs etc".split())
+_NUMBER = re.compile(r"\d+(?:[.,:]\d+)*")
+_NON_WORD = re.compile(r"[^a-z0 ]+")
+_TOKEN = re.compile(r"[A-Za-z0-9]+(?:[.,:'][A-Za-z0-9]+)*")
+
+
+def normalize_text(text: str) -> str:
+    """
+    비교용 정규화 - 대소문자/구두점/공백 무시, 숫자는 0, 문장 중간의 대문자 단어(이름, 회사명 등)는 N
+    → 공백, OCR 잡음, 이름/숫자만 다른 텍스트가 거의 같은 문자열이 됨
+    """
+    words = []
+    sentence_start = True
+    for token in text.split():
+        word = token.strip(".,;:!?\"'()[]")
+        words.append("N" if not sentence_start and word[:1].isupper() and word[1:].islower() else token)
+        sentence_start = token.endswith((".", "!", "?")) and word.lower() not in _ABBREVIATIONS
+    text = _NUMBER.sub("0", " ".join(words).lower())
+    return " " + " ".join(_NON_WORD.sub(" ", text).split()) + " "
+
+
+def embed(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """정규화 텍스트의 문자 3-gram 해시 벡터 (L2 정규화 - 내적이 코사인 유사도)"""
+    data = np.frombuffer(normalize_text(text).encode("ascii"), dtype=np.uint8).astype(np.uint32)
+    grams = ((data[:-2] * 961 + data[1:-1] * 31 + data[2:]) * np.uint32(2654435761)) % dim
+    vector = np.sqrt(np.bincount(grams, minlength=dim).astype(np.float32))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _replaceable(before: str, after: str) -> bool:
+    """문제 안에서 바꿔도 되는 단어 쌍 - 숫자끼리, 또는 사전에 없는 대문자 단어(이름)끼리"""
+    if before[0].isdigit() and after[0].isdigit():
+        return True
+    return (
+        before[0].isupper() and after[0].isupper()
+        and difficulty_scorer.word_level(before.lower()) == RARE_LEVEL
+    )
+
+
+def _quoted(old: List[str], index: int, words: set, bigrams: set) -> bool:
+    """원문 old[index] 앞에 끼어든 단어가 문제가 인용한 구간 안인지 (앞뒤 단어가 문제에서도 붙어 있음)"""
+    left = old[index - 1] if index > 0 else None
+    right = old[index] if index < len(old) else None
+    if left is not None and right is not None:
+        return (left, right) in bigrams
+    return (left or right) in words
+
+
+def substitutions(source: str, text: str, body: str, choices: str) -> Optional[Dict[str, str]]:
+    """
+    저장된 원문 → 새 텍스트에서 바뀐 단어 중 문제에 나오는 것의 치환표
+    - 이름/숫자끼리 바뀐 단어는 문제 전체에서 치환
+    - 그 밖의 변경(추가, 삭제, 일반 단어 교체)이 문제 본문이나 선택지에 걸리면 None
+      (not 추가, hire → fire처럼 뜻이나 정답이 달라질 수 있음) - 문제와 무관한 구간의 변경만 무시
+
+    Args:
+        body: 지문, 문항, 해설 (선택지 제외)
+        choices: 선택지 텍스트
+    """
+    old, new = _TOKEN.findall(source), _TOKEN.findall(text)
+    words, bigrams = set(), set()
+    for part in (body, choices):
+        tokens = _TOKEN.findall(part)
+        words.update(tokens)
+        bigrams.update(zip(tokens, tokens[1:]))
+    mapping: Dict[str, str] = {}
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+        if tag == "equal":
+            continue
+        if tag == "insert":
+            if _quoted(old, i1, words, bigrams):
+                return None
+            continue
+        if i2 - i1 == j2 - j1:
+            pairs = zip(old[i1:i2], new[j1:j2])
+        else:
+            pairs = ((word, None) for word in old[i1:i2])
+        for before, after in pairs:
+            if before == after or before not in words:
+                continue
+            if after is None or not _replaceable(before, after):
+                return None
+            if mapping.setdefault(before, after) != after:
+                return None
+    return mapping
+
+
+def _apply(mapping: Dict[str, str], text: Optional[str]) -> Optional[str]:
+    if not mapping or not text:
+        return text
+    pattern = re.compile(
+        r"(?<![A-Za-z0-9])(?:" + "|".join(map(re.escape, sorted(mapping, key=len, reverse=True))) + r")(?![A-Za-z0-9])"
+    )
+    return pattern.sub(lambda m: mapping[m.group(0)], text)
+
+
+def _adapt_problem(problem: Problem, mapping: Dict[str, str]) -> Problem:
+    return problem.model_copy(update={
+        "passage": _apply(mapping, problem.passage),
+        "question": _apply(mapping, problem.question),
+        "choices": [choice.model_copy(update={"text": _apply(mapping, choice.text)}) for choice in problem.choices],
+        "explanation": _apply(mapping, problem.explanation),
+    })
+
+
+class SemanticCache:
+    """
+    유사 텍스트 문제 캐시 (프로세스 메모리, 임베딩 행렬 전수 내적 검색)
+    - 요청 조건(파트, 난이도, 세트 여부, lazy_explanation, 조각)이 같은 항목끼리만 비교
+    - 정규화 텍스트 임베딩 유사도가 threshold 이상이면 저장된 문제 재사용
+      달라진 이름/숫자는 문제에서도 바꿔서 반환, 안전하게 바꿀 수 없으면 미스 (새로 생성)
+    - 신선도: 저장 후 ttl_seconds가 지났거나 max_hits번 재사용한 항목은 제거 → 같은 텍스트도 새 문제
+    - 용량: max_entries 초과 시 가장 오래 사용하지 않은 항목부터 제거
+    """
+
+    def __init__(self, threshold: float, ttl_seconds: float, max_entries: int, max_hits: int, dim: int = EMBEDDING_DIM):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.max_hits = max_hits
+        self.dim = dim
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, dim) - 첫 저장 때 할당, 행 = 슬롯
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()  # 슬롯 → 항목 (LRU 순서)
+        self._partitions: Dict[tuple, Dict[int, dict]] = {}  # 요청 조건 → 슬롯 → 항목
+        self._free = list(range(self.max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(request: ProblemGenerateRequest) -> tuple:
+        return (
+            request.part, request.difficulty, request.passage_set, request.lazy_explanation,
+            tuple(request.chunk_indices or ()),
+        )
+
+    def get(self, request: ProblemGenerateRequest) -> Optional[ProblemGenerateResponse]:
+        """가장 비슷한 저장 항목의 문제 (request.count개, 이름/숫자는 새 텍스트에 맞춤) - 없으면 None"""
+        labels = {"provider": "openai", "model": settings.llm_model, "part": request.part or ""}
+        vector = embed(request.text, self.dim)
+        with self._lock:
+            entry = self._nearest(self._key(request), vector, request.count)
+
+        response = self._adapt(entry, request) if entry is not None else None
+        if response is None:
+            metrics.cache_misses.inc(cache="semantic", **labels)
+            return None
+
+        # 실제로 재사용했을 때만 사용 횟수/LRU 갱신 (치환할 수 없어 미스가 된 조회는 항목을 소모하지 않음)
+        with self._lock:
+            if self._entries.get(entry["slot"]) is entry:
+                entry["hits"] += 1
+                self._entries.move_to_end(entry["slot"])
+                if self.max_hits and entry["hits"] >= self.max_hits:
+                    self._remove(entry["slot"])
+        metrics.cache_hits.inc(cache="semantic", **labels)
+        return response
+
+    def put(self, request: ProblemGenerateRequest, response: ProblemGenerateResponse) -> None:
+        """LLM으로 생성한 응답 저장 (문제 수가 요청보다 적은 부분 결과는 저장하지 않음)"""
+        if len(response.problems) < request.count:
+            return
+        entry = {
+            "key": self._key(request),
+            "text": request.text,
+            "detected_part": response.detected_part,
+            "passage": response.passage,
+            "problems": list(response.problems),
+            "expires": time.monotonic() + self.ttl_seconds,
+            "hits": 0,
+        }
+        vector = embed(request.text, self.dim)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, self.dim), dtype=np.float32)
+            if not self._free:
+                self._remove(next(iter(self._entries)))
+            slot = self._free.pop()
+            entry["slot"] = slot
+            self._vectors[slot] = vector
+            self._entries[slot] = entry
+            self._partitions.setdefault(entry["key"], {})[slot] = entry
+
+    def _nearest(self, key: tuple, vector: np.ndarray, count: int) -> Optional[dict]:
+        """같은 조건의 만료되지 않은 항목 중 유사도가 threshold 이상인 가장 가까운 항목 (lock 안에서)"""
+        partition = self._partitions.get(key)
+        if not partition:
+            return None
+        now = time.monotonic()
+        for slot in [slot for slot, entry in partition.items() if entry["expires"] < now]:
+            self._remove(slot)
+        slots = [slot for slot, entry in partition.items() if len(entry["problems"]) >= count]
+        if not slots:
+            return None
+        similarities = self._vectors[slots] @ vector
+        best = int(np.argmax(similarities))
+        return partition[slots[best]] if similarities[best] >= self.threshold else None
+
+    def _remove(self, slot: int) -> None:
+        entry = self._entries.pop(slot)
+        partition = self._partitions[entry["key"]]
+        del partition[slot]
+        if not partition:
+            del self._partitions[entry["key"]]
+        self._free.append(slot)
+
+    def _adapt(self, entry: dict, request: ProblemGenerateRequest) -> Optional[ProblemGenerateResponse]:
+        """저장된 문제를 새 텍스트에 맞춰 응답으로 (이름/숫자 치환, 안전하게 바꿀 수 없으면 None)"""
+        problems: List[Problem] = entry["problems"][:request.count]
+        passage = entry["passage"]
+        mapping: Optional[Dict[str, str]] = {}
+        if request.text != entry["text"]:
+            body = " ".join(
+                [passage or ""] + [f"{p.passage or ''} {p.question} {p.explanation}" for p in problems]
+            )
+            choices = " ".join(choice.text for p in problems for choice in p.choices)
+            mapping = substitutions(entry["text"], request.text, body, choices)
+            if mapping is None:
+                return None
+
+        if mapping:
+            passage = _apply(mapping, passage)
+            problems = [self._adapt_problem(problem, mapping, passage) for problem in problems]
+        return ProblemGenerateResponse(
+            success=True,
+            problems=problems,
+            source_text=request.text,
+            detected_part=entry["detected_part"],
+            passage=passage,
+            cached=True
+        )
+
+    def _adapt_problem(self, problem: Problem, mapping: Dict[str, str], passage: Optional[str]) -> Problem:
+        """치환한 문제 - lazy_explanation 문제는 저장된 근거도 치환해 새 problem_id로 등록"""
+        record = explanation_store.get(problem.problem_id) if problem.problem_id else None
+        if record is None:
+            return _adapt_problem(problem, mapping)
+        adapted = _adapt_problem(record["problem"], mapping)
+        problem_id = explanation_store.put(adapted, passage)
+        return adapted.model_copy(update={"explanation": "", "problem_id": problem_id})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# 싱글톤 인스턴스
+semantic_cache = SemanticCache(
+    threshold=settings.semantic_cache_threshold,
+    ttl_seconds=settings.semantic_cache_ttl_seconds,
+    max_entries=settings.semantic_cache_max_entries,
+    max_hits=settings.semantic_cache_max_hits,
+)
+
+metrics.gauge(
+    "parsey_semantic_cache_entries",
+    "Generated problem sets held for reuse by near-duplicate source texts",
+    lambda: [({}, len(semantic_cache))],
+)
@@ -0,0 +1,256 @@
+"""Structured Output - Strict JSON schemas from pydantic models and local repair of LLM JSON"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+from functools import lru_cache
+import json
+import re
+from pydantic import BaseModel, ValidationError
+
+LABELS = ("A", "B", "C", "D")
+
+
+class OutputParseError(ValueError):
+    """복구할 수 없는 LLM 출력"""
+
+
+# --- 스키마 ---
+
+def _strict(node, in_properties: bool = False) -> None:
+    """OpenAI strict 모드 규칙 적용 - 모든 속성 required, additionalProperties false, default/title/description 제거"""
+    if isinstance(node, dict):
+        if not in_properties:
+            for key in ("title", "default", "description"):
+                node.pop(key, None)
+            if node.get("type") == "object" and "properties" in node:
+                node["required"] = list(node["properties"])
+                node["additionalProperties"] = False
+        for key, value in node.items():
+            _strict(value, in_properties=(key == "properties" and not in_properties))
+    elif isinstance(node, list):
+        for value in node:
+            _strict(value)
+
+
+@lru_cache(maxsize=None)
+def _response_format(model: Type[BaseModel], fields: Optional[Tuple[str, ...]]) -> dict:
+    schema = model.model_json_schema()
+    if fields:
+        schema["properties"] = {k: v for k, v in schema["properties"].items() if k in fields}
+    _strict(schema)
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "schema": schema, "strict": True},
+    }
+
+
+def response_format_for(model: Type[BaseModel], fields: Optional[Iterable[str]] = None) -> dict:
+    """
+    OpenAI response_format (json_schema, strict) - pydantic 모델에서 생성
+
+    Args:
+        model: 출력 모델
+        fields: 주어지면 해당 필드만 (재질문용)
+    """
+    return _response_format(model, tuple(fields) if fields else None)
+
+
+# --- JSON 복구 ---
+
+_DANGLING_KEY = re.compile(r'[{,]\s*"(?:[^"\\]|\\.)*"\s*$')
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ",":
+        del out[index]
+
+
+def repair_json(text: str) -> str:
+    """
+    흔한 LLM JSON 결함 복구
+    - 코드 펜스 / 앞뒤 설명 문장
+    - 닫는 괄호 앞의 trailing comma
+    - 잘린 출력 (열린 문자열, 배열, 객체, 값 없는 키)
+    """
+    text = text.strip()
+    start = text.find("{")
+    if start < 0:
+        raise OutputParseError("No JSON object in output")
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escape = False
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                break  # 최상위 객체 끝 - 뒤의 텍스트 무시
+            continue
+        out.append(ch)
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    repaired = "".join(out).rstrip()
+    if stack:
+        repaired = repaired.rstrip(",").rstrip()
+        if repaired.endswith(":"):
+            repaired += " null"
+        elif stack[-1] == "}" and _DANGLING_KEY.search(repaired):
+            repaired += ": null"
+        repaired += "".join(reversed(stack))
+    return repaired
+
+
+def _label(value) -> Optional[str]:
+    """'B', '(B)', 'B.', 'B) was' → 'B'"""
+    match = re.match(r"\s*\(?([A-Da-d])\b", str(value or ""))
+    return match.group(1).upper() if match else None
+
+
+def fix_problem_data(data: dict) -> dict:
+    """문제 JSON 보정 - 선택지 형태/라벨, 정답과 is_correct 불일치"""
+    choices = data.get("choices")
+    if isinstance(choices, dict):  # {"A": "was", ...}
+        choices = [{"label": k, "text": v} for k, v in choices.items()]
+    if isinstance(choices, list):
+        fixed = []
+        for i, choice in enumerate(choices[:len(LABELS)]):
+            if isinstance(choice, str):
+                choice = {"text": choice}
+            if not isinstance(choice, dict) or not choice.get("text"):
+                continue
+            choice["label"] = _label(choice.get("label")) or LABELS[i]
+            choice["text"] = str(choice["text"])
+            choice["is_correct"] = bool(choice.get("is_correct", False))
+            fixed.append(choice)
+        data["choices"] = fixed
+
+        labels = [c["label"] for c in fixed]
+        answer = _label(data.get("answer"))
+        marked = [c["label"] for c in fixed if c["is_correct"]]
+        if answer not in labels and len(marked) == 1:
+            answer = marked[0]
+        if answer in labels:
+            data["answer"] = answer
+            for choice in fixed:
+                choice["is_correct"] = choice["label"] == answer
+        else:
+            data["answer"] = ""  # 정답을 정할 수 없음 - 재질문 대상
+    return data
+
+
+def fix_set_data(data: dict) -> dict:
+    """세트 JSON 보정 - 문항마다 fix_problem_data 적용"""
+    questions = data.get("questions")
+    if isinstance(questions, list):
+        data["questions"] = [fix_problem_data(q) for q in questions if isinstance(q, dict)]
+    return data
+
+
+def fix_analysis_data(data: dict) -> dict:
+    """분석 JSON 보정 - 누락된 설명, 'Part 7' 같은 파트 표기"""
+    tags = []
+    for tag in data.get("pos_tags") or []:
+        if isinstance(tag, (list, tuple)) and len(tag) >= 2:
+            tag = {"word": tag[0], "pos": tag[1]}
+        if isinstance(tag, dict) and tag.get("word") and tag.get("pos"):
+            tag.setdefault("description", "")
+            tags.append(tag)
+    data["pos_tags"] = tags
+
+    elements = []
+    for element in data.get("grammar_elements") or []:
+        if isinstance(element, dict) and element.get("type") and element.get("value"):
+            element.setdefault("explanation", "")
+            elements.append(element)
+    data["grammar_elements"] = elements
+
+    part = data.get("toeic_part")
+    if isinstance(part, str):
+        match = re.search(r"[567]", part)
+        data["toeic_part"] = int(match.group()) if match else None
+    return data
+
+
+def parse_model_output(
+    model: Type[BaseModel],
+    content: Union[str, bytes],
+    fix: Optional[Callable[[dict], dict]] = None
+) -> Tuple[BaseModel, str]:
+    """
+    LLM 출력을 모델로 검증
+
+    1) 그대로 검증 (정상 경로) - 스키마가 맞아도 fix 보정은 적용 (정답과 is_correct 불일치 등)
+    2) JSON 복구 + fix 보정 후 검증
+    3) 그래도 검증 실패한 필드는 버리고 기본값 사용 (호출 측에서 해당 필드만 재질문)
+
+    Returns:
+        (모델 인스턴스, "valid" | "repaired")
+
+    Raises:
+        OutputParseError: JSON으로 복구할 수 없음
+    """
+    if not content:
+        raise OutputParseError("Empty output")
+    try:
+        result = model.model_validate_json(content)
+        if fix is None:
+            return result, "valid"
+        return model.model_validate(fix(result.model_dump())), "valid"
+    except ValidationError:
+        pass
+
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", errors="replace")
+    try:
+        data = json.loads(repair_json(content))
+    except ValueError as e:
+        raise OutputParseError(f"Unrecoverable JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise OutputParseError("Output is not a JSON object")
+    if fix is not None:
+        data = fix(data)
+
+    try:
+        return model.model_validate(data), "repaired"
+    except ValidationError as e:
+        broken = {error["loc"][0] for error in e.errors() if error["loc"]}
+    try:
+        return model.model_validate({k: v for k, v in data.items() if k not in broken}), "repaired"
+    except ValidationError as e:
+        raise OutputParseError(f"Invalid fields: {sorted(broken)}") from e
+
+
+def problem_defects(data: Dict) -> List[str]:
+    """재질문이 필요한 문제 필드 (비었거나 선택지/정답이 맞지 않음)"""
+    defects = []
+    if not data.get("question"):
+        defects.append("question")
+    choices = data.get("choices") or []
+    labels = [c["label"] for c in choices]
+    if len(choices) != len(LABELS) or sorted(labels) != list(LABELS):
+        defects.append("choices")
+    if "choices" in defects or data.get("answer") not in labels:
+        defects.append("answer")
+    if not data.get("explanation"):
+        defects.append("explanation")
+    return defects
@@ -0,0 +1,150 @@
+"""Tracing - Lightweight per-request spans"""
+from typing import Optional, List, Dict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from ..config import get_settings
+from .metrics import metrics
+
+settings = get_settings()
+
+
+class Span:
+    """단일 처리 단계"""
+
+    __slots__ = ("name", "span_id", "parent_id", "start", "end", "attributes")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: dict):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self, origin: float) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """요청 하나의 span 모음 (asyncio 태스크 간 공유)"""
+
+    def __init__(self, name: str, sampled: bool = False):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.sampled = sampled
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+
+    def server_timing(self) -> str:
+        """
+        Server-Timing 헤더 값
+        같은 이름의 span(예: 문제별 generate_problem)은 합산하고 횟수를 desc에 표기
+        """
+        totals: Dict[str, List[float]] = {}
+        for s in self.spans:
+            if s.end is not None:
+                entry = totals.setdefault(s.name, [0.0, 0])
+                entry[0] += s.duration_ms
+                entry[1] += 1
+        parts = []
+        for name, (duration, count) in totals.items():
+            desc = f';desc="x{count}"' if count > 1 else ""
+            parts.append(f"{name};dur={duration:.1f}{desc}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "timestamp": self.started_at,
+            "duration_ms": round((time.perf_counter() - self.origin) * 1000, 3),
+            "spans": [s.to_dict(self.origin) for s in self.spans],
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str, force_sample: bool = False):
+    """요청 단위 트레이스 시작 (미들웨어에서 사용)"""
+    sampled = settings.trace_export_path is not None and (
+        force_sample or random.random() < settings.trace_sample_rate
+    )
+    trace = Trace(name, sampled=sampled)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **labels):
+    """
+    처리 단계 span
+    - 현재 트레이스에 기록 (Server-Timing / JSONL 내보내기)
+    - parsey_stage_duration_seconds 히스토그램에 동일 라벨로 기록
+    """
+    parent = _current_span.get()
+    s = Span(name, parent.span_id if parent else None, labels)
+    token = _current_span.set(s)
+    try:
+        yield s
+    finally:
+        s.end = time.perf_counter()
+        _current_span.reset(token)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans.append(s)
+        metrics.stage_latency.observe((s.end - s.start), stage=name, **labels)
+
+
+class SpanExporter:
+    """샘플링된 트레이스를 JSONL 파일에 추가 (블로킹 I/O - 이벤트 루프에서는 to_thread로 호출)"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, trace: Trace) -> None:
+        if not self.path or not trace.sampled:
+            return
+        line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            try:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._file.write(line + "\n")
+            except OSError as e:
+                print(f"Span export error: {e}")
+
+
+# 싱글톤 인스턴스
+span_exporter = SpanExporter(settings.trace_export_path)
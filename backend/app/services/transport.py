@@ -0,0 +1,219 @@
+"""HTTP Transport - Shared client with record/replay cassettes for LLM and Vision calls"""
+from typing import Optional, Dict, List, Set, Tuple
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import httpx
+from ..config import get_settings
+
+settings = get_settings()
+
+# 요청 해시와 저장에서 제외할 쿼리 파라미터 / 헤더
+_SECRET_PARAMS = {"key", "api_key"}
+_RECORDED_HEADERS = {"content-type", "retry-after", "x-request-id"}
+# aread()가 압축을 푼 본문을 돌려주므로 인코딩/길이 헤더는 본문과 맞지 않음
+_BODY_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class CassetteMiss(httpx.TransportError):
+    """replay 모드에서 녹화되지 않은 요청"""
+
+
+def request_key(request: httpx.Request) -> str:
+    """
+    요청 해시 - 메서드, 경로, (비밀 제외) 쿼리, 정규화된 JSON 본문
+    호스트와 API 키는 제외하므로 실제 API에서 녹화한 카세트를 스텁/프록시 주소에서도 재생 가능
+    """
+    url = urlsplit(str(request.url))
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(url.query) if k not in _SECRET_PARAMS))
+    body = request.content
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        pass
+
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {url.path}?{query}\n".encode("utf-8"))
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class CassetteStore:
+    """
+    녹화된 요청/응답 저장소
+    - 디렉터리 안에 요청 해시별 JSON 파일 하나 (같은 요청의 여러 응답은 목록으로 저장)
+    - replay 시 전체를 메모리에 올려 디스크 I/O 없이 응답
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._entries: Optional[Dict[str, List[dict]]] = None
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self) -> Dict[str, List[dict]]:
+        """카세트 인덱스 로드 (본문은 bytes로 디코딩해 보관)"""
+        if self._entries is None:
+            entries: Dict[str, List[dict]] = {}
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if not name.endswith(".json"):
+                        continue
+                    with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                        records = json.load(f)
+                    for record in records:
+                        record["body"] = base64.b64decode(record["body"])
+                    entries[name[:-5]] = records
+            self._entries = entries
+        return self._entries
+
+    def next(self, key: str) -> Optional[dict]:
+        """같은 요청이 여러 번 녹화됐으면 순서대로 돌아가며 반환"""
+        records = self.load().get(key)
+        if not records:
+            return None
+        index = self._cursor.get(key, 0)
+        self._cursor[key] = index + 1
+        return records[index % len(records)]
+
+    def append(self, key: str, record: dict) -> None:
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            records = []
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    records = json.load(f)
+            records.append({**record, "body": base64.b64encode(record["body"]).decode("ascii")})
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(records, f)
+
+            if self._entries is not None:
+                self._entries.setdefault(key, []).append(record)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """실제 호출 결과를 카세트에 기록"""
+
+    def __init__(self, store: CassetteStore, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.store = store
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request)
+        started = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        latency = time.perf_counter() - started
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() in _RECORDED_HEADERS}
+        record = {
+            "method": request.method,
+            "url": str(request.url.copy_remove_param("key")),
+            "status": response.status_code,
+            "headers": headers,
+            "body": body,
+            "latency": latency,
+            "recorded_at": time.time(),
+        }
+        await asyncio.to_thread(self.store.append, key, record)
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _BODY_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    카세트에서 응답 재생
+    latency_scale: 녹화된 지연시간 배율 (1.0 = 원래대로, 0 = 즉시)
+    """
+
+    def __init__(self, store: CassetteStore, latency_scale: float = 1.0):
+        self.store = store
+        self.latency_scale = latency_scale
+        self.hits = 0
+        self.misses = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        record = self.store.next(request_key(request))
+        if record is None:
+            self.misses += 1
+            raise CassetteMiss(f"No cassette recorded for {request.method} {request.url.copy_remove_param('key')}", request=request)
+
+        self.hits += 1
+        if self.latency_scale > 0:
+            await asyncio.sleep(record["latency"] * self.latency_scale)
+        return httpx.Response(
+            record["status"],
+            headers=record["headers"],
+            content=record["body"],
+            request=request,
+        )
+
+
+_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=50)
+
+cassette_store = CassetteStore(settings.cassette_dir)
+_clients: Dict[int, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+_closing: Set[asyncio.Future] = set()
+
+
+def build_transport() -> Optional[httpx.AsyncBaseTransport]:
+    """TRANSPORT_MODE 설정에 따른 트랜스포트 (live면 None = httpx 기본)"""
+    if settings.transport_mode == "record":
+        return RecordingTransport(cassette_store, httpx.AsyncHTTPTransport(limits=_LIMITS))
+    if settings.transport_mode == "replay":
+        return ReplayTransport(cassette_store, settings.cassette_latency_scale)
+    return None
+
+
+async def _aclose_quietly(client: httpx.AsyncClient) -> None:
+    try:
+        await client.aclose()
+    except Exception as e:  # 루프가 이미 닫혀 연결이 끊긴 경우 등
+        print(f"HTTP client close error: {e}")
+
+
+def _discard_clients(current: asyncio.AbstractEventLoop) -> None:
+    """현재 루프가 아닌 (또는 닫힌) 클라이언트 제거 후 aclose - 살아 있는 루프면 그 루프에서"""
+    for loop_id, (loop, client) in list(_clients.items()):
+        if loop is current and not client.is_closed:
+            continue
+        del _clients[loop_id]
+        if client.is_closed:
+            continue
+        if loop is not current and loop.is_running():
+            asyncio.run_coroutine_threadsafe(_aclose_quietly(client), loop)
+        else:
+            task = current.create_task(_aclose_quietly(client))
+            _closing.add(task)
+            task.add_done_callback(_closing.discard)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    이벤트 루프별 공유 httpx 클라이언트
+    OCR 호출과 OpenAI SDK가 같은 커넥션 풀과 트랜스포트를 사용
+    """
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(id(loop))
+    if entry is None or entry[0] is not loop or entry[1].is_closed:
+        _discard_clients(loop)
+        client = httpx.AsyncClient(
+            transport=build_transport(),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=_LIMITS,
+        )
+        _clients[id(loop)] = (loop, client)
+        return client
+    return entry[1]
@@ -0,0 +1,281 @@
+"""Load Benchmark - End-to-end throughput and latency against local stub providers
+
+Usage:
+    cd backend
+    python -m benchmarks.load --requests 200 --concurrency 16
+    python -m benchmarks.load --latency lognormal:0.5,0.6 --error-rate 0.02 --compare benchmarks/results/<prev>.json
+    python -m benchmarks.load --replay ./data/cassettes --latency-scale 0.5
+
+서버(uvicorn)를 하위 프로세스로 띄우고 Settings를 스텁 서버로 향하게 한 뒤
+/api/ocr/upload, /api/analysis/analyze, /api/generate/problem 을 지정 동시성으로 호출
+결과(처리량, p50/p95/p99, 최대 RSS)는 benchmarks/results/ 에 JSON으로 저장
+"""
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import httpx
+
+from .stub_servers import StubServer, SAMPLE_TEXT
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+LONG_TEXT = " ".join([SAMPLE_TEXT] * 6)
+
+
+def _scenario_request(name: str, image: bytes) -> dict:
+    """시나리오별 httpx 요청 인자"""
+    if name == "ocr":
+        return {"method": "POST", "url": "/api/ocr/upload",
+                "files": {"file": ("page.png", image, "image/png")}}
+    if name == "analyze":
+        return {"method": "POST", "url": "/api/analysis/analyze", "json": {"text": SAMPLE_TEXT}}
+    if name == "generate":
+        return {"method": "POST", "url": "/api/generate/problem",
+                "json": {"text": SAMPLE_TEXT, "count": 2, "use_rag": False}}
+    if name == "generate_part7":
+        return {"method": "POST", "url": "/api/generate/problem",
+                "json": {"text": LONG_TEXT, "part": 7, "count": 2, "use_rag": False}}
+    if name == "generate_part7_set":
+        return {"method": "POST", "url": "/api/generate/problem",
+                "json": {"text": LONG_TEXT, "part": 7, "count": 4, "use_rag": False, "passage_set": True}}
+    if name == "generate_local":
+        return {"method": "POST", "url": "/api/generate/batch",
+                "json": {"texts": [SAMPLE_TEXT, LONG_TEXT] * 50, "count": 2}}
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _peak_rss_kb(pid: int) -> int:
+    """프로세스와 자식 프로세스들의 VmHWM 합계 (Linux /proc)"""
+    total = 0
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    except OSError:
+        pass
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                match = re.search(r"VmHWM:\s+(\d+) kB", f.read())
+                total += int(match.group(1)) if match else 0
+        except OSError:
+            pass
+    return total
+
+
+async def _run_scenario(client: httpx.AsyncClient, name: str, total: int, concurrency: int, image: bytes) -> dict:
+    """단일 시나리오 실행"""
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    request = _scenario_request(name, image)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                key = str(response.status_code)
+            except httpx.HTTPError as e:
+                key = type(e).__name__
+            elapsed = time.perf_counter() - start
+            statuses[key] = statuses.get(key, 0) + 1
+            if key == "200":
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(total)])
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0,
+        "status_codes": statuses,
+        "latency_seconds": {
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+        },
+    }
+
+
+def _fallback_counts(metrics_text: str) -> Dict[str, float]:
+    """/metrics 에서 시뮬레이션 폴백 카운트 추출 (스텁 대신 시뮬레이션이 쓰였는지 확인용)"""
+    counts: Dict[str, float] = {}
+    for line in metrics_text.splitlines():
+        match = re.match(r'parsey_simulation_fallbacks_total\{stage="([^"]+)".*\} ([\d.]+)', line)
+        if match:
+            counts[match.group(1)] = counts.get(match.group(1), 0) + float(match.group(2))
+    return counts
+
+
+def _start_app(port: int, stub_url: str, extra_env: Dict[str, str]) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_API_KEY": "stub-key",
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "GOOGLE_API_KEY": "stub-key",
+        "GOOGLE_VISION_ENDPOINT": f"{stub_url}/v1/images:annotate",
+        "LLM_PROVIDER": "openai",
+        "USE_RAG": "false",
+        "ADMISSION_ENABLED": "false",
+        # 시나리오마다 같은 텍스트를 반복하므로 유사 텍스트 캐시를 켜면 생성 대신 캐시 적중을 측정하게 됨
+        # (캐시 효과를 보려면 --env SEMANTIC_CACHE_ENABLED=true)
+        "SEMANTIC_CACHE_ENABLED": "false",
+        "DEBUG": "false",
+    })
+    env.update(extra_env)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def _wait_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.05)
+    raise RuntimeError("App server did not become ready")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    stub = StubServer(args.latency, args.error_rate).start()
+    port = _free_port()
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    if args.replay:
+        # 녹화된 실제 응답으로 재생 (카세트에 없는 요청은 실패 후 시뮬레이션 폴백으로 집계됨)
+        extra_env.update({
+            "TRANSPORT_MODE": "replay",
+            "CASSETTE_DIR": os.path.abspath(args.replay),
+            "CASSETTE_LATENCY_SCALE": str(args.latency_scale),
+        })
+    process = _start_app(port, stub.url, extra_env)
+    image = os.urandom(args.image_kb * 1024)
+
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120.0, limits=limits) as client:
+            ready = await _wait_ready(client)
+            scenarios = {}
+            for name in args.scenarios.split(","):
+                print(f"▶ {name}: {args.requests} requests @ concurrency {args.concurrency}")
+                scenarios[name] = await _run_scenario(client, name, args.requests, args.concurrency, image)
+                print(f"  {json.dumps(scenarios[name]['latency_seconds'])} {scenarios[name]['throughput_rps']} req/s")
+            fallbacks = _fallback_counts((await client.get("/metrics")).text)
+        peak_rss = _peak_rss_kb(process.pid)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        stub.stop()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "config": {
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "image_kb": args.image_kb,
+            "env": extra_env,
+        },
+        "startup_seconds": round(ready, 3),
+        "peak_rss_mb": round(peak_rss / 1024, 1),
+        "stub_requests": stub.requests,
+        "stub_errors": stub.errors,
+        "simulation_fallbacks": fallbacks,
+        "scenarios": scenarios,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, previous: dict) -> None:
+    """이전 결과 대비 변화율 출력"""
+    print(f"\nCompared with {previous.get('git_commit')} ({previous.get('timestamp')}):")
+    for name, result in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        rows = [("throughput_rps", result["throughput_rps"], before["throughput_rps"])]
+        for pct in ("p50", "p95", "p99"):
+            rows.append((pct, result["latency_seconds"][pct], before["latency_seconds"][pct]))
+        for key, now, then in rows:
+            if now is None or not then:
+                continue
+            print(f"  {name:16s} {key:15s} {then:10.4f} → {now:10.4f} ({(now - then) / then * 100:+.1f}%)")
+    if previous.get("peak_rss_mb"):
+        print(f"  peak_rss_mb {previous['peak_rss_mb']} → {current['peak_rss_mb']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end load benchmark with local stub providers")
+    parser.add_argument("--scenarios", default="ocr,analyze,generate")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", default="lognormal:0.3,0.5", help="fixed:S | uniform:A,B | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--image-kb", type=int, default=256)
+    parser.add_argument("--env", action="append", default=[], help="Extra app setting, e.g. --env LLM_MAX_CONCURRENCY=8")
+    parser.add_argument("--replay", help="Cassette directory to replay instead of stub responses")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Replay latency multiplier")
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", help="Previous result JSON to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"load_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\n📄 Results written to {path}")
+    if result["simulation_fallbacks"]:
+        print(f"⚠️  Simulation fallbacks observed: {result['simulation_fallbacks']}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""RAG ANN Benchmark - Recall/latency of partitioned vs filtered HNSW search on a synthetic pattern corpus
+
+Usage:
+    cd backend
+    python -m benchmarks.rag_ann                         # 100k 패턴, 기본 파라미터 격자
+    python -m benchmarks.rag_ann --size 20000 --m 16 --construction-ef 100 --search-ef 10,50
+
+ChromaDB가 내부에서 쓰는 hnswlib로 직접 측정 (pip install hnswlib)
+- filtered: 전체 패턴 인덱스 하나 + (part, type) 필터 (단일 컬렉션 + where 방식)
+- partitioned: (part, type)별 인덱스로 라우팅 (RAGService 파티션 컬렉션 방식)
+정답은 같은 파티션 안의 전수 L2 검색 결과, recall@k와 쿼리 지연시간(p50/p95)을 비교
+결과는 benchmarks/results/ 에 JSON으로 저장
+"""
+from typing import Dict, List, Tuple
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+from .load import RESULTS_DIR, _git_commit, _percentile
+
+PARTS = (5, 6, 7)
+TYPES = ("distractor", "structure", "passage", "question", "sentence_insertion", "difficulty")
+
+
+def synthetic_corpus(size: int, dim: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    문장 임베딩과 비슷한 군집 구조의 정규화 벡터
+    파티션마다 주제 중심 8개 + 주제별 저차원(24) 부분공간 변형 + 작은 등방성 잡음
+    파티션 크기는 치우치게 (Part 5 distractor가 가장 많음)
+
+    Returns:
+        (벡터 [size, dim], 파티션 번호 [size])
+    """
+    rng = np.random.default_rng(seed)
+    partitions = len(PARTS) * len(TYPES)
+    weights = 1.0 / np.arange(1, partitions + 1)
+    labels = rng.choice(partitions, size=size, p=weights / weights.sum())
+
+    centers = rng.normal(size=(partitions, 8, dim)).astype(np.float32)
+    bases = rng.normal(size=(partitions, 8, 24, dim)).astype(np.float32) / np.sqrt(24)
+    topics = rng.integers(0, 8, size=size)
+    vectors = centers[labels, topics]
+    for start in range(0, size, 10000):  # 부분공간 변형은 나눠서 (메모리)
+        rows = slice(start, start + 10000)
+        latent = rng.normal(size=(len(labels[rows]), 1, 24)).astype(np.float32)
+        vectors[rows] += (latent @ bases[labels[rows], topics[rows]])[:, 0]
+    vectors += 0.1 * rng.normal(size=(size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32), labels
+
+
+def _queries(vectors: np.ndarray, labels: np.ndarray, count: int, seed: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(vectors), size=count, replace=False)
+    queries = vectors[picked] + 0.1 * rng.normal(size=(count, vectors.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries.astype(np.float32), labels[picked]
+
+
+def _ground_truth(vectors, labels, queries, query_labels, k) -> List[set]:
+    truth = []
+    for query, label in zip(queries, query_labels):
+        rows = np.flatnonzero(labels == label)
+        distances = ((vectors[rows] - query) ** 2).sum(axis=1)
+        truth.append(set(rows[np.argsort(distances)[:k]].tolist()))
+    return truth
+
+
+def _build(hnswlib, vectors, ids, m, construction_ef):
+    index = hnswlib.Index(space="l2", dim=vectors.shape[1])
+    index.init_index(max_elements=max(1, len(ids)), ef_construction=construction_ef, M=m)
+    index.add_items(vectors, ids)
+    return index
+
+
+def _measure(search, queries, query_labels, truth, k) -> Dict:
+    latencies, hits = [], 0
+    for query, label, expected in zip(queries, query_labels, truth):
+        start = time.perf_counter()
+        found = search(query, int(label))
+        latencies.append(time.perf_counter() - start)
+        hits += len(expected & set(found))
+    latencies.sort()
+    return {
+        "recall": round(hits / (len(truth) * k), 4),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+    }
+
+
+def run(args) -> dict:
+    import hnswlib
+
+    vectors, labels = synthetic_corpus(args.size, args.dim)
+    queries, query_labels = _queries(vectors, labels, args.queries)
+    truth = _ground_truth(vectors, labels, queries, query_labels, args.k)
+    all_ids = np.arange(len(vectors))
+    partition_rows = {p: np.flatnonzero(labels == p) for p in np.unique(labels)}
+
+    results = []
+    for m in args.m:
+        for construction_ef in args.construction_ef:
+            start = time.perf_counter()
+            flat = _build(hnswlib, vectors, all_ids, m, construction_ef)
+            flat_build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            partitions = {p: _build(hnswlib, vectors[rows], rows, m, construction_ef) for p, rows in partition_rows.items()}
+            partitioned_build = time.perf_counter() - start
+
+            for search_ef in args.search_ef:
+                flat.set_ef(max(search_ef, args.k))
+                for index in partitions.values():
+                    index.set_ef(max(search_ef, args.k))
+
+                def filtered(query, label):
+                    found, _ = flat.knn_query(query, k=args.k, filter=lambda i: labels[i] == label)
+                    return found[0].tolist()
+
+                def partitioned(query, label):
+                    index = partitions[label]
+                    found, _ = index.knn_query(query, k=min(args.k, index.get_current_count()))
+                    return found[0].tolist()
+
+                row = {
+                    "m": m,
+                    "construction_ef": construction_ef,
+                    "search_ef": search_ef,
+                    "build_seconds": {"filtered": round(flat_build, 2), "partitioned": round(partitioned_build, 2)},
+                    "filtered": _measure(filtered, queries, query_labels, truth, args.k),
+                    "partitioned": _measure(partitioned, queries, query_labels, truth, args.k),
+                }
+                results.append(row)
+                print(
+                    f"  M={m:<3} cEF={construction_ef:<4} sEF={search_ef:<4} "
+                    f"filtered recall={row['filtered']['recall']:.3f} p50={row['filtered']['p50_ms']:.3f}ms | "
+                    f"partitioned recall={row['partitioned']['recall']:.3f} p50={row['partitioned']['p50_ms']:.3f}ms "
+                    f"p95={row['partitioned']['p95_ms']:.3f}ms"
+                )
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "config": {"size": args.size, "dim": args.dim, "queries": args.queries, "k": args.k},
+        "results": results,
+    }
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Partitioned vs filtered HNSW recall/latency benchmark")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384, help="all-MiniLM-L6-v2 (Chroma 기본 임베딩) 차원")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=3, help="search_patterns 기본 n_results")
+    parser.add_argument("--m", type=_ints, default=[8, 16, 32])
+    parser.add_argument("--construction-ef", type=_ints, default=[100, 200])
+    parser.add_argument("--search-ef", type=_ints, default=[10, 32, 64, 128])
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    print(f"▶ {args.size} synthetic patterns, dim {args.dim}, {args.queries} queries, k={args.k}")
+    result = run(args)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"rag_ann_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\n📄 Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Startup Benchmark - Import-time profile and cold-start budget check
+
+Usage:
+    cd backend
+    python -m benchmarks.startup                      # 콜드 스타트 3회 + import 프로파일
+    python -m benchmarks.startup --budget 1.5 --runs 5
+    python -m benchmarks.startup --env WARMUP_SERVICES=all
+
+콜드 스타트(프로세스 시작 → /health 200) 중앙값이 예산(STARTUP_BUDGET_SECONDS)을
+넘으면 종료 코드 1로 끝나므로 CI에서 회귀 검사로 사용 가능
+"""
+from typing import Dict, List, Tuple
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+
+from .load import BACKEND_DIR, RESULTS_DIR, _free_port, _peak_rss_kb, _git_commit
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_profile(target: str = "app.main", env: Dict[str, str] = None) -> List[Tuple[str, int, int, int]]:
+    """
+    python -X importtime 결과 파싱
+
+    Returns:
+        (모듈, self μs, cumulative μs, 깊이) 목록
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def summarize_imports(rows: List[Tuple[str, int, int, int]], top: int) -> dict:
+    """최상위 패키지별 self 시간 합계와 누적 시간 상위 모듈"""
+    by_package: Dict[str, int] = {}
+    for module, self_us, _, _ in rows:
+        root = module.split(".")[0]
+        by_package[root] = by_package.get(root, 0) + self_us
+    packages = sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    slowest = sorted(rows, key=lambda r: r[2], reverse=True)[:top]
+    return {
+        "total_ms": round(sum(r[1] for r in rows) / 1000, 1),
+        "packages_ms": {name: round(us / 1000, 1) for name, us in packages},
+        "slowest_cumulative_ms": {module: round(cum / 1000, 1) for module, _, cum, _ in slowest},
+    }
+
+
+def cold_start(env: Dict[str, str], timeout: float = 60.0) -> Tuple[float, float]:
+    """uvicorn 프로세스 시작부터 /health 200까지 걸린 시간(초)과 그 시점의 RSS(MB)"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while time.perf_counter() - started < timeout:
+                try:
+                    if client.get("/health").status_code == 200:
+                        elapsed = time.perf_counter() - started
+                        return elapsed, round(_peak_rss_kb(process.pid) / 1024, 1)
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+        raise RuntimeError("App server did not become ready")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark with import-time profile")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget", type=float, help="Seconds (default: STARTUP_BUDGET_SECONDS setting)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--env", action="append", default=[], help="Extra app setting, e.g. --env USE_RAG=false")
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.update(dict(item.split("=", 1) for item in args.env))
+
+    if args.budget is None:
+        sys.path.insert(0, BACKEND_DIR)
+        from app.config import Settings
+        args.budget = Settings().startup_budget_seconds
+
+    profile = summarize_imports(import_profile(env=env), args.top)
+    print(f"📦 import app.main: {profile['total_ms']} ms")
+    for name, ms in profile["packages_ms"].items():
+        print(f"  {name:30s} {ms:8.1f} ms (self)")
+    print("  slowest modules (cumulative):")
+    for module, ms in profile["slowest_cumulative_ms"].items():
+        print(f"  {module:50s} {ms:8.1f} ms")
+
+    runs = [cold_start(env) for _ in range(args.runs)]
+    median = statistics.median(r[0] for r in runs)
+    print(f"\n⏱️  cold start: median {median:.3f}s over {args.runs} runs (budget {args.budget}s)")
+
+    result = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "env": dict(item.split("=", 1) for item in args.env),
+        "budget_seconds": args.budget,
+        "cold_start_seconds": [round(r[0], 3) for r in runs],
+        "cold_start_median_seconds": round(median, 3),
+        "rss_after_start_mb": [r[1] for r in runs],
+        "imports": profile,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"startup_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"📄 Results written to {path}")
+
+    if median > args.budget:
+        print(f"❌ Cold start exceeds budget by {median - args.budget:.3f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Stub Servers - Local stand-ins for the OpenAI chat-completions and Vision annotate APIs
+
+네트워크 없이 벤치마크를 돌리기 위한 로컬 서버
+- 지연시간 분포: fixed:0.2 / uniform:0.1,0.5 / lognormal:0.3,0.5 (중앙값, sigma)
+- 오류율: 지정 비율만큼 429(Retry-After) 또는 500 반환
+"""
+from typing import Callable, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """지연시간 분포 문자열을 샘플러로 변환"""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda: random.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+SAMPLE_TEXT = (
+    "The quarterly sales report indicates a significant increase in revenue. "
+    "All employees are required to attend the mandatory training session. "
+    "The meeting has been postponed until further notice."
+)
+
+
+def _analysis_payload(text: str) -> dict:
+    words = [w.strip(".,!?\"") for w in text.split()]
+    return {
+        "pos_tags": [
+            {"word": w, "pos": "NOUN", "description": "Common noun used as the head of a phrase"}
+            for w in words if w
+        ],
+        "grammar_elements": [
+            {"type": "tense", "value": "Present Perfect", "explanation": "Describes a completed action relevant now"},
+            {"type": "voice", "value": "Passive Voice", "explanation": "The subject receives the action"},
+        ],
+        "sentence_structure": "Complex sentence with a subordinate clause",
+        "toeic_part": 5 if len(words) < 30 else 7,
+        "toeic_part_reason": "Length and structure match the part guidelines",
+        "summary": f"A business text of {len(words)} words.",
+    }
+
+
+def _problem_payload(part: int) -> dict:
+    payload = {
+        "question": "The project deadline _______ extended due to unforeseen circumstances.",
+        "choices": [
+            {"label": "A", "text": "was", "is_correct": True},
+            {"label": "B", "text": "were", "is_correct": False},
+            {"label": "C", "text": "is", "is_correct": False},
+            {"label": "D", "text": "be", "is_correct": False},
+        ],
+        "answer": "A",
+        "question_type": "grammar" if part == 5 else "reading comprehension",
+        "explanation": "The singular subject 'deadline' takes 'was'. " * 8,
+    }
+    if part != 5:
+        payload["passage"] = (SAMPLE_TEXT + " ") * 4
+    return payload
+
+
+def _set_payload(part: int, count: int, with_passage: bool) -> dict:
+    """세트 응답 - 지문 하나와 문항 count개 (문항마다 질문 문장이 다름)"""
+    questions = []
+    for i in range(count):
+        question = _problem_payload(5)
+        question.pop("passage", None)
+        if part == 6:
+            question["question"] = f"Which choice best fills blank [{i + 1}]?"
+            question["question_type"] = "context"
+        else:
+            question["question"] = f"What is indicated about item {i + 1} in the passage?"
+            question["question_type"] = "reading comprehension"
+        questions.append(question)
+    payload = {"questions": questions}
+    if with_passage:
+        blanks = " ".join(f"Blank [{i + 1}] _______." for i in range(count)) if part == 6 else ""
+        payload["passage"] = (SAMPLE_TEXT + " ") * 3 + blanks
+    return payload
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests += 1
+        time.sleep(self.server.latency())
+
+        if random.random() < self.server.error_rate:
+            self.server.errors += 1
+            if random.random() < 0.5:
+                self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                                {"Retry-After": "1"})
+            else:
+                self._send_json(500, {"error": {"message": "Internal error", "type": "server_error"}})
+            return
+
+        if self.path.endswith("/chat/completions"):
+            self._send_json(200, self._chat_completion(body))
+        elif self.path.split("?")[0].endswith("/images:annotate"):
+            self._send_json(200, {"responses": [{"textAnnotations": [{"description": SAMPLE_TEXT, "locale": "en"}]}]})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def _chat_completion(self, body: dict) -> dict:
+        messages = body.get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        system = messages[0]["content"] if messages else ""
+
+        if "linguist" in system:
+            match = re.search(r'Text: "(.*?)"\n', prompt, re.S)
+            content = _analysis_payload(match.group(1) if match else prompt)
+        else:
+            match = re.search(r"TOEIC Part (\d)", prompt)
+            part = int(match.group(1)) if match else 5
+            if '"questions"' in prompt:  # 세트 프롬프트 (지문을 주면 문항만)
+                count = re.search(r"\b(\d+) (?:blanks|different)", prompt)
+                content = _set_payload(part, int(count.group(1)) if count else 1, '"passage"' in prompt)
+            else:
+                content = _problem_payload(part)
+
+        completion = json.dumps(content)
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        completion_tokens = len(completion) // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": completion},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+class StubServer(ThreadingHTTPServer):
+    """OpenAI / Vision 스텁 서버 (백그라운드 스레드)"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, latency: str = "fixed:0.2", error_rate: float = 0.0, port: int = 0):
+        super().__init__(("127.0.0.1", port), _StubHandler)
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the OpenAI/Vision stub server")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default="lognormal:0.3,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubServer(args.latency, args.error_rate, args.port)
+    print(f"Stub server listening on {server.url} (OpenAI: {server.url}/v1, Vision: {server.url}/v1/images:annotate)")
+    server.serve_forever()
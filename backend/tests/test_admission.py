@@ -0,0 +1,135 @@
+"""Admission control - client rate limiting (429), endpoint shedding (503) and client identification"""
+import asyncio
+import importlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.services.metrics import metrics
+
+admission = importlib.import_module("app.middleware.admission")
+
+
+@pytest.fixture
+def configure(monkeypatch):
+    """어드미션 설정을 바꾼 새 컨트롤러"""
+
+    def make(**overrides) -> "admission.AdmissionController":
+        options = {
+            "admission_client_rate_per_minute": 60,
+            "admission_client_burst": 100,
+            "admission_endpoint_limits": "",
+            "admission_max_in_flight": 8,
+            "admission_max_queue": 8,
+            "admission_max_queue_wait": 5.0,
+            "admission_backend": "memory",
+        }
+        options.update(overrides)
+        for name, value in options.items():
+            monkeypatch.setattr(admission.settings, name, value)
+        return admission.AdmissionController()
+
+    return make
+
+
+def _app(controller, release: asyncio.Event = None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/work")
+    async def work():
+        if release is not None:
+            await release.wait()
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    app.add_middleware(admission.AdmissionControlMiddleware, controller=controller)
+    return app
+
+
+def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_client_over_burst_gets_429_with_retry_after(configure):
+    controller = configure(admission_client_burst=2)
+
+    async def run():
+        async with _client(_app(controller)) as client:
+            return [await client.get("/api/work") for _ in range(3)] + [await client.get("/health")]
+
+    first, second, limited, health = asyncio.run(run())
+    assert (first.status_code, second.status_code) == (200, 200)
+    assert limited.status_code == 429 and int(limited.headers["retry-after"]) >= 1
+    assert health.status_code == 200  # /api/ 밖의 경로는 제한하지 않음
+    assert controller.rate_limited == 1
+
+
+def test_full_gate_sheds_with_503(configure):
+    controller = configure(admission_endpoint_limits="/api/work=1", admission_max_queue=0)
+    before = metrics.admission_shed.value(path="/api/work")
+
+    async def run():
+        release = asyncio.Event()
+        async with _client(_app(controller, release)) as client:
+            running = asyncio.create_task(client.get("/api/work"))
+            while controller.gate_for("/api/work").in_flight == 0:
+                await asyncio.sleep(0.01)
+            shed = await client.get("/api/work")
+            release.set()
+            return await running, shed
+
+    ok, shed = asyncio.run(run())
+    assert ok.status_code == 200
+    assert shed.status_code == 503 and "retry-after" in shed.headers
+    assert metrics.admission_shed.value(path="/api/work") == before + 1
+
+
+def test_queued_request_gets_the_slot_when_one_is_released(configure):
+    controller = configure(admission_endpoint_limits="/api/work=1", admission_max_queue=4)
+
+    async def run():
+        release = asyncio.Event()
+        async with _client(_app(controller, release)) as client:
+            requests = [asyncio.create_task(client.get("/api/work")) for _ in range(3)]
+            gate = controller.gate_for("/api/work")
+            while len(gate._queue) < 2:
+                await asyncio.sleep(0.01)
+            assert gate.in_flight == 1
+            release.set()
+            return await asyncio.gather(*requests), gate
+
+    responses, gate = asyncio.run(run())
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert gate.in_flight == 0 and gate.shed == 0
+
+
+def test_unconfigured_paths_share_one_default_gate(configure):
+    controller = configure(admission_endpoint_limits="/api/work=2")
+    assert controller.gate_for("/api/work").max_in_flight == 2
+    assert controller.gate_for("/api/a") is controller.gate_for("/api/b")
+    assert set(controller.stats()["endpoints"]) == {"/api/work", admission.DEFAULT_GATE}
+
+
+def test_forwarded_for_is_used_only_from_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(admission, "_TRUSTED_PROXIES", admission._parse_networks("10.0.0.0/8"))
+    headers = [(b"x-forwarded-for", b"6.6.6.6, 1.2.3.4, 10.0.0.2")]
+
+    # 클라이언트가 붙인 앞쪽 항목(6.6.6.6)은 무시하고 신뢰하는 프록시를 건너뛴 첫 주소
+    assert admission._client_key({"client": ("10.0.0.5", 1), "headers": headers}) == "1.2.3.4"
+    assert admission._client_key({"client": ("8.8.8.8", 1), "headers": headers}) == "8.8.8.8"
+    assert admission._client_key({"client": ("10.0.0.5", 1), "headers": []}) == "10.0.0.5"
+
+
+def test_sqlite_backend_limits_and_expires_idle_buckets(tmp_path):
+    backend = admission.SQLiteRateLimitBackend(str(tmp_path / "admission.sqlite3"))
+    assert [backend.take("a", 60, 2) > 0 for _ in range(3)] == [False, False, True]
+
+    backend._conn.execute("INSERT INTO buckets (key, tokens, updated) VALUES ('idle', 0, 0)")
+    backend._pruned_at = 0.0
+    backend.take("b", 60, 2)
+    keys = {key for (key,) in backend._conn.execute("SELECT key FROM buckets")}
+    assert keys == {"a", "b"}
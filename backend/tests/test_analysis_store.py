@@ -0,0 +1,63 @@
+"""Analysis store - reuse by analysis_id, text mismatch, expiry and LRU eviction"""
+import importlib
+
+from app.schemas import AnalysisResponse, ProblemGenerateRequest
+from app.services.analysis_store import AnalysisStore
+
+problem_generator = importlib.import_module("app.services.problem_generator")
+
+
+def _analysis(text: str) -> AnalysisResponse:
+    return AnalysisResponse(original_text=text, toeic_part=5)
+
+
+def test_stored_analysis_is_returned_only_for_the_same_text():
+    store = AnalysisStore(ttl_seconds=60, max_entries=10)
+    analysis_id = store.put(_analysis("The report was submitted."))
+
+    assert store.get(analysis_id) is not None
+    assert store.get(analysis_id, text="The report was submitted.").toeic_part == 5
+    assert store.get(analysis_id, text="The report was rejected.") is None
+    assert store.get("unknown") is None
+
+
+def test_expired_entries_are_dropped_on_read():
+    store = AnalysisStore(ttl_seconds=-1, max_entries=10)
+    analysis_id = store.put(_analysis("text"))
+    assert store.get(analysis_id) is None
+    assert len(store) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    store = AnalysisStore(ttl_seconds=60, max_entries=2)
+    first = store.put(_analysis("first"))
+    second = store.put(_analysis("second"))
+    store.get(first)  # 최근 사용 → 두 번째가 가장 오래됨
+    third = store.put(_analysis("third"))
+
+    assert store.get(second) is None
+    assert store.get(first) is not None and store.get(third) is not None
+
+
+def test_generator_prefers_inline_analysis_then_stored_id(monkeypatch):
+    store = AnalysisStore(ttl_seconds=60, max_entries=10)
+    monkeypatch.setattr(problem_generator, "analysis_store", store)
+    generator = problem_generator.ProblemGenerator()
+    text = "The report was submitted."
+    stored = _analysis(text)
+    analysis_id = store.put(stored)
+
+    inline = _analysis(text)
+    request = ProblemGenerateRequest(text=text, analysis=inline, analysis_id=analysis_id)
+    assert generator._reuse_analysis(request) is inline
+    assert generator._reuse_analysis(ProblemGenerateRequest(text=text, analysis_id=analysis_id)) is stored
+
+
+def test_generator_ignores_analysis_of_a_different_text(monkeypatch):
+    store = AnalysisStore(ttl_seconds=60, max_entries=10)
+    monkeypatch.setattr(problem_generator, "analysis_store", store)
+    generator = problem_generator.ProblemGenerator()
+    analysis_id = store.put(_analysis("Old text."))
+
+    request = ProblemGenerateRequest(text="New text.", analysis=_analysis("Old text."), analysis_id=analysis_id)
+    assert generator._reuse_analysis(request) is None  # 호출 측에서 재분석
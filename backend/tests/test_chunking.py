@@ -0,0 +1,77 @@
+"""Text chunking - paragraph/sentence boundaries, offsets and merging chunk analyses"""
+from app.schemas import AnalysisResponse, GrammarElement, POSTag, TextChunk
+from app.services.chunking import merge_analyses, split_text
+
+
+def _texts(text: str, max_chars: int) -> list:
+    return [text[c.start:c.end] for c in split_text(text, max_chars)]
+
+
+def test_short_text_is_a_single_chunk():
+    chunks = split_text("One sentence.", 100)
+    assert [(c.index, c.start, c.end) for c in chunks] == [(0, 0, 13)]
+
+
+def test_chunks_cover_the_text_exactly_and_respect_max_chars():
+    text = ("The meeting was moved to Friday. " * 8 + "\n\n") * 5 + "Thank you."
+    chunks = split_text(text, 300)
+
+    assert "".join(text[c.start:c.end] for c in chunks) == text
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+    assert all(c.end - c.start <= 300 for c in chunks)
+    assert all(a.end == b.start for a, b in zip(chunks, chunks[1:]))
+
+
+def test_paragraph_is_kept_whole_when_it_fits():
+    first = "First paragraph has two sentences. It ends here.\n\n"
+    second = "Second paragraph. " * 3
+    assert _texts(first + second, len(first) + 5) == [first, second]
+
+
+def test_long_paragraph_splits_after_sentence_terminators_and_quotes():
+    text = 'He said "We are ready." Then he left! Did she stay? Yes.'
+    chunks = _texts(text, 25)
+
+    assert chunks[0] == 'He said "We are ready." '  # 닫는 따옴표까지 앞 조각
+    assert all(chunk.rstrip().rstrip('"')[-1] in ".!?" for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_sentence_longer_than_max_is_cut_at_spaces_or_hard_cut():
+    words = _texts("alpha beta gamma delta epsilon", 12)
+    assert all(len(chunk) <= 12 for chunk in words)
+    assert "".join(words) == "alpha beta gamma delta epsilon"
+
+    assert _texts("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]  # 공백이 없으면 길이로 자름
+
+
+def test_merge_deduplicates_and_takes_highest_part():
+    text = "a\n\nb"
+    chunks = [TextChunk(index=0, start=0, end=3), TextChunk(index=1, start=3, end=4)]
+    results = [
+        AnalysisResponse(
+            original_text="a",
+            pos_tags=[POSTag(word="Report", pos="NOUN", description="")],
+            grammar_elements=[GrammarElement(type="Tense", value="Past", explanation="")],
+            sentence_structure="simple",
+            toeic_part=5,
+            toeic_part_reason="short",
+            summary="first",
+        ),
+        AnalysisResponse(
+            original_text="b",
+            pos_tags=[POSTag(word="report", pos="NOUN", description=""), POSTag(word="report", pos="VERB", description="")],
+            grammar_elements=[GrammarElement(type="tense", value="past", explanation="")],
+            sentence_structure="simple",
+            toeic_part=7,
+            toeic_part_reason="passage",
+        ),
+    ]
+    merged = merge_analyses(text, chunks, results)
+
+    assert [(t.word, t.pos) for t in merged.pos_tags] == [("Report", "NOUN"), ("report", "VERB")]
+    assert len(merged.grammar_elements) == 1
+    assert merged.toeic_part == 7
+    assert merged.toeic_part_reason == "passage (2 chunks)"
+    assert merged.summary == "first"
+    assert [c.toeic_part for c in merged.chunks] == [5, 7]
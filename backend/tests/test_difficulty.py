@@ -0,0 +1,69 @@
+"""Difficulty scorer - word levels, score ordering, banding and the explicit-difficulty check"""
+import importlib
+
+import pytest
+
+from app.services.difficulty import RARE_LEVEL, DifficultyScorer
+
+difficulty = importlib.import_module("app.services.difficulty")
+problem_generator = importlib.import_module("app.services.problem_generator")
+
+EASY = "We will meet at the office on Monday."
+HARD = (
+    "Notwithstanding the unprecedented fluctuations in commodity valuations, the consortium's fiduciary "
+    "obligations, which were delineated comprehensively in the memorandum, necessitated an immediate "
+    "reassessment of its procurement methodology although stakeholders remained ambivalent."
+)
+
+
+@pytest.fixture(scope="module")
+def scorer() -> DifficultyScorer:
+    return DifficultyScorer()
+
+
+def test_inflected_words_resolve_to_their_base_level(scorer):
+    assert scorer.word_level("running") == scorer.word_level("run")
+    assert scorer.word_level("studies") == scorer.word_level("study")
+    assert scorer.word_level("xyzzyq") == RARE_LEVEL
+
+
+def test_unknown_capitalised_words_are_treated_as_names(scorer):
+    # 고유명사는 어휘 특징에서 제외 → 사람 이름만 바뀐 문장은 같은 점수
+    assert scorer.score("Ms. Brightwater will meet the team on Monday.") == scorer.score(
+        "Ms. Kim will meet the team on Monday."
+    )
+
+
+def test_harder_text_scores_higher_and_lands_in_a_higher_band(scorer):
+    easy, hard = scorer.score(EASY), scorer.score(HARD)
+    assert 0.0 <= easy < hard <= 1.0
+    assert (scorer.band(easy), scorer.band(hard)) == ("easy", "hard")
+
+
+@pytest.mark.parametrize("score, band", [(0.0, "easy"), (0.349, "easy"), (0.35, "medium"), (0.599, "medium"), (0.6, "hard")])
+def test_band_edges(scorer, score, band):
+    assert scorer.band(score) == band
+
+
+def test_deviation_is_signed_and_allows_tolerance(scorer, monkeypatch):
+    monkeypatch.setattr(difficulty.settings, "difficulty_tolerance", 0.05)
+    assert scorer.deviation(0.5, "medium") == 0
+    assert scorer.deviation(0.38, "easy") == 0  # 경계 + 허용 오차 안
+    assert scorer.deviation(0.5, "easy") == pytest.approx(0.1)
+    assert scorer.deviation(0.2, "hard") == pytest.approx(-0.35)
+    assert scorer.deviation(0.9, "unknown") == pytest.approx(0.25)  # 모르는 난이도는 medium
+
+
+def test_difficulty_is_enforced_only_when_the_request_sets_it(monkeypatch):
+    monkeypatch.setattr(problem_generator.settings, "difficulty_check", True)
+    checks = problem_generator.ProblemGenerator._checks_difficulty
+
+    assert not checks("hard")  # 요청에 없던 기본/추정 난이도
+    token = problem_generator._explicit_difficulty.set(True)
+    try:
+        assert checks("hard")
+        assert not checks(None)
+        monkeypatch.setattr(problem_generator.settings, "difficulty_check", False)
+        assert not checks("hard")
+    finally:
+        problem_generator._explicit_difficulty.reset(token)
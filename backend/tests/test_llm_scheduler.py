@@ -0,0 +1,121 @@
+"""LLM scheduler - priority order, bulk reserve, AIMD concurrency and token-bucket clamping"""
+import asyncio
+import time
+
+from app.services.llm_scheduler import LLMScheduler, PRIORITY_BULK, PRIORITY_INTERACTIVE
+from app.services.rate_limit import TokenBucket
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def _scheduler(**overrides) -> LLMScheduler:
+    options = {"requests_per_minute": 1000, "tokens_per_minute": 1_000_000, "max_concurrency": 1}
+    options.update(overrides)
+    return LLMScheduler(**options)
+
+
+def test_interactive_waiter_is_dispatched_before_earlier_bulk_waiter():
+    async def run():
+        scheduler = _scheduler()
+        held = await scheduler.acquire(10, PRIORITY_INTERACTIVE)
+        order = []
+
+        async def call(priority):
+            ticket = await scheduler.acquire(10, priority)
+            order.append(priority)
+            scheduler.release(ticket)
+
+        bulk = asyncio.create_task(call(PRIORITY_BULK))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call(PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["waiting"] == {PRIORITY_INTERACTIVE: 1, PRIORITY_BULK: 1}
+
+        scheduler.release(held)
+        await asyncio.gather(bulk, interactive)
+        return order
+
+    assert asyncio.run(run()) == [PRIORITY_INTERACTIVE, PRIORITY_BULK]
+
+
+def test_bulk_waits_for_reserved_capacity_while_interactive_proceeds():
+    async def run():
+        scheduler = _scheduler(requests_per_minute=10, max_concurrency=4, bulk_reserve_ratio=0.2)
+        scheduler._rpm.tokens = 2.5  # 예비 용량(2)은 남아 있지만 bulk에 필요한 3개에는 모자람
+        ticket = await asyncio.wait_for(scheduler.acquire(10, PRIORITY_INTERACTIVE), 0.5)
+        scheduler.release(ticket)
+        try:
+            await asyncio.wait_for(scheduler.acquire(10, PRIORITY_BULK), 0.1)
+        except asyncio.TimeoutError:
+            return True
+        return False
+
+    assert asyncio.run(run())
+
+
+def test_bulk_reserve_never_exceeds_bucket_capacity():
+    async def run():
+        # 용량 1짜리 버킷에서 1 + 예비 0.2를 기다리면 영원히 채워지지 않음 → 용량까지로 제한
+        scheduler = _scheduler(requests_per_minute=1, bulk_reserve_ratio=0.2)
+        ticket = await asyncio.wait_for(scheduler.acquire(10, PRIORITY_BULK), 0.5)
+        scheduler.release(ticket)
+
+    asyncio.run(run())
+    assert TokenBucket(100).time_until(200, reserve=20) == 0.0
+
+
+def test_token_bucket_wait_covers_missing_tokens_and_refills():
+    bucket = TokenBucket(60)  # 초당 1
+    bucket.consume(60)
+    assert 9.9 < bucket.time_until(10) <= 10.0
+    bucket.adjust(5)  # 추정치보다 적게 썼으면 반환
+    assert 4.9 < bucket.time_until(10) <= 5.0
+
+
+def test_rate_limit_halves_concurrency_and_pauses_then_success_grows_it_back():
+    async def run():
+        scheduler = _scheduler(max_concurrency=4)
+        ticket = await scheduler.acquire(10)
+        scheduler.release(ticket, error=RateLimited())
+        stats = scheduler.stats()
+        assert stats["concurrency_limit"] == 2 and stats["rate_limited"] == 1
+        assert scheduler.overloaded(max_waiting=10)  # Retry-After 동안 일시 정지
+
+        scheduler._paused_until = 0.0
+        for _ in range(3):
+            scheduler.release(await scheduler.acquire(10))
+        return scheduler._limit
+
+    limit = asyncio.run(run())
+    assert 3.0 < limit < 4.0  # 성공마다 1/limit씩 증가
+
+
+def test_simultaneous_rate_limits_back_off_only_once():
+    async def run():
+        scheduler = _scheduler(max_concurrency=8)
+        tickets = [await scheduler.acquire(10) for _ in range(3)]
+        for ticket in tickets:
+            scheduler.release(ticket, error=RateLimited())
+        return scheduler.stats()["concurrency_limit"]
+
+    assert asyncio.run(run()) == 4
+
+
+def test_waiter_cancelled_by_timeout_is_removed_from_queue():
+    async def run():
+        scheduler = _scheduler()
+        held = await scheduler.acquire(10)
+        try:
+            await asyncio.wait_for(scheduler.acquire(10), 0.05)
+        except asyncio.TimeoutError:
+            pass
+        scheduler.release(held)
+        started = time.monotonic()
+        scheduler.release(await asyncio.wait_for(scheduler.acquire(10), 0.5))
+        return scheduler.stats(), time.monotonic() - started
+
+    stats, elapsed = asyncio.run(run())
+    assert stats["in_flight"] == 0 and sum(stats["waiting"].values()) == 0
+    assert elapsed < 0.5
@@ -0,0 +1,71 @@
+"""Local generator - deterministic output, sentence splitting, Part 6 blanks and Part 7 set counts"""
+import importlib
+
+from app.schemas import ProblemGenerateRequest
+from app.services.local_generator import LocalGenerator, _sentences
+
+problem_generator = importlib.import_module("app.services.problem_generator")
+
+MEMO = (
+    "The new office will open on Monday, March 3. "
+    "Mr. Kim will manage the team and review the reports carefully. "
+    "Employees must submit their requests by 5:00 p.m. on Friday. "
+    "The budget increased by 15% this year."
+)
+ONE_SENTENCE = "The manager quickly reviewed the quarterly reports before the meeting."
+
+
+def _dump(problems) -> list:
+    return [p.model_dump() for p in problems]
+
+
+def test_same_input_gives_the_same_problems():
+    first, second = LocalGenerator(), LocalGenerator()
+    for part in (5, 6, 7):
+        assert _dump(first.generate(MEMO, part, count=3)) == _dump(second.generate(MEMO, part, count=3))
+    assert first.generate_set(MEMO, 7, count=4)[0] == second.generate_set(MEMO, 7, count=4)[0]
+
+
+def test_start_selects_different_targets():
+    generator = LocalGenerator()
+    questions = [p.question for p in generator.generate(MEMO, 5, count=3)]
+    assert len(set(questions)) == 3
+    assert generator.generate(MEMO, 5, start=1)[0].question == questions[1]
+
+
+def test_abbreviations_do_not_end_sentences():
+    sentences = _sentences(MEMO)
+    assert len(sentences) == 4
+    assert sentences[1].startswith("Mr. Kim")
+
+
+def test_part6_set_places_several_blanks_in_a_sentence_when_sentences_run_out():
+    passage, problems = LocalGenerator().generate_set(MEMO, 6, count=6)
+
+    assert len(problems) == 6
+    assert [f"[{i}]" in passage for i in range(1, 7)] == [True] * 6
+    assert passage.index("[2]") < passage.index("[3]") < passage.index("Employees")  # 같은 문장에 두 개
+    assert all(p.passage is None and p.answer in "ABCD" for p in problems)
+
+
+def test_part7_set_does_not_repeat_a_question_for_the_same_detail():
+    passage, problems = LocalGenerator().generate_set(MEMO, 7, count=20)
+    keys = [(p.question, p.explanation) for p in problems]
+
+    assert 0 < len(problems) < 20  # 조합이 모자라면 요청보다 적음
+    assert len(set(keys)) == len(keys)
+
+
+def test_short_text_set_is_flagged_partial():
+    request = ProblemGenerateRequest(text=ONE_SENTENCE, part=6, count=4, passage_set=True, engine="local")
+    response = problem_generator.ProblemGenerator()._generate_local(request, reason="requested")
+
+    assert response.engine == "local"
+    assert 0 < len(response.problems) < 4
+    assert response.partial
+
+
+def test_full_set_is_not_partial():
+    request = ProblemGenerateRequest(text=MEMO, part=6, count=4, passage_set=True, engine="local")
+    response = problem_generator.ProblemGenerator()._generate_local(request, reason="requested")
+    assert len(response.problems) == 4 and not response.partial
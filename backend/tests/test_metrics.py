@@ -0,0 +1,63 @@
+"""Metrics - Prometheus text rendering of counters, histograms and gauges"""
+import pytest
+
+from app.services.metrics import Counter, Gauge, Histogram, ParseyMetrics, _Metric
+
+
+def test_counter_renders_labels_in_declared_order_and_escapes_values():
+    counter = Counter("parsey_test_total", "Test counter", ("stage", "model"))
+    counter.inc(model='gpt "mini"\n', stage="parse")
+    counter.inc(2, stage="parse", model='gpt "mini"\n')
+
+    assert counter.render() == [
+        "# HELP parsey_test_total Test counter",
+        "# TYPE parsey_test_total counter",
+        'parsey_test_total{stage="parse",model="gpt \\"mini\\"\\n"} 3',
+    ]
+
+
+def test_counter_without_labels_and_fractional_values():
+    counter = Counter("parsey_plain_total", "Plain")
+    counter.inc(0.5)
+    assert counter.render()[-1] == "parsey_plain_total 0.5"
+    assert counter.value() == 0.5
+
+
+def test_histogram_buckets_are_cumulative_with_inf_sum_and_count():
+    histogram = Histogram("parsey_test_seconds", "Test histogram", ("stage",), buckets=(0.5, 0.1))
+    for value in (0.05, 0.1, 0.3, 2.0):
+        histogram.observe(value, stage="ocr")
+
+    assert histogram.render()[2:] == [
+        'parsey_test_seconds_bucket{stage="ocr",le="0.1"} 2',  # 경계값은 해당 버킷에 포함 (le)
+        'parsey_test_seconds_bucket{stage="ocr",le="0.5"} 3',
+        'parsey_test_seconds_bucket{stage="ocr",le="+Inf"} 4',
+        'parsey_test_seconds_sum{stage="ocr"} 2.45',
+        'parsey_test_seconds_count{stage="ocr"} 4',
+    ]
+
+
+def test_gauge_reads_callback_at_render_and_survives_callback_errors():
+    values = {"a": 1}
+    gauge = Gauge("parsey_test_gauge", "Test gauge", ("name",), collect=lambda: [({"name": "a"}, values["a"])])
+    values["a"] = 7
+    assert gauge.render()[-1] == 'parsey_test_gauge{name="a"} 7'
+
+    broken = Gauge("parsey_broken", "Broken", collect=lambda: 1 / 0)
+    assert broken.render() == ["# HELP parsey_broken Broken", "# TYPE parsey_broken gauge"]
+
+
+def test_registry_render_ends_with_newline_and_counts_llm_usage():
+    registry = ParseyMetrics()
+    usage = type("Usage", (), {"prompt_tokens": 120, "completion_tokens": 30, "prompt_tokens_details": None})()
+    registry.observe_llm_usage(usage, provider="openai", model="gpt-4o-mini", part=5)
+
+    text = registry.render()
+    assert text.endswith("\n")
+    assert 'parsey_llm_tokens_total{provider="openai",model="gpt-4o-mini",part="5",direction="in"} 120' in text
+    assert 'parsey_llm_tokens_total{provider="openai",model="gpt-4o-mini",part="5",direction="out"} 30' in text
+
+
+def test_metric_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric("parsey_abstract", "Abstract")
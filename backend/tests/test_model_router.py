@@ -0,0 +1,49 @@
+"""Model router - small/large selection by input complexity and escalation accounting"""
+from app.services.metrics import metrics
+from app.services.model_router import ModelRouter
+
+SIMPLE = "The meeting starts at nine."
+NESTED = "Although the report, which the manager who joined last week wrote, was late, we approved it because it was accurate."
+
+
+def _router(small_model="small", **overrides) -> ModelRouter:
+    options = {"max_words": 20, "max_sentence_words": 30.0, "max_clauses": 1.5}
+    options.update(overrides)
+    return ModelRouter(small_model, "large", **options)
+
+
+def test_select_routes_by_length_and_structure():
+    router = _router()
+    assert router.select(SIMPLE) == ("small", "simple")
+    assert router.select(" ".join(["word"] * 21)) == ("large", "length")
+    assert router.select(NESTED) == ("large", "structure")  # 종속절 많음
+    assert router.select(" ".join(["word"] * 15) + ".") == ("small", "simple")
+    assert _router(max_sentence_words=10.0).select(" ".join(["word"] * 15) + ".") == ("large", "structure")
+
+
+def test_cascade_is_disabled_without_a_distinct_small_model():
+    for router in (_router(small_model=None), _router(small_model="large")):
+        assert not router.enabled
+        assert router.select(SIMPLE) == ("large", "disabled")
+        assert list(router.cascade(SIMPLE, "analyze")) == ["large"]
+        assert router.stats()["simple"] == 0  # 라우팅 기록 없음
+
+
+def test_large_model_is_yielded_only_when_the_small_attempt_is_rejected():
+    router = _router()
+    assert next(router.cascade(SIMPLE, "analyze")) == "small"  # 첫 시도 성공 → 승격 없음
+    assert router.stats()["escalated"] == 0
+
+    before = metrics.llm_routes.value(stage="analyze", model="large", reason="escalated")
+    assert list(router.cascade(SIMPLE, "analyze")) == ["small", "large"]
+    assert metrics.llm_routes.value(stage="analyze", model="large", reason="escalated") == before + 1
+
+    stats = router.stats()
+    assert (stats["simple"], stats["escalated"], stats["escalation_rate"]) == (2, 1, 0.5)
+
+
+def test_complex_input_goes_straight_to_the_large_model_without_escalation():
+    router = _router()
+    assert list(router.cascade(NESTED, "generate_problem")) == ["large"]
+    stats = router.stats()
+    assert (stats["structure"], stats["escalated"], stats["escalation_rate"]) == (1, 0, 0.0)
@@ -0,0 +1,69 @@
+"""Semantic cache - substitution safety and hit accounting"""
+from app.schemas import Choice, Problem, ProblemGenerateRequest, ProblemGenerateResponse
+from app.services.semantic_cache import SemanticCache, substitutions
+
+SOURCE = "Employees must submit their reports by Friday."
+
+
+def _problem(question: str, choices: list) -> Problem:
+    return Problem(
+        part=5,
+        question_type="grammar",
+        question=question,
+        choices=[Choice(label=label, text=text, is_correct=label == "A") for label, text in zip("ABCD", choices)],
+        answer="A",
+        explanation="",
+        difficulty="medium",
+    )
+
+
+def _cache_with(problem: Problem, max_hits: int = 0) -> SemanticCache:
+    cache = SemanticCache(threshold=0.9, ttl_seconds=60, max_entries=10, max_hits=max_hits)
+    request = ProblemGenerateRequest(text=SOURCE, part=5)
+    cache.put(request, ProblemGenerateResponse(success=True, problems=[problem], source_text=SOURCE, detected_part=5))
+    return cache
+
+
+def test_inserted_negation_in_quoted_text_is_a_miss():
+    problem = _problem("Employees must submit _______ reports by Friday.", ["their", "there", "they", "them"])
+    assert substitutions(SOURCE, "Employees must not submit their reports by Friday.", problem.question, "their there they them") is None
+    assert _cache_with(problem).get(ProblemGenerateRequest(text="Employees must not submit their reports by Friday.", part=5)) is None
+
+
+def test_replaced_word_in_quoted_text_is_a_miss():
+    body, choices = "Please _______ two new staff by Friday. The manager will hire them.", "hire hired hiring hires"
+    assert substitutions("Please hire two new staff by Friday.", "Please fire two new staff by Friday.", body, choices) is None
+
+
+def test_name_and_number_swaps_are_adapted():
+    mapping = substitutions(
+        "Dear Ms. Kim, your order of 25 chairs shipped.",
+        "Dear Ms. Lee, your order of 40 chairs shipped.",
+        "How many chairs did Ms. Kim order?",
+        "25 15 30 50",
+    )
+    assert mapping == {"Kim": "Lee", "25": "40"}
+
+
+def test_changes_outside_quoted_text_are_ignored():
+    mapping = substitutions(
+        "Dear Ms. Kim, your offlce order shipped today.",
+        "Dear Ms. Kim, your office order shipped today.",
+        "Who placed the order?",
+        "Ms. Kim",
+    )
+    assert mapping == {}
+
+
+def test_rejected_lookups_do_not_use_up_entry():
+    problem = _problem("Employees must submit _______ reports by Friday.", ["their", "there", "they", "them"])
+    cache = _cache_with(problem, max_hits=2)
+    rejected = ProblemGenerateRequest(text="Employees must not submit their reports by Friday.", part=5)
+    for _ in range(3):
+        assert cache.get(rejected) is None
+    assert len(cache) == 1
+
+    same = ProblemGenerateRequest(text="Employees  must submit their reports by Friday.", part=5)
+    assert cache.get(same).cached
+    assert cache.get(same).cached
+    assert len(cache) == 0  # max_hits번 재사용 후 제거
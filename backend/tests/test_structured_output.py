@@ -0,0 +1,124 @@
+"""Structured output - JSON repair, model validation outcomes and problem defect detection"""
+import json
+
+import pytest
+
+from app.schemas import ProblemOutput, ProblemSetOutput
+from app.services.structured_output import (
+    OutputParseError,
+    fix_problem_data,
+    fix_set_data,
+    parse_model_output,
+    problem_defects,
+    repair_json,
+)
+
+CHOICES = [
+    {"label": "A", "text": "was", "is_correct": False},
+    {"label": "B", "text": "were", "is_correct": True},
+    {"label": "C", "text": "is", "is_correct": False},
+    {"label": "D", "text": "be", "is_correct": False},
+]
+
+
+def _problem(**overrides) -> dict:
+    data = {
+        "question_type": "grammar",
+        "question": "The reports ___ submitted yesterday.",
+        "choices": [dict(c) for c in CHOICES],
+        "answer": "B",
+        "explanation": "Plural subject in the past.",
+        "difficulty": "easy",
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('Here is the result: {"a": [1, 2,],} Hope this helps.', {"a": [1, 2]}),
+    ('{"a": "unfinished', {"a": "unfinished"}),
+    ('{"a": "ends with escape\\', {"a": "ends with escape"}),
+    ('{"a": [1, {"b": 2', {"a": [1, {"b": 2}]}),
+    ('{"a": 1, "b":', {"a": 1, "b": None}),
+    ('{"a": 1, "b"', {"a": 1, "b": None}),
+    ('{"a": 1,', {"a": 1}),
+    ('{"a": "brace } in string", "b": 2}', {"a": "brace } in string", "b": 2}),
+])
+def test_repair_json_recovers_common_llm_defects(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+def test_repair_json_without_object_raises():
+    with pytest.raises(OutputParseError):
+        repair_json("I cannot help with that.")
+
+
+def test_valid_output_is_still_reconciled_by_fix():
+    # 스키마는 맞지만 answer와 is_correct가 어긋난 출력 → answer 기준으로 맞춤
+    content = json.dumps(_problem(answer="(C)"))
+    result, outcome = parse_model_output(ProblemOutput, content, fix=fix_problem_data)
+
+    assert outcome == "valid"
+    assert result.answer == "C"
+    assert [c.label for c in result.choices if c.is_correct] == ["C"]
+
+
+def test_truncated_output_is_repaired():
+    content = json.dumps(_problem())[:-30]
+    result, outcome = parse_model_output(ProblemOutput, content, fix=fix_problem_data)
+    assert outcome == "repaired"
+    assert result.answer == "B" and len(result.choices) == 4
+
+
+def test_invalid_field_is_dropped_and_reported_as_defect():
+    content = json.dumps(_problem(explanation={"text": "nested"}))
+    result, outcome = parse_model_output(ProblemOutput, content, fix=fix_problem_data)
+
+    assert outcome == "repaired"
+    assert result.explanation == ""
+    assert problem_defects(result.model_dump()) == ["explanation"]
+
+
+def test_missing_answer_is_not_guessed():
+    data = _problem(choices=[dict(c, is_correct=False) for c in CHOICES])
+    del data["answer"]
+    valid = json.dumps(data)
+    truncated = valid[:-1]  # 정상 경로와 복구 경로 모두
+
+    for content, expected in ((valid, "valid"), (truncated, "repaired")):
+        result, outcome = parse_model_output(ProblemOutput, content, fix=fix_problem_data)
+        assert outcome == expected
+        assert result.answer == ""
+        assert "answer" in problem_defects(result.model_dump())
+
+
+def test_answer_falls_back_to_single_marked_choice():
+    data = fix_problem_data(_problem(answer="E"))
+    assert data["answer"] == "B"
+
+
+def test_choices_given_as_mapping_are_labelled():
+    data = fix_problem_data(_problem(choices={"A": "was", "B": "were", "C": "is", "D": "be"}, answer="b)"))
+    assert [c["label"] for c in data["choices"]] == ["A", "B", "C", "D"]
+    assert [c["is_correct"] for c in data["choices"]] == [False, True, False, False]
+    assert problem_defects(data) == []
+
+
+def test_defects_flag_wrong_choice_count():
+    data = fix_problem_data(_problem(choices=CHOICES[:3], question=""))
+    assert problem_defects(data) == ["question", "choices", "answer"]
+
+
+def test_set_output_fixes_every_question():
+    content = json.dumps({"passage": "Memo", "questions": [_problem(answer="A"), "junk", _problem()]})
+    result, outcome = parse_model_output(ProblemSetOutput, content, fix=fix_set_data)
+
+    assert outcome == "repaired"  # 문자열 문항은 스키마 위반 → 복구 경로에서 제거
+    assert [q.answer for q in result.questions] == ["A", "B"]
+
+
+@pytest.mark.parametrize("content", ["", "not json at all", "[1, 2]"])
+def test_unrecoverable_output_raises(content):
+    with pytest.raises(OutputParseError):
+        parse_model_output(ProblemOutput, content, fix=fix_problem_data)
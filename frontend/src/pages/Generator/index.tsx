@@ -33,6 +33,7 @@ interface Analysis {
     toeic_part?: number;
     toeic_part_reason?: string;
     summary?: string;
+    analysis_id?: string;
 }
 
 interface Choice {
@@ -50,6 +51,7 @@ interface Problem {
     answer: string;
     explanation: string;
     difficulty: string;
+    problem_id?: string;
 }
 
 const API_BASE = 'http://localhost:8000';
@@ -62,9 +64,11 @@ const Generator: React.FC = () => {
     const [isLoading, setIsLoading] = useState(false);
     const [analysis, setAnalysis] = useState<Analysis | null>(null);
     const [problems, setProblems] = useState<Problem[]>([]);
+    const [passage, setPassage] = useState<string | null>(null);
     const [error, setError] = useState<string | null>(null);
     const [selectedAnswers, setSelectedAnswers] = useState<Record<number, string>>({});
     const [showAnswers, setShowAnswers] = useState<Record<number, boolean>>({});
+    const [explanations, setExplanations] = useState<Record<number, string>>({});
     const [isDragging, setIsDragging] = useState(false);
 
     // File Upload Handler
@@ -156,8 +160,10 @@ const Generator: React.FC = () => {
         setIsLoading(true);
         setError(null);
         setProblems([]);
+        setPassage(null);
         setSelectedAnswers({});
         setShowAnswers({});
+        setExplanations({});
 
         try {
             const response = await fetch(`${API_BASE}/api/generate/problem`, {
@@ -169,6 +175,10 @@ const Generator: React.FC = () => {
                     difficulty: selectedDifficulty,
                     count: 1,
                     use_rag: true,
+                    // 같은 텍스트를 이미 분석했으면 서버에서 재분석 생략
+                    analysis_id: analysis?.original_text === inputText ? analysis.analysis_id : undefined,
+                    // 해설은 정답 확인 시 problem_id로 따로 요청
+                    lazy_explanation: true,
                 }),
             });
 
@@ -176,6 +186,8 @@ const Generator: React.FC = () => {
 
             if (data.success && data.problems) {
                 setProblems(data.problems);
+                // Part 6/7 세트: 지문은 응답에 한 번만 옴
+                setPassage(data.passage ?? null);
                 // Also set analysis if we got toeic_part
                 if (data.detected_part) {
                     setAnalysis(prev => prev ? { ...prev, toeic_part: data.detected_part } : null);
@@ -195,9 +207,32 @@ const Generator: React.FC = () => {
         setSelectedAnswers(prev => ({ ...prev, [problemIndex]: label }));
     };
 
-    // Show Answer
-    const handleShowAnswer = (problemIndex: number) => {
+    // Show Answer (lazy 해설이면 이때 요청)
+    const handleShowAnswer = async (problemIndex: number) => {
         setShowAnswers(prev => ({ ...prev, [problemIndex]: true }));
+
+        const problem = problems[problemIndex];
+        if (problem.explanation || !problem.problem_id || explanations[problemIndex]) {
+            return;
+        }
+        try {
+            const response = await fetch(`${API_BASE}/api/generate/explanation`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    problem_id: problem.problem_id,
+                    // 서버에서 만료됐거나 다른 워커면 이 문제로 생성
+                    problem,
+                    passage: passage ?? undefined,
+                }),
+            });
+            const data = await response.json();
+            if (data.success) {
+                setExplanations(prev => ({ ...prev, [problemIndex]: data.explanation }));
+            }
+        } catch (err) {
+            setExplanations(prev => ({ ...prev, [problemIndex]: 'Failed to load explanation' }));
+        }
     };
 
     // Reset
@@ -205,9 +240,11 @@ const Generator: React.FC = () => {
         setInputText('');
         setAnalysis(null);
         setProblems([]);
+        setPassage(null);
         setError(null);
         setSelectedAnswers({});
         setShowAnswers({});
+        setExplanations({});
     };
 
     return (
@@ -439,8 +476,8 @@ const Generator: React.FC = () => {
                                             </S.DifficultyBadge>
                                         </S.ProblemHeader>
 
-                                        {problem.passage && (
-                                            <S.Passage>{problem.passage}</S.Passage>
+                                        {(problem.passage || (index === 0 && passage)) && (
+                                            <S.Passage>{problem.passage || passage}</S.Passage>
                                         )}
 
                                         <S.Question>{problem.question}</S.Question>
@@ -475,7 +512,7 @@ const Generator: React.FC = () => {
                                             <S.Explanation>
                                                 <strong>Answer: {problem.answer}</strong>
                                                 <br /><br />
-                                                {problem.explanation}
+                                                {problem.explanation || explanations[index] || 'Loading explanation...'}
                                             </S.Explanation>
                                         )}
                                     </S.ProblemCard>